@@ -0,0 +1,546 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+
+import main
+
+"""
+Micro-benchmarks for Automated Task Runner (Pro).
+Run all:   python bench.py
+Run some:  python bench.py window_scan
+"""
+
+
+def _report(name: str, rounds: int, elapsed: float):
+    print(f"{name:<40} {rounds:>7} rounds  {elapsed / rounds * 1e6:>10.1f} us/round")
+
+
+def _baseline(text: str):
+    """A computed figure to compare against, kept apart from the measured rows."""
+    print(f"  (not measured) {text}")
+
+
+def bench_window_scan(windows: int = 5000, rounds: int = 200, churn: int = 5):
+    """Full title scan (old behaviour) vs incremental WindowScanner with a few retitled windows per round."""
+    backend = main.FakeWindowBackend({h: f"Window {h} - Some Application" for h in range(windows)})
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        titles = [t for t in backend.list_windows().values() if t]
+        [t for t in titles if any(p in t for p in main.OBS_ERROR_TITLES)]
+    _report(f"window_scan/full ({windows} windows)", rounds, time.perf_counter() - t0)
+
+    scanner = main.WindowScanner(main.OBS_ERROR_TITLES, backend)
+    scanner.scan()
+    t0 = time.perf_counter()
+    for r in range(rounds):
+        for i in range(churn):
+            backend.windows[(r * churn + i) % windows] = f"Window {r} - retitled"
+        scanner.scan()
+    _report(f"window_scan/incremental ({windows} windows)", rounds, time.perf_counter() - t0)
+
+
+def bench_focus(windows: int = 5000, rounds: int = 2000):
+    """Per-step focus check: title scan and activate every time vs WindowFocus's handle comparison."""
+    backend = main.FakeWindowBackend({h: f"Window {h} - Some Application" for h in range(windows)})
+    backend.windows[windows - 1] = "OBS 30.0 - Profile: Untitled"
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        handle = next(h for h, t in backend.list_windows().items() if "OBS" in t)
+        backend.activate(handle)
+    _report(f"focus/scan+activate ({windows} windows)", rounds, time.perf_counter() - t0)
+
+    focus = main.WindowFocus(backend)
+    backend.activated.clear()
+    backend.front = None
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        focus.ensure("OBS")
+    _report(f"focus/cached handle ({windows} windows)", rounds, time.perf_counter() - t0)
+    print(f"{'focus/cached activations':<40} {len(backend.activated):>10d}     for {rounds} steps")
+
+
+class LegacyTimerWatchdog:
+    """The previous watchdog: a fresh threading.Timer (and OS thread) on every reset."""
+
+    def __init__(self, timeout, error_callback):
+        self.timeout = timeout
+        self.error_callback = error_callback
+        self.timer = None
+
+    def reset(self):
+        self.cancel()
+        self.timer = threading.Timer(self.timeout, self.error_callback)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def cancel(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+
+
+def _count_thread_starts(fn):
+    started = [0]
+    original = threading.Thread.start
+
+    def counting_start(self):
+        started[0] += 1
+        return original(self)
+
+    threading.Thread.start = counting_start
+    try:
+        fn()
+    finally:
+        threading.Thread.start = original
+    return started[0]
+
+
+def _timeout_latency(watchdog, arm, timeout: float, trials: int = 10) -> float:
+    """Mean delay between the heartbeat deadline and the callback firing."""
+    fired = threading.Event()
+    watchdog.error_callback = fired.set
+    total = 0.0
+    for _ in range(trials):
+        fired.clear()
+        t0 = time.perf_counter()
+        arm()
+        fired.wait(timeout * 10)
+        total += time.perf_counter() - t0 - timeout
+    return total / trials
+
+
+def bench_watchdog(resets: int = 2000, timeout: float = 0.05):
+    """Per-reset cost, threads started and timeout detection latency: Timer-per-reset vs heartbeat monitor."""
+    legacy = LegacyTimerWatchdog(60, lambda: None)
+    t0 = time.perf_counter()
+    threads = _count_thread_starts(lambda: [legacy.reset() for _ in range(resets)])
+    _report(f"watchdog/timer reset ({threads} threads)", resets, time.perf_counter() - t0)
+    legacy.cancel()
+
+    heartbeat = main.HeartbeatWatchdog(60, lambda: None)
+    t0 = time.perf_counter()
+    threads = _count_thread_starts(lambda: [heartbeat.beat() for _ in range(resets)])
+    _report(f"watchdog/heartbeat beat ({threads} threads)", resets, time.perf_counter() - t0)
+    heartbeat.close()
+
+    legacy = LegacyTimerWatchdog(timeout, None)
+    print(f"{'watchdog/timer timeout latency':<40} {_timeout_latency(legacy, legacy.reset, timeout) * 1e3:>10.2f} ms")
+    heartbeat = main.HeartbeatWatchdog(timeout, None)
+    print(f"{'watchdog/heartbeat timeout latency':<40} {_timeout_latency(heartbeat, heartbeat.beat, timeout) * 1e3:>10.2f} ms")
+    heartbeat.close()
+
+
+def bench_verify(rounds: int = 2000, size: int = 24):
+    """Cost of one post-click screen check on a synthetic 1080p screen, per condition type."""
+    screen = main.Frame(1920, 1080, bytes(range(256)) * (1920 * 1080 * 3 // 256))
+    source = main.FakeScreenSource(screen)
+    region = (960, 540, size, size)
+    reference = screen.crop(*region)
+    checks = {
+        "checksum": main.ScreenCheck(region, checksum=reference.checksum()),
+        "color": main.ScreenCheck(region, color=reference.mean_color(), tolerance=1),
+        "image": main.ScreenCheck(region, image=reference, tolerance=2),
+        "changed": main.ScreenCheck(region, changed=True),
+    }
+    checks["changed"].prepare(source)
+    for label, check in checks.items():
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            check.matches(source)
+        _report(f"verify/{label} ({size}x{size})", rounds, time.perf_counter() - t0)
+
+
+# Per-match latency targets in milliseconds (ROI matches run on every screen check).
+MATCH_TARGETS_MS = {"roi": 5.0, "1080p": 150.0, "4k": 600.0}
+
+
+def _synthetic_screen(width: int, height: int, seed: int = 1) -> "main.Frame":
+    """Smooth random texture (blocky noise) so NCC has a single clear peak."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(0, 256, size=(height // 8 + 1, width // 8 + 1, 3), dtype=np.uint8)
+    rgb = np.repeat(np.repeat(coarse, 8, axis=0), 8, axis=1)[:height, :width]
+    rgb = (rgb.astype(np.int16) + rng.integers(-12, 13, size=rgb.shape)).clip(0, 255).astype(np.uint8)
+    return main.Frame(width, height, rgb.tobytes())
+
+
+def bench_match(rounds: int = 20, size: int = 64, search: int = 48):
+    """Template matching: ROI around a ClickPoint vs whole 1080p/4K frames, against MATCH_TARGETS_MS."""
+    import matcher
+
+    for label, (width, height) in (("1080p", (1920, 1080)), ("4k", (3840, 2160))):
+        screen = _synthetic_screen(width, height)
+        cx, cy = width * 3 // 4, height * 3 // 4
+        template = matcher.Template(screen.crop(cx - size // 2, cy - size // 2, size, size))
+        m = matcher.TemplateMatcher()
+        source = main.FakeScreenSource(screen)
+        for case, fn in (("roi", lambda: m.find(source, template, (cx + 7, cy - 5), search)),
+                         (label, lambda: m.match(screen, template))):
+            found = fn()
+            t0 = time.perf_counter()
+            for _ in range(rounds):
+                fn()
+            elapsed = time.perf_counter() - t0
+            ms = elapsed / rounds * 1e3
+            hit = found.score > 0.99 and (case != "roi" or (found.x, found.y) == (cx - size // 2, cy - size // 2))
+            verdict = "ok" if ms <= MATCH_TARGETS_MS[case] and hit else "FAIL"
+            print(f"{'match/' + case + ' (' + label + ')':<40} {ms:>10.2f} ms  score {found.score:.3f}  "
+                  f"target {MATCH_TARGETS_MS[case]:.0f} ms  {verdict}")
+
+
+def bench_resolve(rounds: int = 20000):
+    """Per-iteration point resolution: cached (layout unchanged) vs recomputed after every layout change."""
+    import copy
+    backend = main.FakeDisplayBackend([(0, 0, 3840, 2160), (3840, 0, 1920, 1080)], {"OBS 30 - Profile": (0, 0, 1600, 900)})
+    points = [copy.copy(p) for p in main.DEFAULT_POINTS] + [main.ClickPoint("OBS", 0, 0, "window:OBS", 0.5, 0.9)]
+    resolver = main.PointResolver(backend)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        resolver.resolve(points)
+    _report("resolve/cached", rounds, time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for i in range(rounds):
+        backend.monitor_rects[1] = (3840, 0, 1920 + i % 2, 1080)
+        resolver.resolve(points)
+    _report("resolve/layout changed", rounds, time.perf_counter() - t0)
+
+
+def bench_metrics(rounds: int = 200000):
+    """Hot-path cost of recording a metric sample."""
+    import metrics
+    registry = metrics.Registry()
+    counter = registry.counter("bench_total", "bench", ("step",))
+    histogram = registry.histogram("bench_seconds", "bench", ("step",))
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        counter.inc(step="Step 1")
+    _report("metrics/counter inc", rounds, time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for i in range(rounds):
+        histogram.observe(i % 100 * 0.01, step="Step 1")
+    _report("metrics/histogram observe", rounds, time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for _ in range(100):
+        main.metrics.REGISTRY.prometheus_text()
+    _report("metrics/prometheus text (app registry)", 100, time.perf_counter() - t0)
+
+
+def bench_trace(rounds: int = 200000):
+    """Cost of a traced span with tracing off vs on, against an uninstrumented loop."""
+    import tracing
+    tracer = tracing.Tracer()
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        pass
+    base = time.perf_counter() - t0
+    _report("trace/no span", rounds, base)
+    for enabled in (False, True):
+        tracer.enabled = enabled
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            with tracer.span("step", "step"):
+                pass
+        _report(f"trace/span ({'on' if enabled else 'off'})", rounds, time.perf_counter() - t0)
+
+
+def bench_checkpoint(rounds: int = 20000):
+    """Caller-side cost of a session checkpoint, and how many fsyncs the writer thread needed for them."""
+    import tempfile
+    import session
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = session.SessionJournal(os.path.join(tmp, "state.jsonl"), flush_interval=0.05)
+        entry = {"state": "step", "at": 0.0, "iteration": 3, "step": 7, "label": "8 Step 6",
+                 "deadline": 1.0, "workflow": "0123456789abcdef"}
+        t0 = time.perf_counter()
+        for i in range(rounds):
+            entry["at"] = float(i)
+            journal.record(entry)
+        _report("checkpoint/record", rounds, time.perf_counter() - t0)
+        journal.close()
+        print(f"{'checkpoint/fsyncs':<40} {journal.syncs:>10d}     for {rounds} records")
+
+
+def bench_hotkeys(rounds: int = 20000):
+    """Key event to callback through HotkeyManager (one per press, repeats dropped); the old 50 ms poll is given for comparison."""
+    import hotkeys
+    backend = hotkeys.FakeHotkeyBackend()
+    manager = hotkeys.HotkeyManager(backend)
+    fired = []
+    manager.bind("delete", fired.append)
+    manager.start()
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        backend.press("delete")
+        backend.press("delete")  # auto-repeat
+        backend.release("delete")
+    _report("hotkeys/dispatch", rounds, time.perf_counter() - t0)
+    manager.stop()
+    if len(fired) != rounds:
+        raise AssertionError(f"hotkeys: {len(fired)} callbacks for {rounds} presses")
+    _baseline("old 50 ms key poll: a press waited 25000 us on average (half the poll interval)")
+
+
+class _BenchRunner:
+    """Just the signals and flag RunState reads from an AutomationRunner."""
+
+    def __init__(self):
+        for name in ("status_signal", "step_signal", "countdown_signal", "error_popup_signal", "stop_signal"):
+            setattr(self, name, main.Signal())
+        self.is_running = False
+
+    def start(self) -> bool:
+        if self.is_running:
+            return False
+        self.is_running = True
+        self.status_signal.emit("Status: Running")
+        return True
+
+    def stop(self) -> bool:
+        if not self.is_running:
+            return False
+        self.is_running = False
+        self.stop_signal.emit()
+        return True
+
+
+def bench_remote(rounds: int = 200):
+    """Remote control: /status round trip, and step signal to server-sent event; a 1 s /status poll is given for comparison."""
+    import http.client
+    import json
+    import socket
+    import remote
+    server = remote.RemoteServer(0).start()
+    runner = _BenchRunner()
+    server.state.attach(runner)
+    server.controller = runner
+    try:
+        def request(method, path, headers=None):
+            conn = http.client.HTTPConnection(server.host, server.port, timeout=5)
+            if headers is None:
+                headers = {"Content-Type": "application/json"} if method == "POST" else {}
+            conn.request(method, path, headers=headers)
+            response = conn.getresponse()
+            body = json.loads(response.read())
+            conn.close()
+            return response.status, body
+
+        refused = [request("POST", "/start", {})[0],
+                   request("POST", "/start", {"Content-Type": "text/plain"})[0],
+                   request("POST", "/start", {"Content-Type": "application/json", "Origin": "http://evil.example"})[0],
+                   request("POST", "/start", {"Content-Type": "application/json", "Host": "evil.example:80"})[0]]
+        if refused != [415, 415, 403, 403] or request("GET", "/status")[1]["running"]:
+            raise AssertionError(f"remote: cross-site starts answered {refused}")
+        codes = [request("POST", "/start")[0], request("POST", "/start")[0]]
+        if codes != [202, 409] or not request("GET", "/status")[1]["running"]:
+            raise AssertionError(f"remote: start answered {codes}")
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            request("GET", "/status")
+        _report("remote/status request", rounds, time.perf_counter() - t0)
+
+        sock = socket.create_connection((server.host, server.port), timeout=5)
+        sock.sendall(b"GET /events?lines=0 HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n")
+        stream = sock.makefile("rb")
+        while not stream.readline().startswith(b"event: status"):
+            pass
+        elapsed = 0.0
+        for i in range(rounds):
+            t0 = time.perf_counter()
+            runner.step_signal.emit(i % 10, f"Step {i % 10}", i)
+            while not stream.readline().startswith(b"data:"):
+                pass
+            elapsed += time.perf_counter() - t0
+        _report("remote/step event pushed", rounds, elapsed)
+        sock.close()
+        bad = socket.create_connection((server.host, server.port), timeout=5)
+        bad.sendall(b"POST /stop HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Length: abc\r\n\r\n")
+        answer = bad.makefile("rb").readline()
+        bad.close()
+        if not answer.startswith(b"HTTP/1.1 400"):
+            raise AssertionError(f"remote: bad Content-Length answered {answer!r}")
+        if request("GET", "/events?lines=abc")[0] != 400:
+            raise AssertionError("remote: /events accepted lines=abc")
+        main.add_log_handler(server.log_handler)
+        main.logger.info("bench remote log line")
+        deadline = time.monotonic() + 5
+        while not any(line.endswith("bench remote log line") for line in request("GET", "/log?lines=5")[1]["lines"]):
+            if time.monotonic() > deadline:
+                raise AssertionError("remote: log line never reached /log")
+            time.sleep(0.01)
+        status = request("GET", "/status")[1]
+        if status["step"] != (rounds - 1) % 10 or request("POST", "/stop")[0] != 202 or request("GET", "/status")[1]["running"]:
+            raise AssertionError(f"remote: unexpected state {status}")
+    finally:
+        main.remove_log_handler(server.log_handler)
+        server.stop()
+    _baseline("polling /status every 1 s: a change waits 500000 us on average (half the poll interval)")
+
+
+class _RecordingObs:
+    """Hotkey fallback stand-in; records which actions reached it."""
+
+    def __init__(self):
+        self.calls = []
+
+    def start_stream(self) -> bool:
+        self.calls.append("start_stream")
+        return True
+
+    def stop_stream(self) -> bool:
+        self.calls.append("stop_stream")
+        return True
+
+    def restart_stream(self, wait=None) -> bool:
+        self.calls.append("restart_stream")
+        return True
+
+
+def bench_obs(rounds: int = 20):
+    """obs-websocket client against MockObsServer: connect, auth, stop/start confirmed by events; wrong password falls back."""
+    import sim
+    with sim.MockObsServer(password="secret", state_delay=0.01) as server:
+        server.stream_active = True
+        hotkeys = _RecordingObs()
+        ws = main.ObsWebSocketController(server.host, server.port, password="secret", timeout=2.0)
+        obs = main.ObsController(websocket=ws, hotkeys=hotkeys)
+        t0 = time.perf_counter()
+        ok = obs.stop_stream() and obs.start_stream()
+        _report("obs/connect+auth+stop+start", 1, time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            ok = obs.restart_stream() and ok
+        _report("obs/restart (stop+start confirmed)", rounds, time.perf_counter() - t0)
+        ws.close()
+        expected = ["GetStreamStatus", "StopStream", "StartStream"] + ["StopStream", "StartStream"] * rounds
+        if not ok or server.requests != expected or hotkeys.calls or not server.stream_active:
+            raise AssertionError(f"obs: ok={ok} requests={server.requests} hotkeys={hotkeys.calls}")
+
+        hotkeys = _RecordingObs()
+        bad = main.ObsController(websocket=main.ObsWebSocketController(
+            server.host, server.port, password="wrong", timeout=0.5), hotkeys=hotkeys)
+        if not bad.stop_stream() or hotkeys.calls != ["stop_stream"] or bad.websocket.connected:
+            raise AssertionError(f"obs: wrong password did not fall back to hotkeys: {hotkeys.calls}")
+        print(f"{'obs/wrong password':<40} {'hotkey fallback':>18}")
+
+        server.reply_delay = {"GetVersion": 0.3}
+        ws = main.ObsWebSocketController(server.host, server.port, password="secret", timeout=0.1)
+        ws.connect()
+        try:
+            ws._request("GetVersion")
+        except TimeoutError:
+            pass
+        time.sleep(0.4)
+        late = dict(ws._responses)
+        ws.close()
+        if late:
+            raise AssertionError(f"obs: a reply after the timeout was kept: {late}")
+
+        server.reply_delay = {"GetStreamStatus": 0.3}
+        hotkeys = _RecordingObs()
+        slow = main.ObsController(websocket=main.ObsWebSocketController(
+            server.host, server.port, password="secret", timeout=0.1), hotkeys=hotkeys)
+        if not slow.stop_stream() or hotkeys.calls != ["stop_stream"] or slow.websocket.connected:
+            raise AssertionError(f"obs: unanswered GetStreamStatus left a half-open session: {hotkeys.calls}")
+        print(f"{'obs/no status answer':<40} {'hotkey fallback':>18}")
+
+
+def bench_sim():
+    """Regression scenarios on the virtual clock: wall time per scenario; raises if an action sequence differs."""
+    import sim
+    failed = []
+    for name, scenario in sim.SCENARIOS.items():
+        t0 = time.perf_counter()
+        problems = scenario()
+        elapsed = time.perf_counter() - t0
+        print(f"{'sim/' + name:<40} {elapsed * 1e3:>10.1f} ms  {'ok' if not problems else 'FAILED'}")
+        failed += [f"{name}: {p}" for p in problems]
+    if failed:
+        raise AssertionError("\n".join(failed))
+
+
+def bench_schedule(rounds: int = 2000):
+    """Cost of computing the next due time, which the scheduler does once per firing instead of polling."""
+    import datetime
+    import scheduler
+
+    start = datetime.datetime(2026, 1, 1, 0, 0)
+    triggers = {
+        "daily 06:00,18:00 weekdays": scheduler.DailyTrigger(["06:00", "18:00"], ["mon", "tue", "wed", "thu", "fri"]),
+        "cron */15 6-22 * * *": scheduler.CronTrigger("*/15 6-22 * * *"),
+        "cron 0 4 1 */3 *": scheduler.CronTrigger("0 4 1 */3 *"),
+    }
+    for label, trigger in triggers.items():
+        t, due = time.perf_counter(), start
+        for _ in range(rounds):
+            due = trigger.next_after(due)
+        _report(f"schedule/{label}", rounds, time.perf_counter() - t)
+
+
+_STARTUP_PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import main
+if {gui}:
+    import gui
+    from PyQt5 import QtWidgets
+    app = QtWidgets.QApplication(sys.argv[:1])
+    window = gui.AutomationApp()
+    app.processEvents()
+else:
+    runner = main.RunConfig(dry_run=True).make_runner()
+elapsed = time.perf_counter() - t0
+try:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:
+    rss_kb = 0
+print(elapsed, rss_kb)
+"""
+
+
+def bench_startup(runs: int = 3):
+    """Cold start time and peak resident memory: headless runner vs full GUI window (fresh process each run)."""
+    env = dict(os.environ)
+    if sys.platform.startswith("linux") and not env.get("DISPLAY"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    here = os.path.dirname(os.path.abspath(__file__))
+    for label, gui in (("headless", False), ("gui", True)):
+        times, rss = [], []
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, "-c", _STARTUP_PROBE.format(gui=gui)], cwd=here, env=env,
+                                 capture_output=True, text=True, check=True).stdout.split()
+            times.append(float(out[-2]))
+            rss.append(int(out[-1]))
+        print(f"{'startup/' + label:<40} {min(times) * 1e3:>10.1f} ms  {max(rss) / 1024:>8.1f} MB peak RSS")
+
+
+BENCHMARKS = {
+    "window_scan": bench_window_scan,
+    "focus": bench_focus,
+    "watchdog": bench_watchdog,
+    "startup": bench_startup,
+    "schedule": bench_schedule,
+    "verify": bench_verify,
+    "match": bench_match,
+    "resolve": bench_resolve,
+    "metrics": bench_metrics,
+    "trace": bench_trace,
+    "sim": bench_sim,
+    "checkpoint": bench_checkpoint,
+    "hotkeys": bench_hotkeys,
+    "remote": bench_remote,
+    "obs": bench_obs,
+}
+
+
+def run(names=None):
+    for name in names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
@@ -0,0 +1,1261 @@
+import sys
+import copy
+import logging
+import math
+import os
+import threading
+import time
+import traceback
+from collections import deque
+
+from PyQt5 import QtWidgets, QtGui, QtCore
+
+from main import (
+    APP_TITLE, APP_AUTHOR, CONFIG_FILE, COUNTDOWN_IDLE_INTERVAL_MS, LOG_FILE, LOG_VIEW_MAX_LINES, LOG_FLUSH_INTERVAL_MS, STATE_FILE,
+    DEFAULT_POINTS, ClickPoint, AutomationRunner, PointResolver, RunConfig,
+    describe_resume_point, get_display_backend, get_input_driver, get_obs_controller, is_failsafe,
+    load_resume_point, load_workflow, logger, pyautogui, shutdown_logging,
+)
+from hotkeys import HotkeyManager, get_hotkey_backend, key_label
+from profiles import ConfigStore
+from tracing import TRACER, nest
+
+"""
+Automated Task Runner (Pro) - PyQt5 user interface
+Author: xTheRedShirtx
+"""
+
+QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_EnableHighDpiScaling, True)
+QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_UseHighDpiPixmaps, True)
+
+def load_points(settings: QtCore.QSettings) -> list:
+    """Points from the QSettings keys used before the settings file (see migrate_qsettings)."""
+    points = []
+    size = settings.value("points/count", 0, int)
+    if not size:
+        return [copy.copy(p) for p in DEFAULT_POINTS]
+    for i in range(size):
+        name = settings.value(f"points/{i}/name", f"Step {i+1}")
+        x = int(settings.value(f"points/{i}/x".format(i=i), 0))
+        y = int(settings.value(f"points/{i}/y".format(i=i), 0))
+        anchor = settings.value(f"points/{i}/anchor", "")
+        if anchor:
+            rx = float(settings.value(f"points/{i}/rx", 0.0))
+            ry = float(settings.value(f"points/{i}/ry", 0.0))
+            points.append(ClickPoint(name, x, y, anchor, rx, ry))
+        else:
+            points.append(ClickPoint(name, x, y))
+    return points
+
+def migrate_qsettings(store: ConfigStore) -> bool:
+    """Copy settings saved by older versions (QSettings/registry) into `store` as the default profile.
+
+    The old keys are left in place. Returns False if there was nothing to migrate.
+    """
+    settings = QtCore.QSettings("xTheRedShirtx", "AutoRunnerPro")
+    if not settings.allKeys():
+        return False
+    config = RunConfig(
+        hours=int(settings.value("longwait/hours", 11)),
+        minutes=int(settings.value("longwait/mins", 30)),
+        step_delay=int(settings.value("settings/step_delay", 10)),
+        retries=int(settings.value("settings/retries", 3)),
+        watchdog=int(settings.value("settings/watchdog", 15)),
+        step4_wait=int(settings.value("settings/step4wait", 10)),
+        dry_run=bool(int(settings.value("settings/dry_run", 0))),
+        points=load_points(settings),
+    )
+    store.set_profile("default", config)
+    store.set_active("default")
+    store.set_ui("always_on_top", bool(int(settings.value("settings/ontop", 1))))
+    return True
+
+class AutomationThread(QtCore.QThread):
+    log_signal = QtCore.pyqtSignal(str)
+    status_signal = QtCore.pyqtSignal(str)
+    stop_signal = QtCore.pyqtSignal()
+    countdown_signal = QtCore.pyqtSignal(float, float)
+    error_popup_signal = QtCore.pyqtSignal(str)
+
+    def __init__(self, **runner_kwargs):
+        super().__init__()
+        self.runner = AutomationRunner(**runner_kwargs)
+        self.runner.log_signal.connect(self.log_signal.emit)
+        self.runner.status_signal.connect(self.status_signal.emit)
+        self.runner.stop_signal.connect(self.stop_signal.emit)
+        self.runner.countdown_signal.connect(self.countdown_signal.emit)
+        self.runner.error_popup_signal.connect(self.error_popup_signal.emit)
+
+    def stop(self):
+        """Gracefully stop the automation thread."""
+        self.runner.stop()
+
+    def run(self):
+        self.runner.run()
+
+class Countdown(QtCore.QObject):
+    """Long-wait countdown for the Runner tab, computed from one deadline per wait.
+
+    Renders on whole-second boundaries while the window is focused, every
+    COUNTDOWN_IDLE_INTERVAL_MS while it is visible but in the background, and
+    not at all while minimized or on another tab (render() is called again on
+    those changes).
+    """
+
+    def __init__(self, label: QtWidgets.QLabel, progress: QtWidgets.QProgressBar, parent=None):
+        super().__init__(parent)
+        self.label = label
+        self.progress = progress
+        self.deadline = 0.0
+        self.total = 0.0
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.render)
+
+    def start(self, deadline: float, total: float):
+        """Show a wait ending at `deadline` (time.monotonic()) that is `total` seconds long; (0, 0) clears it."""
+        self.deadline, self.total = deadline, total
+        self.timer.stop()
+        if not deadline:
+            self.label.setText("Timer: Not Started")
+            self.progress.setValue(0)
+            return
+        self.render()
+
+    def render(self):
+        if not self.deadline:
+            return
+        window = self.label.window()
+        if not self.label.isVisible() or window.isMinimized():
+            self.timer.stop()
+            return
+        remaining = max(0.0, self.deadline - time.monotonic())
+        h, r = divmod(math.ceil(remaining), 3600)
+        m, sec = divmod(r, 60)
+        text = f"Time Remaining: {h:02}:{m:02}:{sec:02}"
+        if self.label.text() != text:
+            self.label.setText(text)
+        pct = max(0, min(100, int((self.total - remaining) / self.total * 100))) if self.total > 0 else 0
+        if self.progress.value() != pct:
+            self.progress.setValue(pct)
+        if remaining <= 0:
+            return
+        # Next tick just after the displayed second changes (or after several, in the background)
+        step = 1 if window.isActiveWindow() else max(1, COUNTDOWN_IDLE_INTERVAL_MS // 1000)
+        self.timer.start(int((remaining % 1 + step - 1) * 1000) + 5)
+
+def mouse_position() -> tuple:
+    """Mouse position from the input backend, or pyautogui where the backend cannot read it (uinput)."""
+    driver = get_input_driver()
+    if driver.reads_position:
+        return driver.position()
+    pos = pyautogui.position()
+    return pos.x, pos.y
+
+class CaptureOverlay(QtWidgets.QWidget):
+    captured = QtCore.pyqtSignal(int, int)
+    cancelled = QtCore.pyqtSignal()
+
+    def __init__(self, capture_key: str = "lctrl", cancel_key: str = "esc", grab_keyboard: bool = False):
+        super().__init__()
+        self.setWindowFlags(
+            QtCore.Qt.FramelessWindowHint
+            | QtCore.Qt.WindowStaysOnTopHint
+            | QtCore.Qt.Tool
+        )
+        self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
+        self.capture_key = capture_key
+        self.cancel_key = cancel_key
+        self.grab_keyboard = grab_keyboard
+        self._build()
+        # Only the position readout is refreshed on a timer, and only while the overlay is open
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self._show_position)
+
+    def _build(self):
+        self.resize(420, 120)
+        screen = QtWidgets.QApplication.primaryScreen().availableGeometry()
+        self.move(int(screen.center().x() - self.width()/2), 40)
+
+        self.card = QtWidgets.QFrame(self)
+        self.card.setGeometry(0, 0, 420, 120)
+        self.card.setStyleSheet("""
+            QFrame {
+                background: rgba(255,255,255,0.92);
+                border-radius: 12px;
+                border: 1px solid #c9c9c9;
+            }
+        """)
+
+        v = QtWidgets.QVBoxLayout(self.card)
+        title = QtWidgets.QLabel("Coordinate Capture")
+        title.setAlignment(QtCore.Qt.AlignCenter)
+        title.setFont(QtGui.QFont("Segoe UI", 12, QtGui.QFont.Bold))
+        v.addWidget(title)
+
+        self.pos_lbl = QtWidgets.QLabel("Position: (0, 0)")
+        self.pos_lbl.setAlignment(QtCore.Qt.AlignCenter)
+        self.pos_lbl.setFont(QtGui.QFont("Segoe UI", 11))
+        v.addWidget(self.pos_lbl)
+
+        tip = QtWidgets.QLabel(f"Place the mouse, then press {key_label(self.capture_key)} to capture. "
+                               f"Press {key_label(self.cancel_key)} to cancel.")
+        tip.setAlignment(QtCore.Qt.AlignCenter)
+        tip.setFont(QtGui.QFont("Segoe UI", 10))
+        v.addWidget(tip)
+
+    def start(self):
+        self.show()
+        if self.grab_keyboard:
+            # No global hotkeys on this system: take the keyboard so Qt key events reach the app
+            self.activateWindow()
+            self.grabKeyboard()
+        self.timer.start(50)
+
+    def _show_position(self):
+        x, y = mouse_position()
+        self.pos_lbl.setText(f"Position: ({x}, {y})")
+
+    def _finish(self):
+        self.timer.stop()
+        if self.grab_keyboard:
+            self.releaseKeyboard()
+        self.hide()
+
+    def on_key(self, key: str):
+        """Hotkey press while the overlay is open."""
+        if not self.isVisible():
+            return
+        if key == self.cancel_key:
+            self._finish()
+            self.cancelled.emit()
+        elif key == self.capture_key:
+            x, y = mouse_position()
+            self._finish()
+            self.captured.emit(x, y)
+
+# Qt keys for the in-app fallback when no global hotkey backend is available
+_QT_KEY_NAMES = {
+    QtCore.Qt.Key_Escape: ("esc",), QtCore.Qt.Key_Delete: ("delete",), QtCore.Qt.Key_Insert: ("insert",),
+    QtCore.Qt.Key_Home: ("home",), QtCore.Qt.Key_End: ("end",), QtCore.Qt.Key_PageUp: ("pageup",),
+    QtCore.Qt.Key_PageDown: ("pagedown",), QtCore.Qt.Key_Pause: ("pause",), QtCore.Qt.Key_ScrollLock: ("scrolllock",),
+    QtCore.Qt.Key_Space: ("space",), QtCore.Qt.Key_Return: ("enter",), QtCore.Qt.Key_Enter: ("enter",),
+    QtCore.Qt.Key_Tab: ("tab",), QtCore.Qt.Key_Backspace: ("backspace",),
+    QtCore.Qt.Key_Control: ("lctrl", "rctrl"), QtCore.Qt.Key_Shift: ("lshift", "rshift"),
+    QtCore.Qt.Key_Alt: ("lalt", "ralt"),
+}
+_QT_KEY_NAMES.update({QtCore.Qt.Key_F1 + i: (f"f{i + 1}",) for i in range(12)})
+_QT_KEY_NAMES.update({QtCore.Qt.Key_A + i: (chr(ord("a") + i),) for i in range(26)})
+_QT_KEY_NAMES.update({QtCore.Qt.Key_0 + i: (str(i),) for i in range(10)})
+
+class HotkeyBridge(QtCore.QObject):
+    """Moves hotkey presses from the backend thread to the GUI thread.
+
+    Without a global backend it watches the app's own key events instead, so
+    the keys still work while one of its windows has focus.
+    """
+    pressed = QtCore.pyqtSignal(str)
+    _last_event = None
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.KeyPress and not event.isAutoRepeat():
+            # An ignored key event is offered to each parent widget in turn; count it once
+            stamp = (event.key(), event.timestamp())
+            if stamp != self._last_event:
+                self._last_event = stamp
+                for name in _QT_KEY_NAMES.get(event.key(), ()):
+                    self.pressed.emit(name)
+        return False
+
+class RemoteBridge(QtCore.QObject):
+    """Remote control requests, moved from the server thread to the GUI thread."""
+    start_requested = QtCore.pyqtSignal()
+    stop_requested = QtCore.pyqtSignal()
+
+    def __init__(self, state, parent=None):
+        super().__init__(parent)
+        self.state = state
+
+    def start(self) -> bool:
+        if self.state.running:
+            return False
+        self.start_requested.emit()
+        return True
+
+    def stop(self) -> bool:
+        if not self.state.running:
+            return False
+        self.stop_requested.emit()
+        return True
+
+class RunnerTab(QtWidgets.QWidget):
+    start_clicked = QtCore.pyqtSignal()
+    stop_clicked  = QtCore.pyqtSignal()
+    profile_selected = QtCore.pyqtSignal(str)
+    save_profile_as_clicked = QtCore.pyqtSignal()
+    delete_profile_clicked = QtCore.pyqtSignal()
+
+    def __init__(self, log_model: "LogListModel"):
+        super().__init__()
+        self.log_model = log_model
+        self._build()
+
+    def _build(self):
+        layout = QtWidgets.QVBoxLayout(self)
+
+        title = QtWidgets.QLabel(f"{APP_TITLE} - by {APP_AUTHOR}")
+        title.setAlignment(QtCore.Qt.AlignCenter)
+        title.setFont(QtGui.QFont("Segoe UI", 20, QtGui.QFont.Bold))
+        layout.addWidget(title)
+
+        profile_row = QtWidgets.QHBoxLayout()
+        self.profile_box = QtWidgets.QComboBox()
+        self.profile_box.activated[str].connect(self.profile_selected.emit)
+        save_as_btn = QtWidgets.QPushButton("Save As...")
+        save_as_btn.clicked.connect(self.save_profile_as_clicked.emit)
+        self.delete_profile_btn = QtWidgets.QPushButton("Delete")
+        self.delete_profile_btn.clicked.connect(self.delete_profile_clicked.emit)
+        profile_row.addWidget(QtWidgets.QLabel("Profile:"))
+        profile_row.addWidget(self.profile_box, 1)
+        profile_row.addWidget(save_as_btn)
+        profile_row.addWidget(self.delete_profile_btn)
+        layout.addLayout(profile_row)
+
+        time_row = QtWidgets.QHBoxLayout()
+        self.hours_input = QtWidgets.QSpinBox()
+        self.hours_input.setRange(0, 48)
+        self.hours_input.setPrefix("Hours: ")
+        self.minutes_input = QtWidgets.QSpinBox()
+        self.minutes_input.setRange(0, 59)
+        self.minutes_input.setPrefix("Minutes: ")
+        time_row.addWidget(self.hours_input)
+        time_row.addWidget(self.minutes_input)
+        layout.addLayout(time_row)
+
+        settings_row = QtWidgets.QHBoxLayout()
+        self.step_delay = QtWidgets.QSpinBox()
+        self.step_delay.setRange(0, 120)
+        self.step_delay.setPrefix("Step delay (s): ")
+
+        self.max_retries = QtWidgets.QSpinBox()
+        self.max_retries.setRange(1, 10)
+        self.max_retries.setPrefix("Retries: ")
+
+        self.watchdog_sec = QtWidgets.QSpinBox()
+        self.watchdog_sec.setRange(3, 600)
+        self.watchdog_sec.setPrefix("Watchdog (s): ")
+
+        self.step4_wait = QtWidgets.QSpinBox()
+        self.step4_wait.setRange(0, 300)
+        self.step4_wait.setPrefix("Step 4 wait (s): ")
+
+        settings_row.addWidget(self.step_delay)
+        settings_row.addWidget(self.max_retries)
+        settings_row.addWidget(self.watchdog_sec)
+        settings_row.addWidget(self.step4_wait)
+        layout.addLayout(settings_row)
+
+        obs_row = QtWidgets.QHBoxLayout()
+        self.obs_port = QtWidgets.QSpinBox()
+        self.obs_port.setRange(1, 65535)
+        self.obs_port.setPrefix("OBS WebSocket port: ")
+        self.obs_password = QtWidgets.QLineEdit()
+        self.obs_password.setEchoMode(QtWidgets.QLineEdit.Password)
+        self.obs_password.setPlaceholderText("OBS WebSocket password (Tools > WebSocket Server Settings)")
+        obs_row.addWidget(self.obs_port)
+        obs_row.addWidget(self.obs_password, 1)
+        layout.addLayout(obs_row)
+
+        toggles_row = QtWidgets.QHBoxLayout()
+        self.dry_run = QtWidgets.QCheckBox("Dry run (no actual clicks)")
+        self.adaptive_delay = QtWidgets.QCheckBox("Adaptive delay")
+        self.adaptive_delay.setToolTip("Tune the delay before each click that has a screen check from whether the check passed first time.")
+        self.always_on_top = QtWidgets.QCheckBox("Always on top")
+        toggles_row.addWidget(self.dry_run)
+        toggles_row.addWidget(self.adaptive_delay)
+        toggles_row.addWidget(self.always_on_top)
+        layout.addLayout(toggles_row)
+
+        self.status_label = QtWidgets.QLabel("Status: Idle")
+        self.status_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.status_label.setFont(QtGui.QFont("Segoe UI", 12))
+        layout.addWidget(self.status_label)
+
+        self.timer_label = QtWidgets.QLabel("Timer: Not Started")
+        self.timer_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.timer_label.setFont(QtGui.QFont("Segoe UI", 14, QtGui.QFont.Bold))
+        layout.addWidget(self.timer_label)
+
+        btn_row = QtWidgets.QHBoxLayout()
+        self.start_btn = QtWidgets.QPushButton("Start")
+        self.stop_btn = QtWidgets.QPushButton("Stop")
+        self.stop_btn.setEnabled(False)
+        self.start_btn.clicked.connect(self.start_clicked.emit)
+        self.stop_btn.clicked.connect(self.stop_clicked.emit)
+        btn_row.addWidget(self.start_btn)
+        btn_row.addWidget(self.stop_btn)
+        layout.addLayout(btn_row)
+
+        self.progress = QtWidgets.QProgressBar()
+        self.progress.setRange(0, 100)
+        self.progress.setValue(0)
+        layout.addWidget(self.progress)
+
+        self.hotkey_label = QtWidgets.QLabel()
+        self.hotkey_label.setAlignment(QtCore.Qt.AlignCenter)
+        self.hotkey_label.setFont(QtGui.QFont("Segoe UI", 9))
+        layout.addWidget(self.hotkey_label)
+
+        self.log_view = LogView(self.log_model)
+        self.log_view.setMinimumHeight(160)
+        layout.addWidget(self.log_view)
+
+        layout.addStretch()
+
+ANCHOR_CHOICES = ["", "monitor:0", "monitor:1", "monitor:2", "window:OBS"]
+
+class CoordinatesTab(QtWidgets.QWidget):
+    save_clicked = QtCore.pyqtSignal()
+    reload_clicked = QtCore.pyqtSignal()
+
+    def __init__(self, points: list, resolver: PointResolver):
+        super().__init__()
+        self.points = points
+        self.resolver = resolver
+        self.overlay = None
+        self.capture_key = "lctrl"
+        self.cancel_key = "esc"
+        self.global_hotkeys = True
+        self._sync_to_layout()
+        self._build()
+
+    def set_keys(self, capture_key: str, cancel_key: str):
+        """Use these keys for Pick and name them in the instructions."""
+        self.capture_key, self.cancel_key = capture_key, cancel_key
+        self.info.setText(
+            f"Edit coordinates. Click Pick, then press the capture key ({key_label(capture_key)}) to capture.\n"
+            f"The cancel key ({key_label(cancel_key)}) cancels. Use Test Click to fire one click.\n"
+            "Anchor keeps a point in place on another resolution: blank = fixed pixels, monitor:N (0 = primary), "
+            "or window:<title text>."
+        )
+
+    def _sync_to_layout(self):
+        """Show anchored points where they fall on the current display layout."""
+        for p, (x, y) in zip(self.points, self.resolver.resolve(self.points)):
+            p.x, p.y = x, y
+
+    def _build(self):
+        layout = QtWidgets.QVBoxLayout(self)
+        self.info = QtWidgets.QLabel()
+        layout.addWidget(self.info)
+        self.set_keys(self.capture_key, self.cancel_key)
+
+        self.table = QtWidgets.QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Step", "X", "Y", "Anchor", "Actions"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self._fill_table()
+        layout.addWidget(self.table)
+
+        row2 = QtWidgets.QHBoxLayout()
+        self.save_btn = QtWidgets.QPushButton("Save Coordinates")
+        self.load_btn = QtWidgets.QPushButton("Reload Saved")
+        self.save_btn.clicked.connect(self.save_clicked.emit)
+        self.load_btn.clicked.connect(self.reload_clicked.emit)
+        row2.addWidget(self.save_btn)
+        row2.addWidget(self.load_btn)
+        layout.addLayout(row2)
+
+        layout.addStretch()
+
+    def _fill_table(self):
+        self.table.setRowCount(len(self.points))
+        for row, p in enumerate(self.points):
+            name_item = QtWidgets.QTableWidgetItem(p.name)
+            self.table.setItem(row, 0, name_item)
+
+            x_spin = QtWidgets.QSpinBox()
+            x_spin.setRange(0, 9999)
+            x_spin.setValue(p.x)
+            x_spin.valueChanged.connect(lambda val, r=row: self._update_point(r, "x", val))
+            self.table.setCellWidget(row, 1, x_spin)
+
+            y_spin = QtWidgets.QSpinBox()
+            y_spin.setRange(0, 9999)
+            y_spin.setValue(p.y)
+            y_spin.valueChanged.connect(lambda val, r=row: self._update_point(r, "y", val))
+            self.table.setCellWidget(row, 2, y_spin)
+
+            anchor_box = QtWidgets.QComboBox()
+            anchor_box.setEditable(True)
+            anchor_box.addItems(ANCHOR_CHOICES)
+            anchor_box.setCurrentText(p.anchor)
+            anchor_box.lineEdit().editingFinished.connect(lambda r=row: self._set_anchor(r))
+            anchor_box.activated.connect(lambda _=None, r=row: self._set_anchor(r))
+            self.table.setCellWidget(row, 3, anchor_box)
+
+            actions = QtWidgets.QWidget()
+            h = QtWidgets.QHBoxLayout(actions)
+            h.setContentsMargins(0, 0, 0, 0)
+            pick_btn = QtWidgets.QPushButton("Pick")
+            test_btn = QtWidgets.QPushButton("Test Click")
+            pick_btn.clicked.connect(lambda _=None, r=row: self._pick_coord_ctrl(r))
+            test_btn.clicked.connect(lambda _=None, r=row: self._test_click(r))
+            h.addWidget(pick_btn)
+            h.addWidget(test_btn)
+            self.table.setCellWidget(row, 4, actions)
+
+        self.table.resizeColumnsToContents()
+
+    def set_points(self, points: list):
+        """Show another set of points (reloaded or from another profile)."""
+        self.points[:] = points
+        self._sync_to_layout()
+        self._fill_table()
+
+    def _update_point(self, row: int, field: str, value: int):
+        p = self.points[row]
+        if field == "x":
+            p.x = value
+        else:
+            p.y = value
+        if p.anchor and not self.resolver.anchor(p, p.anchor):
+            logger.warning(f"{p.name}: anchor {p.anchor} not found; kept its previous position inside it.")
+
+    def _set_anchor(self, row: int):
+        p = self.points[row]
+        box = self.table.cellWidget(row, 3)
+        anchor = box.currentText().strip()
+        if anchor == p.anchor:
+            return
+        try:
+            ok = self.resolver.anchor(p, anchor)
+        except ValueError as e:
+            ok = False
+            logger.warning(str(e))
+        if not ok:
+            QtWidgets.QMessageBox.warning(self, "Anchor", f"Anchor '{anchor}' was not found on this display.")
+            box.setCurrentText(p.anchor)
+            return
+        logger.info(f"{p.name} anchored to {anchor or 'fixed screen pixels'}.")
+    def _pick_coord_ctrl(self, row: int):
+        parent = self.window()
+        parent.showMinimized()
+        self.overlay = CaptureOverlay(self.capture_key, self.cancel_key, grab_keyboard=not self.global_hotkeys)
+        self.overlay.captured.connect(lambda x, y, r=row: self._apply_capture(r, x, y))
+        self.overlay.cancelled.connect(self._cancel_capture)
+        self.overlay.start()
+
+    def _apply_capture(self, row: int, x: int, y: int):
+        self.table.cellWidget(row, 1).setValue(x)
+        self.table.cellWidget(row, 2).setValue(y)
+        logger.info(f"Captured {self.points[row].name}: ({x}, {y})")
+        self.window().showNormal()
+        self.overlay = None
+
+    def _cancel_capture(self):
+        logger.info("Coordinate capture cancelled.")
+        self.window().showNormal()
+        self.overlay = None
+
+    def _test_click(self, row: int):
+        x, y = self.points[row].x, self.points[row].y
+        try:
+            get_input_driver().click(x, y)
+            logger.info(f"Test clicked at ({x}, {y}) for {self.points[row].name}")
+        except Exception as e:
+            if is_failsafe(e):
+                logger.exception("PyAutoGUI Fail-safe triggered during test click.")
+                QtWidgets.QMessageBox.warning(self, "Test Click", "Fail-safe triggered.")
+                return
+            logger.exception(f"Test click failed: {e}")
+            QtWidgets.QMessageBox.critical(self, "Test Click Failed", str(e))
+
+
+class TimelineView(QtWidgets.QWidget):
+    """Flamegraph-style view of traced spans: one row per nesting depth, time left to right."""
+
+    ROW_HEIGHT = 18
+    COLORS = {"loop": "#3d85c6", "step": "#6aa84f", "input": "#e69138", "watchdog": "#666666",
+              "scan": "#8e7cc3", "verify": "#c27ba0", "obs": "#cc4125"}
+
+    def __init__(self):
+        super().__init__()
+        self.setMouseTracking(True)
+        self.setMinimumHeight(self.ROW_HEIGHT * 4)
+        self._rows = []
+        self._bars = []
+
+    def set_spans(self, spans: list):
+        self._rows = nest(spans)
+        depth = max((d for d, _ in self._rows), default=0)
+        self.setMinimumHeight(self.ROW_HEIGHT * (depth + 2))
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor("#1a1a1a"))
+        self._bars = []
+        if not self._rows:
+            painter.setPen(QtGui.QColor("#eaeaea"))
+            painter.drawText(self.rect(), QtCore.Qt.AlignCenter, "No trace yet. Enable tracing and run an iteration.")
+            return
+        t0 = min(s[2] for _, s in self._rows)
+        t1 = max(s[3] for _, s in self._rows)
+        scale = (self.width() - 2) / max(t1 - t0, 1e-9)
+        for depth, (name, cat, start, end, _tid) in self._rows:
+            x = 1 + (start - t0) * scale
+            w = max(2.0, (end - start) * scale)
+            rect = QtCore.QRectF(x, depth * self.ROW_HEIGHT, w, self.ROW_HEIGHT - 2)
+            painter.fillRect(rect, QtGui.QColor(self.COLORS.get(cat, "#999999")))
+            if w > 40:
+                painter.setPen(QtGui.QColor("#ffffff"))
+                painter.drawText(rect.adjusted(3, 0, -3, 0), QtCore.Qt.AlignVCenter, name)
+            self._bars.append((rect, name, end - start))
+
+    def mouseMoveEvent(self, event):
+        pos = QtCore.QPointF(event.pos())
+        for rect, name, duration in reversed(self._bars):
+            if rect.contains(pos):
+                QtWidgets.QToolTip.showText(event.globalPos(), f"{name}: {duration * 1e3:.1f} ms", self)
+                return
+        QtWidgets.QToolTip.hideText()
+
+
+class DebugTab(QtWidgets.QWidget):
+    def __init__(self, log_model: "LogListModel"):
+        super().__init__()
+        self.log_model = log_model
+        self._build()
+
+    def _build(self):
+        layout = QtWidgets.QVBoxLayout(self)
+        self.log_view = LogView(self.log_model)
+        layout.addWidget(self.log_view)
+
+        trace_row = QtWidgets.QHBoxLayout()
+        self.trace_box = QtWidgets.QCheckBox("Trace steps")
+        self.trace_box.setChecked(TRACER.enabled)
+        self.trace_box.toggled.connect(self._set_tracing)
+        refresh_btn = QtWidgets.QPushButton("Show Last Iteration")
+        export_btn = QtWidgets.QPushButton("Export Trace...")
+        trace_row.addWidget(self.trace_box)
+        trace_row.addWidget(refresh_btn)
+        trace_row.addWidget(export_btn)
+        layout.addLayout(trace_row)
+        self.timeline = TimelineView()
+        scroll = QtWidgets.QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(self.timeline)
+        scroll.setMaximumHeight(160)
+        layout.addWidget(scroll)
+        refresh_btn.clicked.connect(self._show_last_iteration)
+        export_btn.clicked.connect(self._export_trace)
+
+        row = QtWidgets.QHBoxLayout()
+        open_btn = QtWidgets.QPushButton("Open Log File")
+        copy_btn = QtWidgets.QPushButton("Copy Logs")
+        clear_btn = QtWidgets.QPushButton("Clear View")
+        row.addWidget(open_btn)
+        row.addWidget(copy_btn)
+        row.addWidget(clear_btn)
+        layout.addLayout(row)
+
+        open_btn.clicked.connect(self._open_log)
+        copy_btn.clicked.connect(self._copy_logs)
+        clear_btn.clicked.connect(self.log_model.clear)
+
+    def _set_tracing(self, enabled: bool):
+        TRACER.enabled = enabled
+        logger.info("Step tracing enabled." if enabled else "Step tracing disabled.")
+
+    def _show_last_iteration(self):
+        spans = TRACER.spans()
+        iterations = [s for s in spans if s[1] == "loop"]
+        if iterations:
+            last = iterations[-1]
+            spans = [s for s in spans if s[4] == last[4] and s[2] >= last[2] and s[3] <= last[3]]
+        self.timeline.set_spans(spans)
+
+    def _export_trace(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Trace", "automation_trace.json",
+                                                        "Chrome trace (*.json)")
+        if not path:
+            return
+        try:
+            TRACER.write_chrome_trace(path)
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, "Export Trace", str(e))
+            return
+        logger.info(f"Trace written to {path}. Open it in chrome://tracing or ui.perfetto.dev.")
+
+    def _open_log(self):
+        QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(LOG_FILE))
+
+    def _copy_logs(self):
+        QtWidgets.QApplication.clipboard().setText(self.log_model.text())
+        QtWidgets.QMessageBox.information(self, "Copied", "Logs copied to clipboard.")
+
+class HelpTab(QtWidgets.QWidget):
+    def __init__(self):
+        super().__init__()
+        v = QtWidgets.QVBoxLayout(self)
+        txt = QtWidgets.QTextBrowser()
+        txt.setOpenExternalLinks(True)
+        txt.setHtml(f"""
+            <h2>How it works</h2>
+            <p><b>Built by {APP_AUTHOR}</b></p>
+            <ul>
+                <li><b>Runner</b>: set waits, retries, watchdog; Start/Stop controls.</li>
+                <li><b>Coordinates</b>: Pick with the capture key (<b>Left Ctrl</b> by default); the cancel key
+                    (<b>Esc</b> by default) cancels. The Coordinates tab shows the keys in use.</li>
+                <li><b>Debug</b>: Live logs; open/copy log file.</li>
+                <li><b>Hotkeys</b>: <b>Delete</b> = emergency stop (set stop_key, capture_key and cancel_key
+                    under "ui" in {CONFIG_FILE}). Fail-safe: move mouse to top-left.</li>
+            </ul>
+        """)
+        v.addWidget(txt)
+        v.addStretch()
+
+class LogListModel(QtCore.QAbstractListModel):
+    """Capped, shared log model for the Runner and Debug views.
+
+    push() is safe from any thread and only queues the line. The GUI thread
+    is notified once per batch and adds all queued lines in a single insert
+    after LOG_FLUSH_INTERVAL_MS.
+    """
+    pending = QtCore.pyqtSignal()
+
+    def __init__(self, max_lines: int = LOG_VIEW_MAX_LINES, flush_ms: int = LOG_FLUSH_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self.flush_ms = flush_ms
+        self._lines = []
+        self._queue = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self.pending.connect(self._schedule_flush, QtCore.Qt.QueuedConnection)
+
+    def push(self, line: str):
+        with self._lock:
+            first = not self._queue
+            self._queue.append(line)
+        if first:
+            self.pending.emit()
+
+    def _schedule_flush(self):
+        QtCore.QTimer.singleShot(self.flush_ms, self.flush)
+
+    def flush(self):
+        with self._lock:
+            batch = list(self._queue)
+            self._queue.clear()
+        if not batch:
+            return
+        batch = batch[-self.max_lines:]
+        overflow = len(self._lines) + len(batch) - self.max_lines
+        if overflow > 0:
+            self.beginRemoveRows(QtCore.QModelIndex(), 0, overflow - 1)
+            del self._lines[:overflow]
+            self.endRemoveRows()
+        start = len(self._lines)
+        self.beginInsertRows(QtCore.QModelIndex(), start, start + len(batch) - 1)
+        self._lines.extend(batch)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._lines)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and index.isValid():
+            return self._lines[index.row()]
+        return None
+
+    def text(self) -> str:
+        return "\n".join(self._lines)
+
+    def clear(self):
+        self.beginResetModel()
+        self._lines.clear()
+        self.endResetModel()
+
+
+class LogView(QtWidgets.QListView):
+    """Read-only view over a LogListModel that follows new lines while scrolled to the bottom."""
+
+    def __init__(self, model: LogListModel):
+        super().__init__()
+        self.setModel(model)
+        self.setUniformItemSizes(True)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self._follow = True
+        model.rowsAboutToBeInserted.connect(self._check_follow)
+        model.rowsInserted.connect(self._scroll_if_following)
+
+    def _check_follow(self, *_):
+        bar = self.verticalScrollBar()
+        self._follow = bar.value() >= bar.maximum()
+
+    def _scroll_if_following(self, *_):
+        if self._follow:
+            self.scrollToBottom()
+
+
+class LogModelHandler(logging.Handler):
+    def __init__(self, model: LogListModel):
+        super().__init__()
+        self.model = model
+    def emit(self, record):
+        try:
+            self.model.push(self.format(record))
+        except Exception:
+            pass
+
+class AutomationApp(QtWidgets.QMainWindow):
+    def __init__(self, remote=None):
+        super().__init__()
+        self.setWindowTitle(f"{APP_TITLE} - by {APP_AUTHOR}")
+        self.setGeometry(100, 100, 900, 700)
+        self.setWindowIcon(self.style().standardIcon(QtWidgets.QStyle.SP_ComputerIcon))
+
+        self.store = ConfigStore(CONFIG_FILE)
+        self.points = []
+        self.resolver = PointResolver(get_display_backend())
+        self.log_model = LogListModel(parent=self)
+
+        self._build_ui()
+        self._install_gui_logger()
+        self._load_config()
+
+        self.thread = None
+
+        sys.excepthook = self._handle_exception
+
+        self._apply_styles()
+
+        self._start_hotkeys()
+
+        self.remote = remote
+        if remote:
+            self.remote_bridge = RemoteBridge(remote.state, self)
+            self.remote_bridge.start_requested.connect(self.start_automation)
+            self.remote_bridge.stop_requested.connect(self.stop_automation)
+            remote.controller = self.remote_bridge
+
+    def _load_config(self):
+        """Read CONFIG_FILE, or migrate the old QSettings keys on first run, and show the active profile."""
+        if self.store.exists():
+            try:
+                self.store.load()
+            except (OSError, ValueError) as e:
+                bad = CONFIG_FILE + ".bad"
+                logger.error(f"Invalid {CONFIG_FILE}, using defaults. The file was moved to {bad}: {e}")
+                try:
+                    os.replace(CONFIG_FILE, bad)
+                except OSError:
+                    pass
+                QtWidgets.QMessageBox.warning(self, "Settings", f"{e}\n\nDefaults are used; the file was moved to {bad}.")
+        elif migrate_qsettings(self.store):
+            logger.info(f"Imported settings from the previous version into {CONFIG_FILE}.")
+        self._save_config()
+        self._show_profile()
+        self.runner_tab.always_on_top.setChecked(self.store.ui("always_on_top"))
+        self._apply_always_on_top(self.runner_tab.always_on_top.isChecked())
+
+    def _save_config(self):
+        try:
+            changed = self.store.save()
+        except OSError as e:
+            logger.error(f"Could not save {CONFIG_FILE}: {e}")
+            return
+        if changed:
+            logger.info(f"Saved settings: {', '.join(changed[:5])}{' ...' if len(changed) > 5 else ''}")
+
+    def _show_profile(self):
+        """Fill the Runner and Coordinates tabs from the active profile."""
+        config = self.store.profile()
+        tab = self.runner_tab
+        tab.profile_box.clear()
+        tab.profile_box.addItems(self.store.profiles())
+        tab.profile_box.setCurrentText(self.store.active)
+        tab.delete_profile_btn.setEnabled(len(self.store.profiles()) > 1)
+        tab.hours_input.setValue(config.hours)
+        tab.minutes_input.setValue(config.minutes)
+        tab.step_delay.setValue(config.step_delay)
+        tab.max_retries.setValue(config.retries)
+        tab.watchdog_sec.setValue(config.watchdog)
+        tab.step4_wait.setValue(config.step4_wait)
+        tab.dry_run.setChecked(config.dry_run)
+        tab.adaptive_delay.setChecked(config.adaptive_delay)
+        tab.obs_port.setValue(config.obs_port)
+        tab.obs_password.setText(config.obs_password)
+        self.coords_tab.set_points(config.points)
+
+    def current_config(self) -> RunConfig:
+        """The active profile as currently shown in the tabs."""
+        tab = self.runner_tab
+        return RunConfig(
+            hours=tab.hours_input.value(),
+            minutes=tab.minutes_input.value(),
+            step_delay=tab.step_delay.value(),
+            retries=tab.max_retries.value(),
+            watchdog=tab.watchdog_sec.value(),
+            step4_wait=tab.step4_wait.value(),
+            dry_run=tab.dry_run.isChecked(),
+            adaptive_delay=tab.adaptive_delay.isChecked(),
+            obs_port=tab.obs_port.value(),
+            obs_password=tab.obs_password.text(),
+            workflow=self.store.profile().workflow,
+            points=[copy.copy(p) for p in self.points],
+        )
+
+    def _keep_edits(self):
+        self.store.set_profile(self.store.active, self.current_config())
+
+    def _select_profile(self, name: str):
+        if name == self.store.active:
+            return
+        self._keep_edits()
+        self.store.set_active(name)
+        self._save_config()
+        self._show_profile()
+        logger.info(f"Profile '{name}' selected.")
+
+    def _save_profile_as(self):
+        name, ok = QtWidgets.QInputDialog.getText(self, "Save Profile As", "Profile name:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        self.store.set_profile(name, self.current_config())
+        self.store.set_active(name)
+        self._save_config()
+        self._show_profile()
+
+    def _delete_profile(self):
+        name = self.store.active
+        answer = QtWidgets.QMessageBox.question(self, "Delete Profile", f"Delete profile '{name}'?")
+        if answer != QtWidgets.QMessageBox.Yes:
+            return
+        try:
+            self.store.delete_profile(name)
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, "Delete Profile", str(e))
+            return
+        self._save_config()
+        self._show_profile()
+
+    def _import_profile(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Import Profile", "", "Run settings (*.toml *.json)")
+        if not path:
+            return
+        self._keep_edits()
+        try:
+            name = self.store.import_profile(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            QtWidgets.QMessageBox.critical(self, "Import Profile", str(e))
+            return
+        self.store.set_active(name)
+        self._save_config()
+        self._show_profile()
+        logger.info(f"Imported profile '{name}' from {path}")
+
+    def _export_profile(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Profile", f"{self.store.active}.toml",
+                                                        "TOML (*.toml);;JSON (*.json)")
+        if not path:
+            return
+        self._keep_edits()
+        try:
+            self.store.export_profile(path)
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, "Export Profile", str(e))
+            return
+        logger.info(f"Exported profile '{self.store.active}' to {path}")
+
+    def _save_coordinates(self):
+        self.store.set_points(self.points)
+        self._save_config()
+        QtWidgets.QMessageBox.information(self, "Saved", "Coordinates saved.")
+
+    def _reload_coordinates(self):
+        self.coords_tab.set_points(self.store.profile().points)
+        QtWidgets.QMessageBox.information(self, "Loaded", "Coordinates reloaded.")
+
+    def _build_ui(self):
+        self.tabs = QtWidgets.QTabWidget()
+        self.runner_tab = RunnerTab(self.log_model)
+        self.coords_tab = CoordinatesTab(self.points, self.resolver)
+        self.debug_tab = DebugTab(self.log_model)
+        self.help_tab = HelpTab()
+
+        self.tabs.addTab(self.runner_tab, "Runner")
+        self.tabs.addTab(self.coords_tab, "Coordinates")
+        self.tabs.addTab(self.debug_tab, "Debug")
+        self.tabs.addTab(self.help_tab, "Help")
+
+        self.setCentralWidget(self.tabs)
+        self.countdown = Countdown(self.runner_tab.timer_label, self.runner_tab.progress, self)
+        self.tabs.currentChanged.connect(lambda _: self.countdown.render())
+
+        self.runner_tab.start_clicked.connect(self.start_automation)
+        self.runner_tab.stop_clicked.connect(self.stop_automation)
+        self.runner_tab.profile_selected.connect(self._select_profile)
+        self.runner_tab.save_profile_as_clicked.connect(self._save_profile_as)
+        self.runner_tab.delete_profile_clicked.connect(self._delete_profile)
+        self.coords_tab.save_clicked.connect(self._save_coordinates)
+        self.coords_tab.reload_clicked.connect(self._reload_coordinates)
+        self.runner_tab.always_on_top.stateChanged.connect(
+            lambda _: self._apply_always_on_top(self.runner_tab.always_on_top.isChecked())
+        )
+
+        menubar = self.menuBar()
+        file_menu = menubar.addMenu("&File")
+        act_open_log = file_menu.addAction("Open Log")
+        act_open_log.triggered.connect(lambda: QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(LOG_FILE)))
+        file_menu.addSeparator()
+        file_menu.addAction("Import Profile...").triggered.connect(self._import_profile)
+        file_menu.addAction("Export Profile...").triggered.connect(self._export_profile)
+        file_menu.addSeparator()
+        act_exit = file_menu.addAction("Exit")
+        act_exit.triggered.connect(self.close)
+
+        view_menu = menubar.addMenu("&View")
+        self.act_ontop = view_menu.addAction("Always on Top")
+        self.act_ontop.setCheckable(True)
+        self.act_ontop.setChecked(self.runner_tab.always_on_top.isChecked())
+        self.act_ontop.triggered.connect(lambda checked: self.runner_tab.always_on_top.setChecked(checked))
+
+        self.statusBar().showMessage("Ready")
+
+    def _apply_always_on_top(self, enabled: bool):
+        flags = self.windowFlags()
+        if enabled:
+            flags |= QtCore.Qt.WindowStaysOnTopHint
+        else:
+            flags &= ~QtCore.Qt.WindowStaysOnTopHint
+        self.setWindowFlags(flags)
+        self.show()
+        self.store.set_ui("always_on_top", enabled)
+        self._save_config()
+        self.act_ontop.setChecked(enabled)
+
+    def _apply_styles(self):
+        self.setStyleSheet("""
+            QMainWindow { background: #121212; color: #eaeaea; }
+            QLabel, QCheckBox, QMenuBar, QMenu, QStatusBar { color: #eaeaea; }
+            QMenuBar { background: #1a1a1a; }
+            QMenu { background: #1a1a1a; border: 1px solid #333; }
+            QStatusBar { background: #1a1a1a; }
+            QTabWidget::pane { border: 1px solid #333; top: -1px; background: #121212; }
+            QTabBar { font-weight: 600; }
+            QTabBar::tab {
+                background: #ffffff; color: #000000; padding: 8px 16px; margin-right: 2px;
+                border: 1px solid #c9c9c9; border-top-left-radius: 6px; border-top-right-radius: 6px;
+            }
+            QTabBar::tab:selected { background: #ffffff; color: #000000; border-color: #8aa8ff; border-bottom-color: #ffffff; margin-bottom: -1px; }
+            QTabBar::tab:!selected { background: #f2f2f2; color: #000000; }
+            QTabBar::tab:hover { background: #fafafa; }
+            QTabBar::tab:disabled { color: #888888; background: #f5f5f5; }
+            QTextEdit, QListView, QSpinBox, QTableWidget, QPushButton, QProgressBar, QCheckBox {
+                background: #1a1a1a; color: #eaeaea; border: 1px solid #333;
+            }
+            QPushButton:hover { border: 1px solid #555; }
+            QProgressBar::chunk { background: #3d85c6; }
+            QHeaderView::section { background: #1a1a1a; color: #eaeaea; border: 1px solid #333; }
+        """)
+
+    def _install_gui_logger(self):
+        self._log_handler = LogModelHandler(self.log_model)
+        self._log_handler.setLevel(logging.INFO)
+        self._log_handler.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s - %(message)s", "%H:%M:%S"))
+        logger.addHandler(self._log_handler)
+        logger.info(f"===== Session started. Author: {APP_AUTHOR} =====")
+
+    def _make_thread(self, resume: dict = None):
+        hours = self.runner_tab.hours_input.value()
+        mins = self.runner_tab.minutes_input.value()
+        total_sec = hours * 3600 + mins * 60
+        t = AutomationThread(
+            points=[copy.copy(p) for p in self.points],
+            long_wait_seconds=total_sec,
+            step_delay=self.runner_tab.step_delay.value(),
+            max_retries=self.runner_tab.max_retries.value(),
+            watchdog_seconds=self.runner_tab.watchdog_sec.value(),
+            step4_wait_sec=self.runner_tab.step4_wait.value(),
+            dry_run=self.runner_tab.dry_run.isChecked(),
+            adaptive_delay=self.runner_tab.adaptive_delay.isChecked(),
+            obs=get_obs_controller(self.runner_tab.obs_port.value(), self.runner_tab.obs_password.text()),
+            workflow=load_workflow(self.store.profile().workflow),
+            state_file=STATE_FILE,
+            resume=resume,
+        )
+        t.log_signal.connect(self._log)
+        t.status_signal.connect(self._update_status)
+        t.countdown_signal.connect(self.countdown.start)
+        t.stop_signal.connect(self._on_thread_stopped)
+        t.error_popup_signal.connect(self._error_popup)
+        if self.remote:
+            self.remote.state.attach(t.runner)
+        return t
+
+    def offer_resume(self):
+        """Ask to continue a run that was cut short (crash, power loss) from its last checkpoint."""
+        try:
+            point = load_resume_point(load_workflow(self.store.profile().workflow))
+        except (OSError, ValueError) as e:
+            logger.error(f"Invalid workflow: {e}")
+            return
+        if not point:
+            return
+        answer = QtWidgets.QMessageBox.question(
+            self, "Resume Previous Run",
+            f"The last run did not finish. {describe_resume_point(point)}\n\nResume where it left off?",
+        )
+        if answer == QtWidgets.QMessageBox.Yes:
+            self.start_automation(resume=point)
+
+    def start_automation(self, resume: dict = None):
+        self._keep_edits()
+        self._save_config()
+
+        if self.thread and self.thread.isRunning():
+            QtWidgets.QMessageBox.warning(self, "Already running", "Automation is already running.")
+            return
+
+        try:
+            self.thread = self._make_thread(resume)
+        except (OSError, ValueError) as e:
+            logger.error(f"Invalid workflow: {e}")
+            QtWidgets.QMessageBox.critical(self, "Workflow Error", str(e))
+            return
+        self.runner_tab.start_btn.setEnabled(False)
+        self.runner_tab.stop_btn.setEnabled(True)
+        self.thread.start()
+        self.statusBar().showMessage("Automation running")
+        logger.info("Automation started")
+
+    def stop_automation(self):
+        if self.thread:
+            try:
+                self.thread.stop()
+            except Exception:
+                pass
+            try:
+                # Give the thread a moment to exit cooperatively
+                self.thread.wait(2000)
+            except Exception:
+                pass
+            self.thread = None
+        self._on_thread_stopped()
+
+    def _on_thread_stopped(self):
+        self.runner_tab.start_btn.setEnabled(True)
+        self.runner_tab.stop_btn.setEnabled(False)
+        self.countdown.start(0.0, 0.0)
+        self.statusBar().showMessage("Stopped")
+        logger.info("Automation stopped")
+
+    def _log(self, message: str):
+        logger.info(message)
+
+    def _update_status(self, status: str):
+        self.runner_tab.status_label.setText(status)
+
+    def changeEvent(self, event: QtCore.QEvent):
+        if event.type() in (QtCore.QEvent.WindowStateChange, QtCore.QEvent.ActivationChange):
+            self.countdown.render()
+        super().changeEvent(event)
+
+    def _start_hotkeys(self):
+        """Bind the stop and capture keys from the settings file; delivered by key events, not polling."""
+        keys = {name: self.store.ui(name) for name in ("stop_key", "capture_key", "cancel_key")}
+        self.hotkey_keys = keys
+        self.hotkey_bridge = HotkeyBridge(self)
+        self.hotkey_bridge.pressed.connect(self._on_hotkey)
+        self.hotkeys = HotkeyManager(get_hotkey_backend())
+        for key in set(keys.values()):
+            self.hotkeys.bind(key, self.hotkey_bridge.pressed.emit)
+        self.hotkeys.start()
+        if not self.hotkeys.available:
+            logger.warning("Global hotkeys are not available on this system; they work only while this window has focus.")
+            QtWidgets.QApplication.instance().installEventFilter(self.hotkey_bridge)
+        self.coords_tab.set_keys(keys["capture_key"], keys["cancel_key"])
+        self.coords_tab.global_hotkeys = self.hotkeys.available
+        self.runner_tab.hotkey_label.setText(
+            f"Hotkeys: {key_label(keys['stop_key'])} = Emergency Stop • Capture: {key_label(keys['capture_key'])}"
+            f" • {key_label(keys['cancel_key'])} = cancel capture")
+
+    def _on_hotkey(self, key: str):
+        overlay = self.coords_tab.overlay
+        if overlay is not None and key in (self.hotkey_keys["capture_key"], self.hotkey_keys["cancel_key"]):
+            overlay.on_key(key)
+            return
+        if key == self.hotkey_keys["stop_key"] and self.thread and self.thread.isRunning():
+            logger.info(f"Emergency stop: {key_label(key)} key pressed.")
+            try:
+                self.stop_automation()
+            except Exception:
+                logger.exception("Emergency stop failed")
+
+    def _handle_exception(self, etype, value, tb):
+        msg = "".join(traceback.format_exception(etype, value, tb))
+        logger.exception("Unhandled exception:\n" + msg)
+        QtWidgets.QMessageBox.critical(self, "Unhandled Error", str(value))
+
+    def _error_popup(self, message: str):
+        QtWidgets.QMessageBox.critical(self, "Error", message)
+
+    def closeEvent(self, event: QtGui.QCloseEvent):
+        try:
+            if self.thread and self.thread.isRunning():
+                self.stop_automation()
+        finally:
+            self.hotkeys.stop()
+            logger.removeHandler(self._log_handler)
+            shutdown_logging()
+            super().closeEvent(event)
+
+class FirstPaintProbe(QtCore.QObject):
+    """Marks the first paint of a widget on a StartupProfiler, reports, and quits."""
+
+    def __init__(self, app, profiler, budget_ms=None):
+        super().__init__()
+        self.app = app
+        self.profiler = profiler
+        self.budget_ms = budget_ms
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint:
+            obj.removeEventFilter(self)
+            QtCore.QTimer.singleShot(0, self._finish)
+        return False
+
+    def _finish(self):
+        self.profiler.mark("first paint")
+        self.app.exit(self.profiler.report(self.budget_ms))
+
+
+def run(argv=None, profiler=None, budget_ms=None, remote=None):
+    try:
+        app = QtWidgets.QApplication(argv if argv is not None else sys.argv)
+        app.setApplicationName("AutoRunnerPro")
+        app.setOrganizationName("xTheRedShirtx")
+        if profiler:
+            profiler.mark("QApplication")
+        window = AutomationApp(remote=remote)
+        if profiler:
+            profiler.mark("main window built")
+            probe = FirstPaintProbe(app, profiler, budget_ms)
+            window.installEventFilter(probe)
+        window.show()
+        if not profiler:
+            QtCore.QTimer.singleShot(0, window.offer_resume)
+        sys.exit(app.exec_())
+    except Exception as e:
+        logger.exception("Fatal error in main")
+        try:
+            QtWidgets.QMessageBox.critical(None, "Fatal Error", str(e))
+        except Exception:
+            pass
+        sys.exit(1)
@@ -0,0 +1,379 @@
+import glob
+import logging
+import os
+import selectors
+import struct
+import sys
+import threading
+
+"""
+Automated Task Runner (Pro) - global hotkeys
+Author: xTheRedShirtx
+
+Key presses are delivered by the operating system instead of polled:
+a low-level keyboard hook on Windows, the X11 RECORD extension (needs
+python-xlib) or raw evdev devices on Linux. Backends call back on their own
+thread; HotkeyManager turns that into one callback per key press.
+"""
+
+# name -> (Windows virtual-key code, Linux evdev key code, X11 keysym name)
+KEYS = {
+    "esc": (0x1B, 1, "Escape"),
+    "delete": (0x2E, 111, "Delete"),
+    "insert": (0x2D, 110, "Insert"),
+    "home": (0x24, 102, "Home"),
+    "end": (0x23, 107, "End"),
+    "pageup": (0x21, 104, "Prior"),
+    "pagedown": (0x22, 109, "Next"),
+    "pause": (0x13, 119, "Pause"),
+    "scrolllock": (0x91, 70, "Scroll_Lock"),
+    "space": (0x20, 57, "space"),
+    "enter": (0x0D, 28, "Return"),
+    "tab": (0x09, 15, "Tab"),
+    "backspace": (0x08, 14, "BackSpace"),
+    "lctrl": (0xA2, 29, "Control_L"),
+    "rctrl": (0xA3, 97, "Control_R"),
+    "lshift": (0xA0, 42, "Shift_L"),
+    "rshift": (0xA1, 54, "Shift_R"),
+    "lalt": (0xA4, 56, "Alt_L"),
+    "ralt": (0xA5, 100, "Alt_R"),
+}
+KEYS.update({f"f{i}": (0x6F + i, code, f"F{i}")
+             for i, code in zip(range(1, 13), (59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 87, 88))})
+KEYS.update({c: (ord(c.upper()), code, c)
+             for c, code in zip("qwertyuiop", range(16, 26))})
+KEYS.update({c: (ord(c.upper()), code, c)
+             for c, code in zip("asdfghjkl", range(30, 39))})
+KEYS.update({c: (ord(c.upper()), code, c)
+             for c, code in zip("zxcvbnm", range(44, 51))})
+KEYS.update({d: (ord(d), code, d) for d, code in zip("1234567890", range(2, 12))})
+
+KEY_LABELS = {"esc": "Esc", "lctrl": "Left Ctrl", "rctrl": "Right Ctrl", "lshift": "Left Shift",
+              "rshift": "Right Shift", "lalt": "Left Alt", "ralt": "Right Alt", "pageup": "Page Up",
+              "pagedown": "Page Down", "scrolllock": "Scroll Lock"}
+
+
+def check_key(name: str) -> str:
+    """Normalised key name; ValueError for keys the backends cannot report."""
+    key = str(name).strip().lower()
+    if key not in KEYS:
+        raise ValueError(f"unknown key {name!r}; use one of {', '.join(sorted(KEYS))}")
+    return key
+
+
+def key_label(name: str) -> str:
+    return KEY_LABELS.get(name, name.upper() if len(name) <= 3 else name.capitalize())
+
+
+class HotkeyBackend:
+    """Reports global key presses and releases as callback(key name, down) on a background thread."""
+
+    def start(self, callback):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+
+class Win32HookBackend(HotkeyBackend):
+    """WH_KEYBOARD_LL hook on a dedicated thread; the thread sleeps in GetMessage between key events."""
+
+    def __init__(self):
+        self._thread = None
+        self._thread_id = 0
+        self._proc = None
+        self._error = None
+
+    def start(self, callback):
+        """Install the hook. Raises OSError if Windows refuses it, so HotkeyManager falls back."""
+        ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(callback, ready), name="hotkey-hook", daemon=True)
+        self._thread.start()
+        if not ready.wait(2.0):
+            raise OSError("keyboard hook thread did not start")
+        if self._error:
+            raise OSError(self._error)
+
+    def _run(self, callback, ready):
+        try:
+            self._hook(callback, ready)
+        except Exception as e:
+            self._error = f"keyboard hook failed: {e}"
+            ready.set()
+
+    def _hook(self, callback, ready):
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+        class KBDLLHOOKSTRUCT(ctypes.Structure):
+            _fields_ = [("vkCode", wintypes.DWORD), ("scanCode", wintypes.DWORD), ("flags", wintypes.DWORD),
+                        ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+        LRESULT = ctypes.c_ssize_t
+        HOOKPROC = ctypes.WINFUNCTYPE(LRESULT, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        user32.SetWindowsHookExW.argtypes = [ctypes.c_int, HOOKPROC, wintypes.HINSTANCE, wintypes.DWORD]
+        user32.SetWindowsHookExW.restype = wintypes.HHOOK
+        user32.CallNextHookEx.argtypes = [wintypes.HHOOK, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM]
+        user32.CallNextHookEx.restype = LRESULT
+        kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+        names = {vk: name for name, (vk, _code, _sym) in KEYS.items()}
+        down_messages = (0x0100, 0x0104)  # WM_KEYDOWN, WM_SYSKEYDOWN
+
+        def proc(code, wparam, lparam):
+            if code == 0:  # HC_ACTION
+                info = ctypes.cast(lparam, ctypes.POINTER(KBDLLHOOKSTRUCT)).contents
+                name = names.get(info.vkCode)
+                if name:
+                    try:
+                        callback(name, wparam in down_messages)
+                    except Exception:
+                        logging.getLogger("automation").exception("Hotkey callback failed")
+            return user32.CallNextHookEx(None, code, wparam, lparam)
+
+        self._proc = HOOKPROC(proc)  # must outlive the hook
+        hook = user32.SetWindowsHookExW(13, self._proc, kernel32.GetModuleHandleW(None), 0)  # WH_KEYBOARD_LL
+        if not hook:
+            self._error = f"keyboard hook failed (error {ctypes.get_last_error()})"
+            ready.set()
+            return
+        self._thread_id = kernel32.GetCurrentThreadId()
+        ready.set()
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            pass
+        user32.UnhookWindowsHookEx(hook)
+
+    def stop(self):
+        if self._thread_id:
+            import ctypes
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, 0x0012, 0, 0)  # WM_QUIT
+            self._thread.join(1.0)
+            self._thread_id = 0
+
+
+class X11RecordBackend(HotkeyBackend):
+    """X11 RECORD extension: sees every key event on the display without grabbing keys. Needs python-xlib."""
+
+    def __init__(self):
+        from Xlib import display  # noqa: F401  (fail here, not on the thread, if python-xlib is missing)
+        self._ctrl = None
+        self._ctx = None
+        self._thread = None
+
+    def start(self, callback):
+        from Xlib import X, XK, display
+        from Xlib.ext import record
+        from Xlib.protocol import rq
+
+        self._ctrl = display.Display()
+        data = display.Display()
+        names = {}
+        for name, (_vk, _code, sym) in KEYS.items():
+            keysym = XK.string_to_keysym(sym)
+            for keycode, _index in data.keysym_to_keycodes(keysym):
+                names[keycode] = name
+        self._ctx = self._ctrl.record_create_context(0, [record.AllClients], [{
+            "core_requests": (0, 0), "core_replies": (0, 0), "ext_requests": (0, 0, 0, 0),
+            "ext_replies": (0, 0, 0, 0), "delivered_events": (0, 0),
+            "device_events": (X.KeyPress, X.KeyRelease), "errors": (0, 0),
+            "client_started": False, "client_died": False,
+        }])
+
+        def handler(reply):
+            if reply.category != record.FromServer or reply.client_swapped or not reply.data:
+                return
+            raw = reply.data
+            while raw:
+                event, raw = rq.EventField(None).parse_binary_value(raw, data.display, None, None)
+                name = names.get(event.detail)
+                if name:
+                    try:
+                        callback(name, event.type == X.KeyPress)
+                    except Exception:
+                        logging.getLogger("automation").exception("Hotkey callback failed")
+
+        def run():
+            data.record_enable_context(self._ctx, handler)
+            data.record_free_context(self._ctx)
+            data.close()
+
+        self._thread = threading.Thread(target=run, name="hotkey-x11", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._ctrl and self._ctx:
+            self._ctrl.record_disable_context(self._ctx)
+            self._ctrl.flush()
+            self._thread.join(1.0)
+            self._ctrl.close()
+            self._ctrl = self._ctx = None
+
+
+_EVENT = struct.Struct("llHHi")  # struct input_event: timeval, type, code, value
+_EV_KEY = 1
+
+
+def keyboard_devices() -> list:
+    """Readable evdev keyboard devices (the user must be allowed to read /dev/input, e.g. the input group)."""
+    paths = glob.glob("/dev/input/by-path/*-event-kbd") + glob.glob("/dev/input/by-id/*-event-kbd")
+    devices = sorted({os.path.realpath(p) for p in paths})
+    return [d for d in devices if os.access(d, os.R_OK)]
+
+
+class EvdevBackend(HotkeyBackend):
+    """Reads key events straight from /dev/input keyboards. Works without X (Wayland, console)."""
+
+    def __init__(self, paths: list = None):
+        self.paths = paths if paths is not None else keyboard_devices()
+        self._thread = None
+        self._wake = None
+
+    def start(self, callback):
+        names = {code: name for name, (_vk, code, _sym) in KEYS.items()}
+        sel = selectors.DefaultSelector()
+        fds = []
+        for path in self.paths:
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError as e:
+                logging.getLogger("automation").warning(f"Cannot read {path}: {e}")
+                continue
+            fds.append(fd)
+            sel.register(fd, selectors.EVENT_READ)
+        wake_r, self._wake = os.pipe()
+        sel.register(wake_r, selectors.EVENT_READ)
+
+        def run():
+            try:
+                while True:
+                    for key, _mask in sel.select():
+                        if key.fd == wake_r:
+                            return
+                        try:
+                            raw = os.read(key.fd, _EVENT.size * 64)
+                        except BlockingIOError:
+                            continue
+                        except OSError:
+                            sel.unregister(key.fd)  # device unplugged
+                            continue
+                        for _s, _us, kind, code, value in _EVENT.iter_unpack(raw[:len(raw) - len(raw) % _EVENT.size]):
+                            name = names.get(code) if kind == _EV_KEY else None
+                            if name:
+                                try:
+                                    callback(name, value != 0)  # 1 = press, 2 = auto-repeat, 0 = release
+                                except Exception:
+                                    logging.getLogger("automation").exception("Hotkey callback failed")
+            finally:
+                for fd in fds + [wake_r]:
+                    os.close(fd)
+                sel.close()
+
+        self._thread = threading.Thread(target=run, name="hotkey-evdev", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._wake is not None:
+            os.write(self._wake, b"x")
+            self._thread.join(1.0)
+            os.close(self._wake)
+            self._wake = None
+
+
+class FakeHotkeyBackend(HotkeyBackend):
+    """Keys are pressed from code (tests, simulations); callbacks run on the calling thread."""
+
+    def __init__(self):
+        self.callback = None
+
+    def start(self, callback):
+        self.callback = callback
+
+    def stop(self):
+        self.callback = None
+
+    def press(self, name: str):
+        if self.callback:
+            self.callback(check_key(name), True)
+
+    def release(self, name: str):
+        if self.callback:
+            self.callback(check_key(name), False)
+
+    def tap(self, name: str):
+        self.press(name)
+        self.release(name)
+
+
+class HotkeyManager:
+    """Key bindings on top of a backend. Each binding fires once per press (auto-repeat is ignored)."""
+
+    def __init__(self, backend: HotkeyBackend = None):
+        self.backend = backend
+        self._bindings = {}
+        self._down = set()
+        self._lock = threading.Lock()
+        self._started = False
+
+    @property
+    def available(self) -> bool:
+        return self.backend is not None
+
+    def bind(self, key: str, callback):
+        key = check_key(key)
+        with self._lock:
+            self._bindings.setdefault(key, []).append(callback)
+
+    def unbind(self, key: str, callback):
+        with self._lock:
+            callbacks = self._bindings.get(check_key(key), [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def start(self):
+        if self.backend and not self._started:
+            try:
+                self.backend.start(self._on_key)
+                self._started = True
+            except Exception as e:
+                logging.getLogger("automation").error(f"Global hotkeys unavailable: {e}")
+                self.backend = None
+
+    def stop(self):
+        if self.backend and self._started:
+            self.backend.stop()
+            self._started = False
+
+    def _on_key(self, key: str, down: bool):
+        with self._lock:
+            if not down:
+                self._down.discard(key)
+                return
+            if key in self._down:
+                return
+            self._down.add(key)
+            callbacks = list(self._bindings.get(key, ()))
+        for callback in callbacks:
+            callback(key)
+
+
+_hotkey_backend = None
+
+def get_hotkey_backend():
+    """The platform hotkey backend, or None where global key events cannot be read."""
+    global _hotkey_backend
+    if _hotkey_backend is None:
+        _hotkey_backend = False
+        try:
+            if sys.platform == "win32":
+                _hotkey_backend = Win32HookBackend()
+            elif os.environ.get("DISPLAY"):
+                _hotkey_backend = X11RecordBackend()
+        except ImportError:
+            pass
+        if not _hotkey_backend and sys.platform.startswith("linux") and keyboard_devices():
+            _hotkey_backend = EvdevBackend()
+    return _hotkey_backend or None
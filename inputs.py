@@ -0,0 +1,480 @@
+import os
+import struct
+import time
+
+import hotkeys
+
+"""
+Automated Task Runner (Pro) - input backends
+Author: xTheRedShirtx
+
+Mouse and keyboard output without pyautogui's pause after every call: Win32
+SendInput on Windows, the XTEST extension on X11 (needs python-xlib) or a
+virtual /dev/uinput device on any Linux (X11, Wayland or none), plus an
+in-memory recorder. Each action goes out as one batch of events.
+"""
+
+# pyautogui-style names used in workflows -> hotkeys.KEYS names
+KEY_ALIASES = {"ctrl": "lctrl", "control": "lctrl", "shift": "lshift", "alt": "lalt", "return": "enter",
+               "escape": "esc", "del": "delete", "pgup": "pageup", "pgdn": "pagedown"}
+
+# keys that are sent but never bound as hotkeys: name -> (virtual-key, evdev code, X11 keysym name)
+EXTRA_KEYS = {
+    "up": (0x26, 103, "Up"),
+    "down": (0x28, 108, "Down"),
+    "left": (0x25, 105, "Left"),
+    "right": (0x27, 106, "Right"),
+    "win": (0x5B, 125, "Super_L"),
+    "capslock": (0x14, 58, "Caps_Lock"),
+    "numlock": (0x90, 69, "Num_Lock"),
+    "printscreen": (0x2C, 99, "Print"),
+    "menu": (0x5D, 127, "Menu"),
+}
+EXTRA_KEYS.update({f"f{i}": (0x6F + i, 170 + i, f"F{i}") for i in range(13, 25)})  # F13..F24, often used for OBS
+
+# evdev codes for text on a US layout: char -> (code, shift)
+_US_SYMBOLS = {"-": (12, False), "=": (13, False), "[": (26, False), "]": (27, False), ";": (39, False),
+               "'": (40, False), "`": (41, False), "\\": (43, False), ",": (51, False), ".": (52, False),
+               "/": (53, False), " ": (57, False), "\n": (28, False), "\t": (15, False),
+               "_": (12, True), "+": (13, True), "{": (26, True), "}": (27, True), ":": (39, True),
+               "\"": (40, True), "~": (41, True), "|": (43, True), "<": (51, True), ">": (52, True),
+               "?": (53, True)}
+_US_SHIFTED_DIGITS = dict(zip("!@#$%^&*()", "1234567890"))
+
+
+class FailSafeError(Exception):
+    """The mouse is in the top-left corner: the user asked every run to stop."""
+
+
+def key_codes(name: str) -> tuple:
+    """(virtual-key, evdev code, X11 keysym name) for a key name such as "ctrl", "s", "f5" or "up"."""
+    key = str(name).strip().lower()
+    key = KEY_ALIASES.get(key, key)
+    if key in EXTRA_KEYS:
+        return EXTRA_KEYS[key]
+    if key in hotkeys.KEYS:
+        return hotkeys.KEYS[key]
+    raise ValueError(f"unknown key {name!r}")
+
+
+def us_layout_code(ch: str) -> tuple:
+    """(evdev code, shift) for a character on a US keyboard."""
+    if ch in _US_SYMBOLS:
+        return _US_SYMBOLS[ch]
+    if ch in _US_SHIFTED_DIGITS:
+        return hotkeys.KEYS[_US_SHIFTED_DIGITS[ch]][1], True
+    if ch.lower() in hotkeys.KEYS and len(ch) == 1:
+        return hotkeys.KEYS[ch.lower()][1], ch.isupper()
+    raise ValueError(f"cannot type {ch!r} with a US keyboard layout; use \"method\": \"paste\"")
+
+
+class InputDriver:
+    """Sends mouse and keyboard input."""
+
+    reads_position = True  # False where position() cannot work; check it instead of catching the error
+
+    def click(self, x: int, y: int):
+        raise NotImplementedError
+
+    def typewrite(self, text: str):
+        raise NotImplementedError
+
+    def hotkey(self, *keys: str):
+        raise NotImplementedError
+
+    def press(self, key: str):
+        raise NotImplementedError
+
+    def position(self) -> tuple:
+        """Mouse position (x, y)."""
+        raise NotImplementedError
+
+    def get_clipboard(self) -> str:
+        raise NotImplementedError
+
+    def set_clipboard(self, text: str):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def _pyperclip():
+    import pyperclip  # installed with pyautogui; needs xclip, xsel or wl-clipboard on Linux
+    return pyperclip
+
+
+class Win32Clipboard:
+    """Unicode text on the Windows clipboard through user32/kernel32."""
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+    OPEN_ATTEMPTS = 10            # another app may hold the clipboard for a moment
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._user32.GetClipboardData.restype = wintypes.HANDLE
+        self._user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+        self._user32.SetClipboardData.restype = wintypes.HANDLE
+        self._kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+        self._kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+        self._kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+        self._kernel32.GlobalLock.restype = ctypes.c_void_p
+        self._kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+
+    def _open(self):
+        for _ in range(self.OPEN_ATTEMPTS):
+            if self._user32.OpenClipboard(None):
+                return
+            time.sleep(0.01)
+        raise OSError("the clipboard is in use by another program")
+
+    def get_text(self) -> str:
+        self._open()
+        try:
+            handle = self._user32.GetClipboardData(self.CF_UNICODETEXT)
+            if not handle:
+                return ""
+            pointer = self._kernel32.GlobalLock(handle)
+            try:
+                return self._ctypes.wstring_at(pointer)
+            finally:
+                self._kernel32.GlobalUnlock(handle)
+        finally:
+            self._user32.CloseClipboard()
+
+    def set_text(self, text: str):
+        data = self._ctypes.create_unicode_buffer(text)
+        size = self._ctypes.sizeof(data)
+        self._open()
+        try:
+            self._user32.EmptyClipboard()
+            handle = self._kernel32.GlobalAlloc(self.GMEM_MOVEABLE, size)
+            pointer = self._kernel32.GlobalLock(handle)
+            self._ctypes.memmove(pointer, data, size)
+            self._kernel32.GlobalUnlock(handle)
+            if not self._user32.SetClipboardData(self.CF_UNICODETEXT, handle):
+                raise OSError("SetClipboardData failed")
+        finally:
+            self._user32.CloseClipboard()
+
+
+class Win32InputDriver(InputDriver):
+    """SendInput: a click is one call of two mouse events, a string one call of Unicode key events."""
+    INPUT_MOUSE = 0
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_EXTENDEDKEY = 0x0001
+    KEYEVENTF_KEYUP = 0x0002
+    KEYEVENTF_UNICODE = 0x0004
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+    EXTENDED_KEYS = {0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2D, 0x2E, 0x5B, 0xA3, 0xA5}
+    TEXT_KEYS = {"\n": 0x0D, "\t": 0x09}
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [("wVk", wintypes.WORD), ("wScan", wintypes.WORD), ("dwFlags", wintypes.DWORD),
+                        ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG), ("mouseData", wintypes.DWORD),
+                        ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+        class _INPUTUNION(ctypes.Union):
+            _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._KEYBDINPUT = KEYBDINPUT
+        self._MOUSEINPUT = MOUSEINPUT
+        self._INPUT = INPUT
+        self._user32 = ctypes.windll.user32
+        try:
+            self._user32.SetProcessDPIAware()  # coordinates are physical pixels, as captured
+        except Exception:
+            pass
+        self._clipboard = None
+
+    def _send(self, events: list):
+        """events: ("key", vk, scan, flags) or ("mouse", flags) tuples, sent as one SendInput call."""
+        if not events:
+            return
+        inputs = (self._INPUT * len(events))()
+        for item, event in zip(inputs, events):
+            if event[0] == "key":
+                item.type = self.INPUT_KEYBOARD
+                item.u.ki = self._KEYBDINPUT(event[1], event[2], event[3], 0, 0)
+            else:
+                item.type = self.INPUT_MOUSE
+                item.u.mi = self._MOUSEINPUT(0, 0, 0, event[1], 0, 0)
+        sent = self._user32.SendInput(len(events), inputs, self._ctypes.sizeof(self._INPUT))
+        if sent != len(events):
+            # Blocked by another desktop or a higher-integrity window in front
+            raise OSError(f"SendInput delivered {sent} of {len(events)} input events")
+
+    def _check_failsafe(self):
+        if self.position() == (0, 0):
+            raise FailSafeError("mouse moved to the top-left corner")
+
+    def position(self) -> tuple:
+        point = self._wintypes.POINT()
+        self._user32.GetCursorPos(self._ctypes.byref(point))
+        return point.x, point.y
+
+    def click(self, x: int, y: int):
+        self._check_failsafe()
+        self._user32.SetCursorPos(int(x), int(y))
+        self._send([("mouse", self.MOUSEEVENTF_LEFTDOWN), ("mouse", self.MOUSEEVENTF_LEFTUP)])
+
+    def text_events(self, text: str) -> list:
+        events = []
+        for ch in text:
+            vk = self.TEXT_KEYS.get(ch)
+            if vk:
+                events += [("key", vk, 0, 0), ("key", vk, 0, self.KEYEVENTF_KEYUP)]
+                continue
+            data = ch.encode("utf-16-le")
+            for i in range(0, len(data), 2):
+                unit = int.from_bytes(data[i:i + 2], "little")
+                events += [("key", 0, unit, self.KEYEVENTF_UNICODE),
+                           ("key", 0, unit, self.KEYEVENTF_UNICODE | self.KEYEVENTF_KEYUP)]
+        return events
+
+    def typewrite(self, text: str):
+        self._check_failsafe()
+        self._send(self.text_events(text))
+
+    def hotkey(self, *keys: str):
+        self._check_failsafe()
+        vks = [key_codes(k)[0] for k in keys]
+        flags = [self.KEYEVENTF_EXTENDEDKEY if vk in self.EXTENDED_KEYS else 0 for vk in vks]
+        down = [("key", vk, 0, f) for vk, f in zip(vks, flags)]
+        up = [("key", vk, 0, f | self.KEYEVENTF_KEYUP) for vk, f in reversed(list(zip(vks, flags)))]
+        self._send(down + up)
+
+    def press(self, key: str):
+        self.hotkey(key)
+
+    def get_clipboard(self) -> str:
+        if self._clipboard is None:
+            self._clipboard = Win32Clipboard()
+        return self._clipboard.get_text()
+
+    def set_clipboard(self, text: str):
+        if self._clipboard is None:
+            self._clipboard = Win32Clipboard()
+        self._clipboard.set_text(text)
+
+
+class X11InputDriver(InputDriver):
+    """XTEST fake input on the X display; one round trip per action. Needs python-xlib."""
+
+    def __init__(self):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        self._display = display.Display()
+        if not self._display.has_extension("XTEST"):
+            self._display.close()
+            raise OSError("the X server has no XTEST extension")
+
+    def position(self) -> tuple:
+        pointer = self._display.screen().root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def _check_failsafe(self):
+        if self.position() == (0, 0):
+            raise FailSafeError("mouse moved to the top-left corner")
+
+    def click(self, x: int, y: int):
+        self._check_failsafe()
+        fake = self._xtest.fake_input
+        fake(self._display, self._X.MotionNotify, x=int(x), y=int(y))
+        fake(self._display, self._X.ButtonPress, 1)
+        fake(self._display, self._X.ButtonRelease, 1)
+        self._display.sync()
+
+    def _keycode(self, keysym: int, what) -> int:
+        keycode = self._display.keysym_to_keycode(keysym)
+        if not keycode:
+            raise ValueError(f"{what!r} is not on the current keyboard layout")
+        return keycode
+
+    def _keys(self, keycodes: list):
+        fake = self._xtest.fake_input
+        for keycode in keycodes:
+            fake(self._display, self._X.KeyPress, keycode)
+        for keycode in reversed(keycodes):
+            fake(self._display, self._X.KeyRelease, keycode)
+
+    def typewrite(self, text: str):
+        self._check_failsafe()
+        shift = self._keycode(self._XK.string_to_keysym("Shift_L"), "Shift_L")
+        for ch in text:
+            if ch in ("\n", "\t"):
+                keysym = self._XK.string_to_keysym("Return" if ch == "\n" else "Tab")
+            elif ord(ch) < 0x100:
+                keysym = ord(ch)  # Latin-1 keysyms equal the code point
+            else:
+                keysym = 0x01000000 + ord(ch)
+            keycode = self._keycode(keysym, ch)
+            shifted = self._display.keycode_to_keysym(keycode, 0) != keysym
+            self._keys([shift, keycode] if shifted else [keycode])
+        self._display.sync()
+
+    def hotkey(self, *keys: str):
+        self._check_failsafe()
+        keycodes = [self._keycode(self._XK.string_to_keysym(key_codes(k)[2]), k) for k in keys]
+        self._keys(keycodes)
+        self._display.sync()
+
+    def press(self, key: str):
+        self.hotkey(key)
+
+    def get_clipboard(self) -> str:
+        return _pyperclip().paste()
+
+    def set_clipboard(self, text: str):
+        _pyperclip().copy(text)
+
+    def close(self):
+        self._display.close()
+
+
+_UINPUT_EVENT = struct.Struct("llHHi")   # struct input_event
+_UINPUT_SETUP = struct.Struct("80sHHHHi" + "64i" * 4)  # struct uinput_user_dev
+_UI_SET_EVBIT = 0x40045564
+_UI_SET_KEYBIT = 0x40045565
+_UI_SET_ABSBIT = 0x40045567
+_UI_DEV_CREATE = 0x5501
+_UI_DEV_DESTROY = 0x5502
+_EV_SYN, _EV_KEY, _EV_ABS = 0, 1, 3
+_BTN_LEFT = 0x110
+_KEY_LEFTSHIFT = 42
+
+
+class UinputInputDriver(InputDriver):
+    """A virtual mouse and keyboard on /dev/uinput. Works under X11, Wayland or a bare console.
+
+    Needs write access to /dev/uinput (usually a udev rule or the input group).
+    Clicks use absolute coordinates over a screen of `screen_size` pixels.
+    Text is typed as on a US layout. The mouse position cannot be read back,
+    so position() always raises and there is no fail-safe corner check with
+    this backend.
+    """
+    reads_position = False
+    SETTLE = 0.2                  # seconds for the desktop to pick up the new device before the first event
+
+    def __init__(self, screen_size: tuple, path: str = "/dev/uinput"):
+        import fcntl
+        self.width, self.height = int(screen_size[0]), int(screen_size[1])
+        self._fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        try:
+            fcntl.ioctl(self._fd, _UI_SET_EVBIT, _EV_KEY)
+            fcntl.ioctl(self._fd, _UI_SET_EVBIT, _EV_ABS)
+            fcntl.ioctl(self._fd, _UI_SET_EVBIT, _EV_SYN)
+            for code in range(1, 249):
+                fcntl.ioctl(self._fd, _UI_SET_KEYBIT, code)
+            fcntl.ioctl(self._fd, _UI_SET_KEYBIT, _BTN_LEFT)
+            fcntl.ioctl(self._fd, _UI_SET_ABSBIT, 0)  # ABS_X
+            fcntl.ioctl(self._fd, _UI_SET_ABSBIT, 1)  # ABS_Y
+            absmax = [0] * 64
+            absmax[0], absmax[1] = self.width - 1, self.height - 1
+            os.write(self._fd, _UINPUT_SETUP.pack(b"AutoRunnerPro virtual input", 0x03, 0x1, 0x1, 1, 0,
+                                                  *absmax, *([0] * 64 * 3)))
+            fcntl.ioctl(self._fd, _UI_DEV_CREATE)
+        except OSError:
+            os.close(self._fd)
+            raise
+        time.sleep(self.SETTLE)
+
+    def _write(self, events: list):
+        """(type, code, value) tuples as one write, ending with a sync report."""
+        data = b"".join(_UINPUT_EVENT.pack(0, 0, kind, code, value) for kind, code, value in events)
+        os.write(self._fd, data + _UINPUT_EVENT.pack(0, 0, _EV_SYN, 0, 0))
+
+    def position(self) -> tuple:
+        raise NotImplementedError("uinput cannot read the mouse position")
+
+    def click(self, x: int, y: int):
+        x, y = min(max(0, int(x)), self.width - 1), min(max(0, int(y)), self.height - 1)
+        self._write([(_EV_ABS, 0, x), (_EV_ABS, 1, y), (_EV_SYN, 0, 0),
+                     (_EV_KEY, _BTN_LEFT, 1), (_EV_SYN, 0, 0), (_EV_KEY, _BTN_LEFT, 0)])
+
+    @staticmethod
+    def _chord(codes: list) -> list:
+        down = [(_EV_KEY, c, 1) for c in codes]
+        up = [(_EV_KEY, c, 0) for c in reversed(codes)]
+        return down + [(_EV_SYN, 0, 0)] + up + [(_EV_SYN, 0, 0)]
+
+    def typewrite(self, text: str):
+        events = []
+        for ch in text:
+            code, shift = us_layout_code(ch)
+            events += self._chord([_KEY_LEFTSHIFT, code] if shift else [code])
+        if events:
+            self._write(events)
+
+    def hotkey(self, *keys: str):
+        self._write(self._chord([key_codes(k)[1] for k in keys]))
+
+    def press(self, key: str):
+        self.hotkey(key)
+
+    def get_clipboard(self) -> str:
+        return _pyperclip().paste()
+
+    def set_clipboard(self, text: str):
+        _pyperclip().copy(text)
+
+    def close(self):
+        import fcntl
+        if self._fd is not None:
+            fcntl.ioctl(self._fd, _UI_DEV_DESTROY)
+            os.close(self._fd)
+            self._fd = None
+
+
+class MemoryInputDriver(InputDriver):
+    """Records actions instead of sending them: ("click", x, y), ("type", text), ("hotkey", "ctrl+s")."""
+
+    def __init__(self):
+        self.actions = []
+        self.clipboard = ""
+        self._position = (0, 0)
+
+    def position(self) -> tuple:
+        return self._position
+
+    def click(self, x: int, y: int):
+        self._position = (int(x), int(y))
+        self.actions.append(("click", int(x), int(y)))
+
+    def typewrite(self, text: str):
+        self.actions.append(("type", text))
+
+    def hotkey(self, *keys: str):
+        for k in keys:
+            key_codes(k)
+        self.actions.append(("hotkey", "+".join(keys)))
+
+    def press(self, key: str):
+        key_codes(key)
+        self.actions.append(("press", key))
+
+    def get_clipboard(self) -> str:
+        return self.clipboard
+
+    def set_clipboard(self, text: str):
+        self.clipboard = text
@@ -1,16 +1,37 @@
 import sys
 import time
+_STARTUP_T0 = time.perf_counter()
 import datetime
 import logging
-import traceback
-from logging.handlers import RotatingFileHandler
-from dataclasses import dataclass
-from threading import Timer
-import ctypes
+from logging.handlers import RotatingFileHandler, QueueHandler
+import queue
+import atexit
+from dataclasses import dataclass, field
+from threading import Event
+from contextlib import contextmanager
 import platform
+import re
+import socket
+import json
+import base64
+import hashlib
+import os
+import struct
+import threading
+import copy
+import argparse
+import importlib
+import random
+import zlib
+
+import metrics
+import retry
+import session
+from inputs import (
+    FailSafeError, InputDriver, MemoryInputDriver, UinputInputDriver, Win32InputDriver, X11InputDriver,
+)
+from tracing import TRACER
 
-import pyautogui
-from PyQt5 import QtWidgets, QtGui, QtCore
 
 """
 Automated Task Runner (Pro)
@@ -21,881 +42,2253 @@ APP_TITLE = "Automated Task Runner (Pro)"
 APP_AUTHOR = "xTheRedShirtx"
 OBS_START_HOTKEY = 'up'
 OBS_STOP_HOTKEY = 'down'
+OBS_WS_HOST = "127.0.0.1"
+OBS_WS_PORT = 4455            # OBS 28+ built-in obs-websocket (v5) default port
+OBS_WS_PASSWORD = os.environ.get("OBS_WS_PASSWORD", "")  # used when the profile has none; --obs-password
+OBS_WS_TIMEOUT = 10.0         # seconds to wait for OBS to confirm a stream state change
+OBS_WS_RETRY_AFTER = 30.0     # seconds before retrying WebSocket after a failed connection
+OBS_HOTKEY_RESTART_PAUSE = 0.8  # seconds between the stop and start hotkeys of a restart
 LOG_FILE = "automation_log.txt"
-
-QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_EnableHighDpiScaling, True)
-QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_UseHighDpiPixmaps, True)
-
-VK_LCONTROL = 0xA2
-VK_ESCAPE   = 0x1B
-VK_DELETE   = 0x2E
+LOG_JSON = False              # write LOG_FILE as JSON lines instead of plain text
+DIALOG_SCAN_INTERVAL = 5.0    # seconds between OBS error dialog scans during the long wait
+LOG_VIEW_MAX_LINES = 5000     # lines kept in the Runner/Debug log views
+LOG_FLUSH_INTERVAL_MS = 250   # log lines are batched and shown at most this often
+COUNTDOWN_IDLE_INTERVAL_MS = 5000  # long-wait countdown refresh while the window is visible but not focused
+METRICS_CSV = "automation_metrics.csv"  # metrics appended after each iteration; "" to disable
+METRICS_PORT = 0              # localhost port for the Prometheus /metrics endpoint; 0 = off
+REMOTE_PORT = 0               # port for the remote control HTTP/JSON endpoint (remote.py); 0 = off
+REMOTE_HOST = "127.0.0.1"     # interface it binds to; another address makes it reachable from the network
+REMOTE_TOKEN = ""             # if set, remote requests must send "Authorization: Bearer <token>"
+WORKFLOW_FILE = "workflow.json"  # optional; .json or .toml, overrides DEFAULT_WORKFLOW
+CONFIG_FILE = "autorunner_config.json"  # settings, coordinates and named profiles (GUI and --profile)
+STATE_FILE = "automation_state.jsonl"  # crash-resume checkpoints of the running loop; "" to disable
+OBS_ERROR_TITLES = ("Live broadcast creation error", "Broadcast creation error", "Forbidden")
+VERIFY_POLL_INTERVAL = 0.2    # seconds between screen checks while verifying a click
+INPUT_LOCK_POLL = 0.5         # seconds between stop checks while waiting for the mouse/keyboard
+TEXT_CONFIRM_TIMEOUT = 2.0    # seconds a confirmed type_text step waits for the field to read back the text
+TEXT_PASTE_SETTLE = 0.3       # seconds after a paste before the previous clipboard text is put back
+
+EMERGENCY_STOP_KEY = "delete"  # global hotkeys (names from hotkeys.KEYS); can be changed in CONFIG_FILE
+CAPTURE_KEY = "lctrl"
+CANCEL_CAPTURE_KEY = "esc"
+INPUT_BACKEND = "auto"        # mouse/keyboard output: one of INPUT_BACKENDS; --input-backend
+INPUT_BACKENDS = ("auto", "win32", "x11", "uinput", "pyautogui", "memory")
+
+# One mouse and keyboard: runners hold this while they click and type, and
+# release it during long waits so other scheduled loops can use the input.
+INPUT_LOCK = threading.Lock()
 
 def is_windows() -> bool:
     return platform.system().lower().startswith("win")
 
-def key_pressed(vk_code: int) -> bool:
-    if not is_windows():
-        return False
-    return (ctypes.windll.user32.GetAsyncKeyState(vk_code) & 0x8000) != 0
-
 logger = logging.getLogger("automation")
 logger.setLevel(logging.DEBUG)
 
-_file = RotatingFileHandler(LOG_FILE, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
-_file.setLevel(logging.DEBUG)
-_file.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-if not any(isinstance(h, RotatingFileHandler) for h in logger.handlers):
-    logger.addHandler(_file)
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that leaves flushing to LogListener, once per batch."""
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
 
-pyautogui.FAILSAFE = True
+class LogListener:
+    """Background writer for records queued by QueueHandler.
+
+    Drains everything that is waiting, writes it, then flushes each handler
+    once, so logging threads never block on disk I/O or rotation.
+    """
+
+    _STOP = None
+
+    def __init__(self, log_queue: queue.Queue, *handlers, batch_size: int = 512):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write out everything queued so far and stop the writer thread."""
+        if self._thread:
+            self.queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._STOP in batch
+            for record in batch:
+                if record is self._STOP:
+                    continue
+                for h in self.handlers:
+                    if record.levelno >= h.level:
+                        h.handle(record)
+            for h in self.handlers:
+                getattr(h, "flush_batch", h.flush)()
+            if stop:
+                return
+
+
+_log_listener = None
+_extra_log_handlers = []  # added with add_log_handler; kept when logging is configured again
+
+def configure_logging(json_lines: bool = LOG_JSON, log_file: str = LOG_FILE, console: bool = False):
+    """Send the automation logger through a queue to a background file writer. Safe to call again."""
+    global _log_listener
+    shutdown_logging()
+    file_handler = BatchedRotatingFileHandler(log_file, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(JsonLinesFormatter() if json_lines
+                              else logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(file_handler.formatter)
+        handlers.append(console_handler)
+    handlers.extend(_extra_log_handlers)
+    log_queue = queue.SimpleQueue()
+    _log_listener = LogListener(log_queue, *handlers)
+    _log_listener.start()
+    _log_listener.queue_handler = QueueHandler(log_queue)
+    logger.addHandler(_log_listener.queue_handler)
+
+def shutdown_logging():
+    """Flush queued log records to disk. Called on window close and at interpreter exit."""
+    global _log_listener
+    if _log_listener is not None:
+        logger.removeHandler(_log_listener.queue_handler)
+        _log_listener.stop()
+        for h in _log_listener.handlers:
+            if isinstance(h, logging.FileHandler):
+                h.close()
+        _log_listener = None
+
+def add_log_handler(handler: logging.Handler):
+    """Also send automation log records to `handler`, from the log writer thread."""
+    _extra_log_handlers.append(handler)
+    if _log_listener is not None:
+        _log_listener.handlers = _log_listener.handlers + (handler,)
+
+def remove_log_handler(handler: logging.Handler):
+    if handler in _extra_log_handlers:
+        _extra_log_handlers.remove(handler)
+    if _log_listener is not None:
+        _log_listener.handlers = tuple(h for h in _log_listener.handlers if h is not handler)
+
+configure_logging()
+atexit.register(shutdown_logging)
+
+STEP_SECONDS = metrics.REGISTRY.histogram(
+    "automation_step_seconds", "Time spent in each workflow step.", ("step",))
+ITERATION_SECONDS = metrics.REGISTRY.histogram(
+    "automation_iteration_seconds", "Time for one full loop iteration.")
+ITERATIONS = metrics.REGISTRY.counter("automation_iterations_total", "Completed loop iterations.")
+CLICK_ATTEMPTS = metrics.REGISTRY.counter(
+    "automation_click_attempts_total", "Click attempts, including retries.", ("step",))
+CLICK_RETRIES = metrics.REGISTRY.counter(
+    "automation_click_retries_total", "Click attempts after the first one.", ("step",))
+CLICK_FAILURES = metrics.REGISTRY.counter(
+    "automation_click_failures_total", "Clicks that still failed after all retries.", ("step",))
+CLICK_ERRORS = metrics.REGISTRY.counter(
+    "automation_click_errors_total", "Failed click attempts by error class.", ("step", "kind"))
+STEP_DELAY = metrics.REGISTRY.gauge(
+    "automation_step_delay_seconds", "Tuned delay after each unverified click (adaptive delay).", ("step",))
+DIALOG_DISMISSALS = metrics.REGISTRY.counter(
+    "automation_dialog_dismissals_total", "OBS broadcast error dialogs dismissed.")
+OBS_RESTARTS = metrics.REGISTRY.counter(
+    "automation_obs_restarts_total", "Stream restarts after an error dialog.", ("result",))
+WATCHDOG_TIMEOUTS = metrics.REGISTRY.counter("automation_watchdog_timeouts_total", "Watchdog timeouts.")
+RUNS_ACTIVE = metrics.REGISTRY.gauge("automation_runs_active", "Automation loops currently running.")
+LONG_WAIT_REMAINING = metrics.REGISTRY.gauge(
+    "automation_long_wait_remaining_seconds", "Seconds left in the current long wait.")
+
+class _LazyModule:
+    """Stand-in for a heavy module that imports it on first attribute access."""
+
+    def __init__(self, name: str, setup=None):
+        self._name = name
+        self._setup = setup
+        self._module = None
+
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            module = importlib.import_module(self._name)
+            if self._setup:
+                self._setup(module)
+            self._module = module
+        return getattr(self._module, attr)
+
+
+def _setup_pyautogui(module):
+    module.FAILSAFE = True
+
+pyautogui = _LazyModule("pyautogui", _setup_pyautogui)
+matcher = _LazyModule("matcher")  # NumPy template matching, only for "find" verify steps
+
+class PyAutoGUIDriver(InputDriver):
+    """Input through pyautogui, which pauses after every call. Used where no faster backend is available."""
+
+    def click(self, x: int, y: int):
+        pyautogui.click(x, y)
+
+    def typewrite(self, text: str):
+        pyautogui.typewrite(text)
+
+    def hotkey(self, *keys: str):
+        pyautogui.hotkey(*keys)
+
+    def press(self, key: str):
+        pyautogui.press(key)
+
+    def position(self) -> tuple:
+        pos = pyautogui.position()
+        return pos.x, pos.y
+
+    def get_clipboard(self) -> str:
+        import pyperclip  # installed with pyautogui
+        return pyperclip.paste()
+
+    def set_clipboard(self, text: str):
+        import pyperclip
+        pyperclip.copy(text)
+
+
+def _screen_size() -> tuple:
+    backend = get_display_backend()
+    monitors = backend.monitors() if backend else []
+    if monitors:
+        return (max(m[0] + m[2] for m in monitors), max(m[1] + m[3] for m in monitors))
+    size = pyautogui.size()
+    return size.width, size.height
+
+def make_input_driver(name: str = "auto") -> InputDriver:
+    """The input backend called `name` (see INPUT_BACKENDS). "auto" takes the fastest one that works here."""
+    if name not in INPUT_BACKENDS:
+        raise ValueError(f"unknown input backend {name!r}; use one of {', '.join(INPUT_BACKENDS)}")
+    if name == "auto":
+        candidates = ["win32"] if is_windows() else (["x11"] if os.environ.get("DISPLAY") else [])
+        for candidate in candidates:
+            try:
+                return make_input_driver(candidate)
+            except (ImportError, OSError) as e:
+                logger.info(f"Input backend {candidate} not available ({e}); using pyautogui.")
+        return PyAutoGUIDriver()
+    if name == "win32":
+        return Win32InputDriver()
+    if name == "x11":
+        return X11InputDriver()
+    if name == "uinput":
+        return UinputInputDriver(_screen_size())
+    if name == "memory":
+        return MemoryInputDriver()
+    return PyAutoGUIDriver()
+
+
+_input_driver = None
+
+def get_input_driver() -> InputDriver:
+    """The input backend chosen by INPUT_BACKEND, created on first use."""
+    global _input_driver
+    if _input_driver is None:
+        _input_driver = make_input_driver(INPUT_BACKEND)
+        logger.info(f"Input backend: {type(_input_driver).__name__}")
+    return _input_driver
+
+def set_input_backend(name: str):
+    """Choose the input backend for this process (before the first input is sent)."""
+    global INPUT_BACKEND, _input_driver
+    if name not in INPUT_BACKENDS:
+        raise ValueError(f"unknown input backend {name!r}; use one of {', '.join(INPUT_BACKENDS)}")
+    INPUT_BACKEND = name
+    if _input_driver is not None:
+        _input_driver.close()
+        _input_driver = None
+
+def is_failsafe(exc: BaseException) -> bool:
+    """True if exc is the fail-safe abort of an input backend. Never imports pyautogui just to check."""
+    if isinstance(exc, FailSafeError):
+        return True
+    return pyautogui.is_loaded() and isinstance(exc, pyautogui.FailSafeException)
 
 @dataclass
 class ClickPoint:
+    """A click target. With an anchor, (rx, ry) is the position inside the anchor's
+    rectangle as a fraction of its width and height, and (x, y) is the last known
+    screen position, used when the anchor cannot be found."""
     name: str
     x: int
     y: int
+    anchor: str = ""              # "", "monitor:N" (0 = primary) or "window:<title text>"
+    rx: float = None
+    ry: float = None
+
+def _default_point(name: str, x: int, y: int) -> ClickPoint:
+    # Captured on a 3840x2160 primary monitor; scales to other resolutions
+    return ClickPoint(name, x, y, "monitor:0", x / 3840, y / 2160)
 
 DEFAULT_POINTS = [
-    ClickPoint("Step 1", 3514, 1640),
-    ClickPoint("Step 2 (date field)", 1775, 596),
-    ClickPoint("Step 3", 1474, 1649),
-    ClickPoint("Step 5", 2875, 1640),
-    ClickPoint("Step 7", 2674, 1640),
-    ClickPoint("Step 8", 2066, 1100),
+    _default_point("Step 1", 3514, 1640),
+    _default_point("Step 2 (date field)", 1775, 596),
+    _default_point("Step 3", 1474, 1649),
+    _default_point("Step 5", 2875, 1640),
+    _default_point("Step 7", 2674, 1640),
+    _default_point("Step 8", 2066, 1100),
 ]
 
-def load_points(settings: QtCore.QSettings) -> list:
-    points = []
-    size = settings.value("points/count", 0, int)
-    if not size:
-        return DEFAULT_POINTS.copy()
-    for i in range(size):
-        name = settings.value(f"points/{i}/name", f"Step {i+1}")
-        x = int(settings.value(f"points/{i}/x".format(i=i), 0))
-        y = int(settings.value(f"points/{i}/y".format(i=i), 0))
-        points.append(ClickPoint(name, x, y))
-    return points
-
-def save_points(settings: QtCore.QSettings, points: list):
-    settings.setValue("points/count", len(points))
-    for i, p in enumerate(points):
-        settings.setValue(f"points/{i}/name", p.name)
-        settings.setValue(f"points/{i}/x", p.x)
-        settings.setValue(f"points/{i}/y", p.y)
-
-class WatchdogTimer:
+def point_from_dict(data: dict) -> ClickPoint:
+    anchor = str(data.get("anchor", ""))
+    rx, ry = data.get("rx"), data.get("ry")
+    if anchor and (rx is None or ry is None):
+        raise ValueError(f"point {data.get('name')!r}: an anchor needs rx and ry")
+    return ClickPoint(str(data["name"]), int(data["x"]), int(data["y"]), anchor,
+                      None if rx is None else float(rx), None if ry is None else float(ry))
+
+def point_to_dict(p: ClickPoint) -> dict:
+    data = {"name": p.name, "x": int(p.x), "y": int(p.y)}
+    if p.anchor:
+        data.update(anchor=p.anchor, rx=p.rx, ry=p.ry)
+    return data
+
+
+class DisplayBackend:
+    """Reports monitor and window rectangles as (x, y, width, height) in screen pixels."""
+
+    def monitors(self) -> list:
+        """Monitor rectangles, primary first."""
+        raise NotImplementedError
+
+    def window_rect(self, title: str):
+        """Rectangle of the first window whose title contains `title`, or None."""
+        return None
+
+
+class Win32DisplayBackend(DisplayBackend):
+    """Monitor and window geometry from user32, in physical pixels."""
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._user32 = ctypes.windll.user32
+        try:
+            ctypes.windll.shcore.SetProcessDpiAwareness(2)  # per-monitor aware
+        except Exception:
+            try:
+                self._user32.SetProcessDPIAware()
+            except Exception:
+                pass  # Qt or pyautogui already set it
+        self._hwnds = {}
+
+    def monitors(self) -> list:
+        ctypes, wintypes = self._ctypes, self._wintypes
+
+        class MONITORINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.DWORD), ("rcMonitor", wintypes.RECT),
+                        ("rcWork", wintypes.RECT), ("dwFlags", wintypes.DWORD)]
+
+        found = []
+        proc_type = ctypes.WINFUNCTYPE(ctypes.c_int, wintypes.HMONITOR, wintypes.HDC,
+                                       ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+
+        def callback(hmon, _hdc, _rect, _data):
+            info = MONITORINFO()
+            info.cbSize = ctypes.sizeof(MONITORINFO)
+            if self._user32.GetMonitorInfoW(hmon, ctypes.byref(info)):
+                r = info.rcMonitor
+                found.append((not info.dwFlags & 1, (r.left, r.top, r.right - r.left, r.bottom - r.top)))
+            return 1
+
+        self._user32.EnumDisplayMonitors(None, None, proc_type(callback), 0)
+        return [rect for _secondary, rect in sorted(found, key=lambda m: m[0])]
+
+    def window_rect(self, title: str):
+        hwnd = self._hwnds.get(title)
+        if not hwnd or not self._user32.IsWindow(hwnd):
+            import pygetwindow as gw
+            windows = gw.getWindowsWithTitle(title)
+            if not windows:
+                return None
+            hwnd = self._hwnds[title] = windows[0]._hWnd
+        r = self._wintypes.RECT()
+        if not self._user32.GetWindowRect(hwnd, self._ctypes.byref(r)):
+            return None
+        return (r.left, r.top, r.right - r.left, r.bottom - r.top)
+
+
+class FakeDisplayBackend(DisplayBackend):
+    """Fixed geometry for tests and benchmarks on any platform."""
+
+    def __init__(self, monitors: list = None, windows: dict = None):
+        self.monitor_rects = list(monitors or [(0, 0, 3840, 2160)])
+        self.windows = dict(windows or {})
+        self.queries = 0
+
+    def monitors(self) -> list:
+        self.queries += 1
+        return list(self.monitor_rects)
+
+    def window_rect(self, title: str):
+        return next((r for t, r in self.windows.items() if title in t), None)
+
+
+_display_backend = None
+
+def get_display_backend():
+    """The platform display backend, or None where none is available (points then stay absolute)."""
+    global _display_backend
+    if _display_backend is None:
+        try:
+            _display_backend = Win32DisplayBackend() if is_windows() else False
+        except Exception:
+            _display_backend = False
+    return _display_backend or None
+
+
+class PointResolver:
+    """Turns ClickPoints into screen pixels.
+
+    layout() reads the current monitor and anchor-window rectangles, which is
+    cheap. Only when that layout (or the points) differs from the last call
+    are the anchor rectangles turned into transforms and every point resolved
+    again; otherwise the cached coordinates are returned.
+    """
+
+    def __init__(self, backend: DisplayBackend = None):
+        self.backend = backend
+        self._key = None
+        self._resolved = []
+
+    def layout(self, points) -> tuple:
+        if self.backend is None:
+            return ()
+        windows = sorted({p.anchor for p in points if p.anchor.startswith("window:")})
+        return (tuple(self.backend.monitors()),
+                tuple((w, self.backend.window_rect(w[len("window:"):])) for w in windows))
+
+    def anchor_rect(self, anchor: str, layout: tuple = None):
+        """(x, y, width, height) of an anchor in the given (or current) layout, or None."""
+        if not anchor or self.backend is None:
+            return None
+        kind, _, arg = anchor.partition(":")
+        if kind == "monitor":
+            monitors = layout[0] if layout else self.backend.monitors()
+            i = int(arg or 0)
+            return monitors[i] if 0 <= i < len(monitors) else None
+        if kind == "window":
+            if layout:
+                return dict(layout[1]).get(anchor)
+            return self.backend.window_rect(arg)
+        raise ValueError(f"unknown anchor {anchor!r}")
+
+    def resolve(self, points) -> list:
+        """[(x, y), ...] screen pixels for `points`, recomputed only after a layout or point change."""
+        layout = self.layout(points)
+        key = (layout, tuple((p.x, p.y, p.anchor, p.rx, p.ry) for p in points))
+        if key == self._key:
+            return self._resolved
+        transforms = {a: self.anchor_rect(a, layout) for a in {p.anchor for p in points if p.anchor}}
+        resolved = []
+        for p in points:
+            rect = transforms.get(p.anchor)
+            if rect is None or p.rx is None or p.ry is None:
+                if p.anchor:
+                    logger.warning(f"{p.name}: anchor {p.anchor} not found; using ({p.x}, {p.y}).")
+                resolved.append((p.x, p.y))
+            else:
+                resolved.append((rect[0] + round(p.rx * rect[2]), rect[1] + round(p.ry * rect[3])))
+        if self._key is not None and layout != self._key[0]:
+            logger.info("Display layout changed; click points re-resolved.")
+        self._key, self._resolved = key, resolved
+        return resolved
+
+    def anchor(self, point: ClickPoint, anchor: str) -> bool:
+        """Anchor `point` at its current screen position. False if the anchor is not found now."""
+        if not anchor:
+            point.anchor, point.rx, point.ry = "", None, None
+            return True
+        rect = self.anchor_rect(anchor)
+        if rect is None or rect[2] <= 0 or rect[3] <= 0:
+            return False
+        point.anchor = anchor
+        point.rx = (point.x - rect[0]) / rect[2]
+        point.ry = (point.y - rect[1]) / rect[3]
+        return True
+
+# One loop iteration as data. "point" indexes the Coordinates tab list.
+# Wait "seconds" may be a number or a runtime setting: "step4_wait" or "long_wait".
+DEFAULT_WORKFLOW = {
+    "version": 1,
+    "iteration_pause": 5,
+    "steps": [
+        {"type": "click", "point": 0},
+        {"type": "click", "point": 1},
+        {"type": "type_text", "text": "{date}"},
+        {"type": "wait", "seconds": 2},
+        {"type": "click", "point": 2},
+        {"type": "wait", "seconds": "step4_wait", "label": "Step 4"},
+        {"type": "click", "point": 3},
+        {"type": "wait", "seconds": "long_wait", "label": "Step 6", "countdown": True},
+        {"type": "wait", "seconds": 2},
+        {"type": "wait_for", "condition": "no_obs_error_dialog"},
+        {"type": "click", "point": 4},
+        {"type": "wait_for", "condition": "no_obs_error_dialog"},
+        {"type": "click", "point": 5},
+    ],
+}
+
+def format_text(template: str, now: datetime.datetime, iteration: int) -> str:
+    """Fill a type_text template: {date}, {time}, {iteration} (from 1) or {now:<strftime format>}."""
+    return template.format(now=now, date=now.strftime("%Y-%m-%d"), time=now.strftime("%H:%M:%S"),
+                           iteration=iteration)
+
+def load_workflow(path: str = WORKFLOW_FILE) -> dict:
+    """Load the workflow file if present (.json or .toml), else the built-in default."""
+    if not path or not os.path.exists(path):
+        return copy.deepcopy(DEFAULT_WORKFLOW)
+    return _load_document(path)
+
+def _load_document(path: str) -> dict:
+    if path.lower().endswith(".toml"):
+        try:
+            import tomllib  # Python 3.11+
+        except ImportError:
+            raise ValueError("TOML workflows need Python 3.11 or newer; use workflow.json instead")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Clock:
+    """Wall and monotonic time plus interruptible waits. sim.SimClock replaces it with virtual time."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.now()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    def wait(self, event: Event, timeout: float = None) -> bool:
+        """Wait until `event` is set or `timeout` passes. Returns True if the event is set."""
+        return event.wait(timeout)
+
+    def watchdog(self, timeout: float, error_callback) -> "HeartbeatWatchdog":
+        return HeartbeatWatchdog(timeout, error_callback)
+
+
+REAL_CLOCK = Clock()
+
+
+class HeartbeatWatchdog:
+    """Single monitor thread that fires `error_callback` when no heartbeat arrives within `timeout`.
+
+    Workers call beat() on the hot path, which only stores a monotonic timestamp.
+    Intentional waits run inside `with watchdog.paused():`.
+    """
+
     def __init__(self, timeout, error_callback):
         self.timeout = timeout
         self.error_callback = error_callback
-        self.timer = None
+        self._last_beat = time.monotonic()
+        self._armed = False
+        self._pause_depth = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def beat(self):
+        self._last_beat = time.monotonic()
+        if not self._armed and not self._pause_depth:
+            with self._cond:
+                if self._pause_depth or self._closed:
+                    return
+                self._armed = True
+                TRACER.instant("watchdog armed", "watchdog")
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._monitor, name="watchdog", daemon=True)
+                    self._thread.start()
+                self._cond.notify()
+
+    def pause(self):
+        with self._cond:
+            self._armed = False
+
+    @contextmanager
+    def paused(self):
+        with self._cond:
+            self._pause_depth += 1
+            self._armed = False
+        try:
+            with TRACER.span("watchdog paused", "watchdog"):
+                yield
+        finally:
+            with self._cond:
+                self._pause_depth -= 1
+            if not self._pause_depth:
+                self.beat()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._armed = False
+            self._cond.notify()
+
+    def _monitor(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                if not self._armed:
+                    self._cond.wait()
+                    continue
+                remaining = self._last_beat + self.timeout - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                self._armed = False
+            try:
+                self.error_callback()
+            except Exception:
+                logger.exception("Watchdog callback failed")
+
+class WindowBackend:
+    """Enumerates top-level windows as a {handle: title} map."""
+
+    def list_windows(self) -> dict:
+        raise NotImplementedError
+
+    def activate(self, handle) -> None:
+        raise NotImplementedError
+
+    def foreground(self):
+        """Handle of the window in front, or None if the backend cannot tell."""
+        return None
+
+
+class PyGetWindowBackend(WindowBackend):
+    """Window backend on top of pygetwindow (Windows only)."""
+
+    def __init__(self):
+        import ctypes
+        import pygetwindow as gw
+        self._gw = gw
+        self._user32 = ctypes.windll.user32
+        self._windows = {}
+
+    def list_windows(self) -> dict:
+        self._windows = {w._hWnd: w for w in self._gw.getAllWindows() if w.title}
+        return {h: w.title for h, w in self._windows.items()}
+
+    def activate(self, handle) -> None:
+        w = self._windows.get(handle) or self._gw.Win32Window(handle)
+        w.activate()
+
+    def foreground(self):
+        return self._user32.GetForegroundWindow() or None
+
+
+class FakeWindowBackend(WindowBackend):
+    """In-memory window list for tests and benchmarks on any platform."""
+
+    def __init__(self, windows: dict = None):
+        self.windows = dict(windows or {})
+        self.activated = []
+        self.front = None
+
+    def list_windows(self) -> dict:
+        return dict(self.windows)
+
+    def activate(self, handle) -> None:
+        self.activated.append(handle)
+        if handle in self.windows:
+            self.front = handle
+
+    def foreground(self):
+        return self.front
+
+
+class WindowScanner:
+    """Incremental window title scanner.
+
+    Keeps the last handle-to-title snapshot and only tests windows that are new
+    or were retitled against a single precompiled pattern.
+    """
+
+    def __init__(self, patterns, backend: WindowBackend):
+        self.backend = backend
+        self.pattern = re.compile("|".join(re.escape(p) for p in patterns))
+        self._titles = {}
+        self._matches = {}
+
+    def scan(self) -> list:
+        """Return [(handle, title), ...] for every open window matching a pattern."""
+        current = self.backend.list_windows()
+        previous = self._titles
+        for handle, title in current.items():
+            if previous.get(handle) == title:
+                continue
+            if self.pattern.search(title):
+                self._matches[handle] = title
+            else:
+                self._matches.pop(handle, None)
+        if self._matches:
+            for handle in [h for h in self._matches if h not in current]:
+                del self._matches[handle]
+        self._titles = current
+        return list(self._matches.items())
 
     def reset(self):
-        self.cancel()
-        self.timer = Timer(self.timeout, self.error_callback)
-        self.timer.daemon = True
-        self.timer.start()
+        self._titles = {}
+        self._matches = {}
+
+
+class FocusError(RuntimeError):
+    """The target window of an input step could not be brought to the front."""
 
-    def cancel(self):
-        if self.timer:
-            self.timer.cancel()
-            self.timer = None
 
-def clear_obs_broadcast_error(autoretry: bool = True):
+class WindowFocus:
+    """Keeps input going to the intended window.
+
+    A target title is looked up in the window list once and its handle kept.
+    Before each input the foreground handle is compared with it, which is one
+    cheap call and no title scan. The window is activated only when something
+    else is in front, and the titles are scanned again only when the kept
+    handle no longer works.
+    """
+
+    def __init__(self, backend: WindowBackend):
+        self.backend = backend
+        self.handles = {}
+        self.scans = 0
+        self.activations = 0
+
+    def handle(self, title: str, refresh: bool = False):
+        if refresh or self.handles.get(title) is None:
+            self.scans += 1
+            self.handles[title] = next((h for h, text in self.backend.list_windows().items() if title in text), None)
+        return self.handles[title]
+
+    def ensure(self, title: str) -> bool:
+        """True once the window whose title contains `title` is in front."""
+        handle = self.handle(title)
+        if handle is not None and self.backend.foreground() == handle:
+            return True
+        for refresh in (False, True):
+            if refresh:
+                handle = self.handle(title, refresh=True)
+            if handle is None:
+                continue
+            try:
+                self.backend.activate(handle)
+            except Exception:
+                continue
+            self.activations += 1
+            front = self.backend.foreground()
+            if front is None or front == handle:
+                return True
+        return False
+
+
+_window_backend = None
+
+def get_window_backend():
+    """The platform window backend, created on first use. None where windows cannot be listed."""
+    global _window_backend
+    if _window_backend is None:
+        try:
+            _window_backend = PyGetWindowBackend()
+        except Exception:
+            # pygetwindow may not be installed or unsupported on this platform
+            _window_backend = False
+    return _window_backend or None
+
+
+_dialog_scanner = None
+
+def get_dialog_scanner():
+    """Create the OBS error dialog scanner on first use. Returns None if no window backend is available."""
+    global _dialog_scanner
+    if _dialog_scanner is None:
+        backend = get_window_backend()
+        _dialog_scanner = WindowScanner(OBS_ERROR_TITLES, backend) if backend else False
+    return _dialog_scanner or None
+
+def clear_obs_broadcast_error(autoretry: bool = True, scanner: WindowScanner = None,
+                              driver: InputDriver = None, obs=None, clock: Clock = REAL_CLOCK):
     """Dismiss OBS/YouTube 'Live broadcast creation error' dialog if present."""
     try:
-        import pygetwindow as gw
-        titles = [t for t in gw.getAllTitles() if t]
-        match_titles = [t for t in titles if ("Live broadcast creation error" in t) or ("Broadcast creation error" in t) or ("Forbidden" in t)]
-        if match_titles:
-            w = gw.getWindowsWithTitle(match_titles[0])[0]
+        scanner = scanner or get_dialog_scanner()
+        if scanner is None:
+            return False
+        matches = scanner.scan()
+        if matches:
+            handle, _title = matches[0]
             try:
-                w.activate()
+                scanner.backend.activate(handle)
             except Exception:
                 pass
-            time.sleep(0.2)
-            pyautogui.press("enter")  # OK
+            clock.sleep(0.2)
+            (driver or get_input_driver()).press("enter")  # OK
+            DIALOG_DISMISSALS.inc()
             logging.getLogger("automation").info("Dismissed OBS broadcast creation error dialog.")
             if autoretry:
-                try:
-                    # In case OBS thinks it's still live, send STOP then START
-                    pyautogui.press(OBS_STOP_HOTKEY)
-                    time.sleep(0.8)
-                    pyautogui.press(OBS_START_HOTKEY)
-                    logging.getLogger("automation").info("Sent OBS restart hotkeys (DOWN then UP).")
-                except Exception as _:
-                    logging.getLogger("automation").warning("Failed to send OBS hotkeys.")
+                restart_obs_stream(obs)
             return True
+        return False
     except Exception:
-        # pygetwindow may not be installed or window ops may fail; ignore silently
+        # Window ops may fail; ignore silently
         return False
 
+def restart_obs_stream(obs=None, wait=None) -> bool:
+    """After an error dialog, in case OBS thinks it's still live, send STOP then START.
+
+    `wait(seconds)` replaces the pause between the hotkeys; it returns False to give up (the run was stopped).
+    """
+    if (obs or get_obs_controller()).restart_stream(wait=wait):
+        OBS_RESTARTS.inc(result="ok")
+        logging.getLogger("automation").info("Restarted OBS stream after error dialog.")
+        return True
+    OBS_RESTARTS.inc(result="failed")
+    logging.getLogger("automation").warning("Failed to restart OBS stream.")
+    return False
+
+
+@dataclass
+class Frame:
+    """RGB pixels of a screen region, row-major, 3 bytes per pixel."""
+    width: int
+    height: int
+    pixels: bytes
+
+    def crop(self, x: int, y: int, w: int, h: int) -> "Frame":
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.width, x + w), min(self.height, y + h)
+        if x1 <= x0 or y1 <= y0:
+            return Frame(0, 0, b"")
+        stride = self.width * 3
+        rows = [self.pixels[r * stride + x0 * 3: r * stride + x1 * 3] for r in range(y0, y1)]
+        return Frame(x1 - x0, y1 - y0, b"".join(rows))
+
+    def checksum(self) -> str:
+        return f"{zlib.crc32(self.pixels):08x}"
+
+    def mean_color(self) -> tuple:
+        n = self.width * self.height
+        if not n:
+            return (0, 0, 0)
+        p = self.pixels
+        return (sum(p[0::3]) / n, sum(p[1::3]) / n, sum(p[2::3]) / n)
+
+
+class ScreenSource:
+    """Grabs screen regions as Frames."""
+
+    def grab(self, region: tuple) -> Frame:
+        """region is (x, y, width, height) in screen pixels."""
+        raise NotImplementedError
+
+
+class PyAutoGUIScreenSource(ScreenSource):
+    """Screen grabs through pyautogui (Pillow), only of the requested region."""
+
+    def grab(self, region: tuple) -> Frame:
+        img = pyautogui.screenshot(region=tuple(int(v) for v in region)).convert("RGB")
+        return Frame(img.width, img.height, img.tobytes())
+
+
+class FakeScreenSource(ScreenSource):
+    """Synthetic screen for tests and benchmarks on any platform. Set `screen` to change what is shown."""
+
+    def __init__(self, screen: Frame = None):
+        self.screen = screen or Frame(0, 0, b"")
+        self.grabs = 0
+
+    def grab(self, region: tuple) -> Frame:
+        self.grabs += 1
+        return self.screen.crop(*region)
+
+
+_screen_source = None
+
+def get_screen_source() -> ScreenSource:
+    global _screen_source
+    if _screen_source is None:
+        _screen_source = PyAutoGUIScreenSource()
+    return _screen_source
+
+def _load_reference_image(path: str) -> Frame:
+    from PIL import Image  # installed with pyautogui
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        return Frame(img.width, img.height, img.tobytes())
+
+
+class ScreenCheck:
+    """Post-condition for a click: a small screen region that must match within `timeout` seconds.
+
+    Exactly one of `checksum` (crc32 of the region), `color` (mean RGB within
+    `tolerance`), `image` (reference Frame, mean absolute difference within
+    `tolerance`), `template` (matcher.Template found anywhere in the region
+    with an NCC score of at least `threshold`) or `changed` (region differs
+    from just before the click).
+    """
+
+    def __init__(self, region: tuple, checksum: str = None, color: tuple = None, image: Frame = None,
+                 changed: bool = False, tolerance: float = 0, timeout: float = 10.0,
+                 interval: float = VERIFY_POLL_INTERVAL, template=None, threshold: float = 0.9,
+                 relative: bool = False):
+        if sum(v is not None for v in (checksum, color, image, template)) + bool(changed) != 1:
+            raise ValueError('verify needs exactly one of "checksum", "color", "image", "find" or "changed"')
+        self.region = tuple(int(v) for v in region)
+        self.offset = self.region if relative else None
+        if self.region[2] <= 0 or self.region[3] <= 0:
+            raise ValueError("verify region must have a positive size")
+        if image is not None and (image.width, image.height) != self.region[2:]:
+            raise ValueError(f"reference image is {image.width}x{image.height}, "
+                             f"region is {self.region[2]}x{self.region[3]}")
+        self.checksum = checksum.lower() if checksum else None
+        self.color = tuple(color) if color is not None else None
+        self.image = image
+        self.template = template
+        self.threshold = float(threshold)
+        self.changed = changed
+        self.tolerance = float(tolerance)
+        self.timeout = max(0.0, float(timeout))
+        self.interval = max(0.01, float(interval))
+        self._before = None
+
+    def place(self, x: int, y: int):
+        """Move a relative region so its offset is measured from the click at (x, y)."""
+        if self.offset:
+            dx, dy, w, h = self.offset
+            self.region = (x + dx, y + dy, w, h)
+
+    def prepare(self, source: ScreenSource):
+        """Call just before the click. Records the region when waiting for a change."""
+        if self.changed:
+            self._before = source.grab(self.region).pixels
+
+    def matches(self, source: ScreenSource) -> bool:
+        frame = source.grab(self.region)
+        if self.changed:
+            return frame.pixels != self._before
+        if self.checksum:
+            return frame.checksum() == self.checksum
+        if self.template is not None:
+            return matcher.get_matcher().match(frame, self.template).score >= self.threshold
+        if self.color:
+            return all(abs(a - b) <= self.tolerance for a, b in zip(frame.mean_color(), self.color))
+        if len(frame.pixels) != len(self.image.pixels):
+            return False
+        diff = sum(abs(a - b) for a, b in zip(frame.pixels, self.image.pixels))
+        return diff / max(1, len(frame.pixels)) <= self.tolerance
+
+    @classmethod
+    def from_step(cls, spec: dict, default_timeout: float) -> "ScreenCheck":
+        """Build from a click step's "verify" table. The region defaults to `size` pixels centred on the click.
+
+        With "find", the region defaults to the template plus "search" pixels on each side.
+        Regions around the click follow the point when the display layout changes.
+        """
+        template = matcher.get_matcher().load(spec["find"]) if "find" in spec else None
+        relative = "region" not in spec
+        if not relative:
+            region = spec["region"]
+        elif template is not None:
+            region = matcher.roi((0, 0), template, int(spec.get("search", 32)))
+        else:
+            w, h = spec.get("size", (24, 24))
+            region = (-(w // 2), -(h // 2), w, h)
+        image = _load_reference_image(spec["image"]) if "image" in spec else None
+        return cls(region, checksum=spec.get("checksum"), color=spec.get("color"), image=image,
+                   changed=bool(spec.get("changed", False)), tolerance=spec.get("tolerance", 0),
+                   timeout=spec.get("timeout", default_timeout),
+                   interval=spec.get("interval", VERIFY_POLL_INTERVAL), template=template,
+                   threshold=spec.get("threshold", 0.9), relative=relative)
+
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("WebSocket connection closed")
+        buf += chunk
+    return buf
+
+def _ws_send(sock: socket.socket, text: str, opcode: int = 0x1, mask: bool = True):
+    """Send one unfragmented WebSocket frame. Clients must mask, servers must not."""
+    payload = text.encode("utf-8")
+    n = len(payload)
+    header = bytes([0x80 | opcode])
+    mbit = 0x80 if mask else 0
+    if n < 126:
+        header += bytes([mbit | n])
+    elif n < 65536:
+        header += bytes([mbit | 126]) + struct.pack("!H", n)
+    else:
+        header += bytes([mbit | 127]) + struct.pack("!Q", n)
+    if mask:
+        key = os.urandom(4)
+        payload = key + bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+    sock.sendall(header + payload)
+
+def _ws_recv(sock: socket.socket, mask: bool = True) -> str:
+    """Receive one text message, answering pings and joining continuation frames."""
+    parts = []
+    while True:
+        b1, b2 = _recv_exact(sock, 2)
+        opcode = b1 & 0x0F
+        n = b2 & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", _recv_exact(sock, 2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", _recv_exact(sock, 8))[0]
+        key = _recv_exact(sock, 4) if b2 & 0x80 else None
+        payload = _recv_exact(sock, n)
+        if key:
+            payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+        if opcode == 0x8:
+            raise ConnectionError("WebSocket closed by peer")
+        if opcode == 0x9:
+            _ws_send(sock, payload.decode("utf-8", "replace"), opcode=0xA, mask=mask)
+            continue
+        if opcode == 0xA:
+            continue
+        parts.append(payload)
+        if b1 & 0x80:
+            return b"".join(parts).decode("utf-8")
+
+def _ws_accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+
+def _obs_auth(password: str, salt: str, challenge: str) -> str:
+    secret = base64.b64encode(hashlib.sha256((password + salt).encode()).digest()).decode()
+    return base64.b64encode(hashlib.sha256((secret + challenge).encode()).digest()).decode()
+
+
+class HotkeyObsController:
+    """Drives OBS through its global Start/Stop Streaming hotkeys. No state confirmation."""
+
+    def __init__(self, driver: InputDriver = None):
+        self.driver = driver
+
+    def start_stream(self) -> bool:
+        (self.driver or get_input_driver()).press(OBS_START_HOTKEY)
+        logger.info(f"Sent {OBS_START_HOTKEY.upper()} hotkey to start streaming in OBS.")
+        return True
+
+    def stop_stream(self) -> bool:
+        (self.driver or get_input_driver()).press(OBS_STOP_HOTKEY)
+        logger.info(f"Sent {OBS_STOP_HOTKEY.upper()} hotkey to stop streaming in OBS.")
+        return True
+
+    def restart_stream(self, wait=None) -> bool:
+        self.stop_stream()
+        if wait is None:
+            time.sleep(OBS_HOTKEY_RESTART_PAUSE)
+        elif not wait(OBS_HOTKEY_RESTART_PAUSE):
+            return False
+        return self.start_stream()
+
+
+class ObsWebSocketController:
+    """obs-websocket v5 client over one persistent connection.
+
+    Start/Stop requests return once OBS reports the new state through a
+    StreamStateChanged event, so callers follow OBS's real response time.
+    """
+
+    EVENT_SUB_OUTPUTS = 1 << 6
+
+    def __init__(self, host: str = OBS_WS_HOST, port: int = OBS_WS_PORT,
+                 password: str = OBS_WS_PASSWORD, timeout: float = OBS_WS_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.sock = None
+        self.stream_active = None
+        self._responses = {}
+        self._pending = set()  # request ids still waited for; late replies to others are dropped
+        self._next_id = 0
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._reader = None
+
+    @property
+    def connected(self) -> bool:
+        return self.sock is not None
+
+    def connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        try:
+            key = base64.b64encode(os.urandom(16)).decode()
+            sock.sendall((
+                f"GET / HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nUpgrade: websocket\r\n"
+                f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                "Sec-WebSocket-Protocol: obswebsocket.json\r\nSec-WebSocket-Version: 13\r\n\r\n"
+            ).encode())
+            head = b""
+            while b"\r\n\r\n" not in head:
+                head += _recv_exact(sock, 1)
+            if b" 101 " not in head.split(b"\r\n", 1)[0] or _ws_accept_key(key).encode() not in head:
+                raise ConnectionError("OBS WebSocket handshake rejected")
+
+            hello = json.loads(_ws_recv(sock))
+            identify = {"rpcVersion": 1, "eventSubscriptions": self.EVENT_SUB_OUTPUTS}
+            auth = hello.get("d", {}).get("authentication")
+            if auth:
+                identify["authentication"] = _obs_auth(self.password, auth["salt"], auth["challenge"])
+            _ws_send(sock, json.dumps({"op": 1, "d": identify}))
+            if json.loads(_ws_recv(sock)).get("op") != 2:
+                raise ConnectionError("OBS WebSocket identification failed")
+        except Exception:
+            sock.close()
+            raise
+        sock.settimeout(None)
+        self.sock = sock
+        self._reader = threading.Thread(target=self._read_loop, args=(sock,), daemon=True)
+        self._reader.start()
+        try:
+            status = self._request("GetStreamStatus")
+        except Exception:
+            self.close()  # a half-open session must not count as connected
+            raise
+        with self._cond:
+            self.stream_active = bool(status.get("responseData", {}).get("outputActive"))
+        logger.info(f"Connected to OBS WebSocket at {self.host}:{self.port}.")
+
+    def close(self):
+        sock, self.sock = self.sock, None
+        if sock:
+            try:
+                _ws_send(sock, "", opcode=0x8)
+            except Exception:
+                pass
+            sock.close()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _read_loop(self, sock):
+        try:
+            while True:
+                msg = json.loads(_ws_recv(sock))
+                op, d = msg.get("op"), msg.get("d", {})
+                with self._cond:
+                    if op == 7 and d.get("requestId") in self._pending:
+                        self._responses[d.get("requestId")] = d
+                    elif op == 5 and d.get("eventType") == "StreamStateChanged":
+                        self.stream_active = bool(d.get("eventData", {}).get("outputActive"))
+                    self._cond.notify_all()
+        except Exception:
+            if self.sock is sock:
+                logger.warning("OBS WebSocket connection lost.")
+                self.sock = None
+                with self._cond:
+                    self._cond.notify_all()
+
+    def _request(self, request_type: str, data: dict = None) -> dict:
+        if not self.sock:
+            raise ConnectionError("OBS WebSocket not connected")
+        with self._cond:
+            self._next_id += 1
+            rid = str(self._next_id)
+            self._pending.add(rid)
+        payload = {"requestType": request_type, "requestId": rid}
+        if data:
+            payload["requestData"] = data
+        try:
+            with self._send_lock:
+                _ws_send(self.sock, json.dumps({"op": 6, "d": payload}))
+            with self._cond:
+                if not self._cond.wait_for(lambda: rid in self._responses or not self.sock, self.timeout):
+                    raise TimeoutError(f"OBS did not answer {request_type}")
+                if rid not in self._responses:
+                    raise ConnectionError("OBS WebSocket connection lost")
+                resp = self._responses.pop(rid)
+        finally:
+            with self._cond:
+                self._pending.discard(rid)
+                self._responses.pop(rid, None)
+        if not resp.get("requestStatus", {}).get("result"):
+            raise RuntimeError(f"{request_type} failed: {resp.get('requestStatus')}")
+        return resp
+
+    def wait_for_state(self, active: bool, timeout: float = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.stream_active == active or not self.sock,
+                                       self.timeout if timeout is None else timeout) and self.stream_active == active
+
+    def start_stream(self) -> bool:
+        if not self.stream_active:
+            self._request("StartStream")
+        ok = self.wait_for_state(True)
+        logger.info("OBS stream started." if ok else "OBS did not confirm stream start.")
+        return ok
+
+    def stop_stream(self) -> bool:
+        if self.stream_active:
+            self._request("StopStream")
+        ok = self.wait_for_state(False)
+        logger.info("OBS stream stopped." if ok else "OBS did not confirm stream stop.")
+        return ok
+
+    def restart_stream(self, wait=None) -> bool:
+        # No pause needed: stop_stream returns once OBS confirms the stream is down
+        return self.stop_stream() and self.start_stream()
+
+
+class ObsController:
+    """Uses the WebSocket backend when OBS is reachable, falling back to hotkeys."""
+
+    def __init__(self, websocket: ObsWebSocketController = None, hotkeys: HotkeyObsController = None,
+                 retry_after: float = OBS_WS_RETRY_AFTER):
+        self.websocket = websocket or ObsWebSocketController()
+        self.hotkeys = hotkeys or HotkeyObsController()
+        self.retry_after = retry_after
+        self._ws_failed_at = None
+        self._lock = threading.Lock()
+
+    def _call(self, action: str, **kwargs) -> bool:
+        with self._lock, TRACER.span(f"obs {action}", "obs"):
+            ws = self.websocket
+            if not ws.connected and (self._ws_failed_at is None
+                                     or time.monotonic() - self._ws_failed_at >= self.retry_after):
+                try:
+                    ws.connect()
+                    self._ws_failed_at = None
+                except Exception as e:
+                    self._ws_failed_at = time.monotonic()
+                    logger.debug(f"OBS WebSocket unavailable ({e}); using hotkeys.")
+            if ws.connected:
+                try:
+                    return getattr(ws, action)(**kwargs)
+                except Exception as e:
+                    logger.warning(f"OBS WebSocket {action} failed ({e}); falling back to hotkeys.")
+                    ws.close()
+                    self._ws_failed_at = time.monotonic()
+            try:
+                return getattr(self.hotkeys, action)(**kwargs)
+            except Exception as e:
+                logger.error(f"Failed to send OBS {action} hotkey(s): {e}")
+                return False
+
+    def start_stream(self) -> bool:
+        return self._call("start_stream")
+
+    def stop_stream(self) -> bool:
+        return self._call("stop_stream")
+
+    def restart_stream(self, wait=None) -> bool:
+        return self._call("restart_stream", wait=wait)
+
+
+_obs_controllers = {}
+
+def get_obs_controller(port: int = None, password: str = None) -> ObsController:
+    """Shared controller for one WebSocket port and password (defaults: OBS_WS_PORT, OBS_WS_PASSWORD)."""
+    key = (OBS_WS_HOST, port or OBS_WS_PORT, password or OBS_WS_PASSWORD)
+    if key not in _obs_controllers:
+        _obs_controllers[key] = ObsController(ObsWebSocketController(*key))
+    return _obs_controllers[key]
+
+def set_obs_password(password: str):
+    """Password for profiles that do not set obs_password (from --obs-password)."""
+    global OBS_WS_PASSWORD
+    OBS_WS_PASSWORD = password
+
+# Named conditions for "wait_for" steps. Each takes the runner and returns True once satisfied.
+WAIT_CONDITIONS = {
+    # Dismisses the OBS error dialog (and restarts the stream) if one is showing
+    "no_obs_error_dialog": lambda runner: not runner.clear_dialog(),
+}
 
 def obs_start_stream():
-    """Press UP arrow to start streaming."""
-    try:
-        pyautogui.press("up")
-        logger.info("Sent UP arrow to start streaming in OBS.")
-    except Exception as e:
-        logger.error(f"Failed to send start hotkey: {e}")
+    """Start streaming in OBS and wait for confirmation when WebSocket is available."""
+    return get_obs_controller().start_stream()
 
 def obs_stop_stream():
-    """Press DOWN arrow to stop streaming."""
-    try:
-        pyautogui.press("down")
-        logger.info("Sent DOWN arrow to stop streaming in OBS.")
-    except Exception as e:
-        logger.error(f"Failed to send stop hotkey: {e}")
+    """Stop streaming in OBS and wait for confirmation when WebSocket is available."""
+    return get_obs_controller().stop_stream()
+
+
+class Signal:
+    """Plain callback list with the connect/emit shape of a pyqtSignal."""
+
+    def __init__(self):
+        self._slots = []
 
+    def connect(self, slot):
+        self._slots.append(slot)
 
-class AutomationThread(QtCore.QThread):
-    log_signal = QtCore.pyqtSignal(str)
-    status_signal = QtCore.pyqtSignal(str)
-    stop_signal = QtCore.pyqtSignal()
-    update_timer_signal = QtCore.pyqtSignal(int)
-    error_popup_signal = QtCore.pyqtSignal(str)
+    def emit(self, *args):
+        for slot in self._slots:
+            slot(*args)
+
+
+class AutomationRunner:
+    """The automation loop. Has no GUI dependency; the GUI runs it inside gui.AutomationThread."""
 
     def __init__(self, points: list, long_wait_seconds: int, step_delay: int,
                  max_retries: int, watchdog_seconds: int, step4_wait_sec: int,
-                 dry_run: bool):
-        super().__init__()
+                 dry_run: bool, dialog_scan_interval: float = DIALOG_SCAN_INTERVAL, workflow: dict = None,
+                 max_iterations: int = 0, input_lock: threading.Lock = None,
+                 screen_source: ScreenSource = None, display_backend: DisplayBackend = None,
+                 clock: Clock = None, driver: InputDriver = None, dialog_scanner: WindowScanner = None,
+                 obs=None, state_file: str = "", resume: dict = None, adaptive_delay: bool = False,
+                 window_backend: WindowBackend = None):
+        self.log_signal = Signal()
+        self.status_signal = Signal()
+        self.stop_signal = Signal()
+        self.countdown_signal = Signal()  # (monotonic deadline, total seconds) once per long wait; (0, 0) at its end
+        self.error_popup_signal = Signal()
+        self.step_signal = Signal()  # (step index, step name, iteration) as each step begins
         self.points = points
         self.total_seconds = max(0, int(long_wait_seconds))
         self.step_delay = max(0, int(step_delay))
         self.max_retries = max(1, int(max_retries))
         self.step4_wait_sec = max(0, int(step4_wait_sec))
         self.dry_run = dry_run
+        self.dialog_scan_interval = max(0.1, float(dialog_scan_interval))
+        self.tuner = retry.StepTuner(self.step_delay) if adaptive_delay else None
+        self.random = random.Random()
+        self.last_failure = None
+        self._last_click = None
+        self._restart_requested = False
+        self._activations = 0
         self.is_running = False
-        self.watchdog = WatchdogTimer(max(1, int(watchdog_seconds)), self.watchdog_timeout)
+        self._stop_event = Event()
+        self.clock = clock or REAL_CLOCK
+        self.driver = driver
+        self.dialog_scanner = dialog_scanner
+        self.window_backend = window_backend
+        self._window_focus = None
+        self.obs = obs
+        self.watchdog = self.clock.watchdog(max(1, int(watchdog_seconds)), self.watchdog_timeout)
+        self.workflow = workflow or DEFAULT_WORKFLOW
+        self.plan = self.compile_workflow(self.workflow)
+        self.workflow_id = session.fingerprint(self.workflow)
+        self.state_file = state_file
+        self.journal = None
+        self.resume = resume
+        self.resume_deadline = None
+        self.iteration = 0
+        self.step_index = 0
+        self.iteration_pause = max(0, int(self.workflow.get("iteration_pause", 5)))
+        self.max_iterations = max(0, int(max_iterations))  # 0 = until stopped
+        self.input_lock = input_lock or INPUT_LOCK
+        self._holds_input = False
+        self.screen_source = screen_source
+        self.resolver = PointResolver(display_backend or get_display_backend())
+        self.resolved = [(p.x, p.y) for p in self.points]
 
     def stop(self):
-        """Gracefully stop the automation thread."""
+        """Gracefully stop the automation loop."""
         self.is_running = False
+        self._stop_event.set()
 
     def watchdog_timeout(self):
         msg = "Error: Script unresponsive. Watchdog timeout."
+        WATCHDOG_TIMEOUTS.inc()
         logger.error(msg)
         self.log_signal.emit(msg)
         self.status_signal.emit("Status: Error - Watchdog timeout")
         self.stop()
 
-    def safe_sleep_with_interrupt(self, seconds: int):
-        for _ in range(seconds):
+    def acquire_input(self) -> bool:
+        """Take the shared mouse/keyboard lock. Returns False if the run is stopped while waiting."""
+        if self._holds_input:
+            return True
+        while not self.input_lock.acquire(timeout=INPUT_LOCK_POLL):
             if not self.is_running:
-                self.log_signal.emit("Automation interrupted during a delay.")
                 return False
-            time.sleep(1)
+        self._holds_input = True
         return True
 
-    def execute_click(self, x: int, y: int, description: str) -> bool:
-        for attempt in range(1, self.max_retries + 1):
+    def release_input(self):
+        if self._holds_input:
+            self._holds_input = False
+            self.input_lock.release()
+
+    def clear_dialog(self) -> bool:
+        """Dismiss an OBS error dialog through this runner's driver, scanner and OBS controller."""
+        if not clear_obs_broadcast_error(False, self.dialog_scanner, self.input_driver(), clock=self.clock):
+            return False
+        # A WebSocket restart waits for OBS to confirm the stop and the start (up to 2 x OBS_WS_TIMEOUT)
+        with self.watchdog.paused():
+            restart_obs_stream(self.obs, wait=self.safe_sleep_with_interrupt)
+        return True
+
+    def input_driver(self) -> InputDriver:
+        return self.driver or get_input_driver()
+
+    def window_focus(self) -> WindowFocus:
+        """Focus tracker over this runner's window backend, or None where windows cannot be listed."""
+        if self._window_focus is None:
+            backend = self.window_backend or get_window_backend()
+            self._window_focus = WindowFocus(backend) if backend else False
+        return self._window_focus or None
+
+    def ensure_focus(self, window: str, description: str):
+        """Bring the step's target window to the front before input. Raises FocusError if it cannot."""
+        if not window or self.dry_run:
+            return
+        focus = self.window_focus()
+        if focus is None:
+            return
+        with TRACER.span("focus", "input"):
+            if not focus.ensure(window):
+                raise FocusError(f"window '{window}' is not open or could not be brought to the front")
+        if focus.activations != self._activations:
+            self._activations = focus.activations
+            self.log_signal.emit(f"[{description}] Brought '{window}' to the front.")
+
+    def recover(self, policy: "retry.RetryPolicy", description: str):
+        """Run a step's recovery actions before its next attempt."""
+        for action in policy.recover:
+            kind, _, title = action.partition(":")
+            if kind == "clear_dialog":
+                if self.clear_dialog():
+                    self.log_signal.emit(f"[{description}] Cleared an error dialog before retrying.")
+            elif kind == "focus":
+                focus = self.window_focus()
+                if focus is not None and focus.handle(title, refresh=True) is not None and focus.ensure(title):
+                    self.log_signal.emit(f"[{description}] Focused '{title}' before retrying.")
+
+    def safe_sleep_with_interrupt(self, seconds: int):
+        if not self.is_running or self.clock.wait(self._stop_event, max(0, seconds)):
+            self.log_signal.emit("Automation interrupted during a delay.")
+            return False
+        return True
+
+    def long_wait(self, seconds: float, total: float = None) -> bool:
+        """Wait until a monotonic deadline, waking only for dialog scans.
+
+        The countdown display gets the deadline once, through countdown_signal; `total` is the
+        full length of the wait when resuming part of it.
+        """
+        now = self.clock.monotonic()
+        deadline = now + seconds
+        next_scan = now
+        self.countdown_signal.emit(deadline, float(total or seconds))
+        try:
+            while self.is_running:
+                now = self.clock.monotonic()
+                LONG_WAIT_REMAINING.set(max(0.0, deadline - now))
+                if now >= deadline:
+                    return True
+                if now >= next_scan:
+                    # During long wait, look for OBS error dialog and clear it if appears.
+                    # Skip this scan if another scheduled loop is using the mouse/keyboard.
+                    if self.input_lock.acquire(blocking=False):
+                        try:
+                            with TRACER.span("dialog scan", "scan"):
+                                self.clear_dialog()
+                        finally:
+                            self.input_lock.release()
+                    next_scan = self.clock.monotonic() + self.dialog_scan_interval
+                wake = min(deadline, next_scan)
+                if self.clock.wait(self._stop_event, max(0.0, wake - self.clock.monotonic())):
+                    break
+            return False
+        finally:
+            LONG_WAIT_REMAINING.set(0)
+            self.countdown_signal.emit(0.0, 0.0)
+
+    def wait_for_screen(self, check: ScreenCheck) -> bool:
+        """Poll the check's region until it matches. False on timeout or stop."""
+        source = self.screen_source or get_screen_source()
+        deadline = self.clock.monotonic() + check.timeout
+        while self.is_running:
+            if check.matches(source):
+                return True
+            remaining = deadline - self.clock.monotonic()
+            if remaining <= 0 or self.clock.wait(self._stop_event, min(check.interval, remaining)):
+                break
+        return False
+
+    def execute_click(self, x: int, y: int, description: str, verify: ScreenCheck = None,
+                      policy: "retry.RetryPolicy" = None, window: str = "") -> bool:
+        """Click, then wait for `verify` to match or for the step delay.
+
+        With `window`, that window is brought to the front first; failing to do so
+        counts as a transient error.
+
+        Failed attempts are retried under `policy` (the Retries setting with the
+        default backoff if None). Transient errors and unanswered clicks back off
+        and run the policy's recovery actions; fatal errors and the fail-safe end
+        the step at once. The reason for a False return is left in `last_failure`.
+        """
+        policy = policy or retry.RetryPolicy(self.max_retries)
+        started = self.clock.monotonic()
+        self.last_failure = None
+        for attempt in range(1, policy.attempts + 1):
+            if attempt > 1:
+                pause = policy.delay(attempt, self.random)
+                if policy.budget and self.clock.monotonic() - started + pause > policy.budget:
+                    self.log_signal.emit(f"[{description}] Retry budget of {policy.budget:g}s used up.")
+                    break
+                self.recover(policy, description)
+                with self.watchdog.paused():
+                    if not self.safe_sleep_with_interrupt(pause):
+                        self.last_failure = "stopped"
+                        return False
             try:
-                self.log_signal.emit(f"[{description}] Attempt {attempt}/{self.max_retries}")
+                self.log_signal.emit(f"[{description}] Attempt {attempt}/{policy.attempts}")
+                CLICK_ATTEMPTS.inc(step=description)
+                if attempt > 1:
+                    CLICK_RETRIES.inc(step=description)
                 logger.debug(f"Clicking at ({x}, {y}) - {description} - attempt {attempt}")
+                if verify:
+                    verify.place(x, y)
                 if not self.dry_run:
-                    pyautogui.click(x, y)
+                    self.ensure_focus(window, description)
+                    if verify:
+                        verify.prepare(self.screen_source or get_screen_source())
+                    with TRACER.span(f"click {description}", "input"):
+                        self.input_driver().click(x, y)
                 else:
                     self.log_signal.emit(f"[DRY RUN] Would click at ({x}, {y})")
-                # Pause watchdog during intentional per-step delay to avoid false timeouts
-                try:
-                    self.watchdog.cancel()
-                except Exception:
-                    pass
-                if not self.safe_sleep_with_interrupt(self.step_delay):
+                if verify is None or self.dry_run:
+                    self._tune(description, attempt)
+                    # Pause watchdog during intentional per-step delay to avoid false timeouts
+                    with self.watchdog.paused():
+                        if self.safe_sleep_with_interrupt(self.step_delay_for(description)):
+                            return True
+                        self.last_failure = "stopped"
+                        return False
+                with self.watchdog.paused(), TRACER.span("verify screen", "verify"):
+                    if self.wait_for_screen(verify):
+                        self._tune(description, attempt, verified=True)
+                        return True
+                if not self.is_running:
+                    self.log_signal.emit("Automation interrupted during a delay.")
+                    self.last_failure = "stopped"
                     return False
-                # Resume watchdog after delay
-                self.watchdog.reset()
-                return True
-            except pyautogui.FailSafeException:
-                self.log_signal.emit("PyAutoGUI Fail-safe triggered (mouse to top-left). Stopping.")
-                logger.exception("PyAutoGUI Fail-safe triggered")
-                self.stop()
-                return False
+                CLICK_ERRORS.inc(step=description, kind="no_response")
+                self.log_signal.emit(f"[{description}] Screen did not respond within {verify.timeout:g}s.")
             except Exception as e:
+                kind = retry.classify(e, is_failsafe)
+                CLICK_ERRORS.inc(step=description, kind=kind)
+                if kind == retry.FAILSAFE:
+                    self.log_signal.emit("PyAutoGUI Fail-safe triggered (mouse to top-left). Stopping.")
+                    logger.exception("PyAutoGUI Fail-safe triggered")
+                    self.stop()
+                    self.last_failure = kind
+                    return False
                 logger.exception(f"Error during {description}: {e}")
+                if kind == retry.FATAL:
+                    self.log_signal.emit(f"[{description}] {type(e).__name__}: {e}. Not retrying.")
+                    self.last_failure = kind
+                    return False
                 self.log_signal.emit(f"Retrying {description} due to: {e}")
+        self._tune(description, policy.attempts, ok=False, verified=verify is not None and not self.dry_run)
+        self.last_failure = retry.TRANSIENT
         return False
 
-    def run(self):
-        self.is_running = True
+    def enter_text(self, text: str, method: str = "type", confirm: bool = False,
+                   timeout: float = TEXT_CONFIRM_TIMEOUT) -> bool:
+        """Type or paste `text` into the focused field.
+
+        With `confirm` the field is read back (select all, copy) until it holds
+        `text`, and entered again over a selection if it does not, up to the
+        Retries setting. The user's clipboard text is put back afterwards. If the
+        clipboard cannot be used, the text is typed and `timeout` waited instead.
+        """
+        driver = self.input_driver()
+        saved, wait_instead = None, False
+        if method == "paste" or confirm:
+            try:
+                saved = driver.get_clipboard()
+            except Exception as e:
+                logger.warning(f"Clipboard not available ({e}); typing the text and waiting {timeout:g}s instead.")
+                method, wait_instead, confirm = "type", confirm, False
         try:
-            self.status_signal.emit("Status: Running")
-            while self.is_running:
-                self.log_signal.emit("Starting new iteration.")
-
-                self.watchdog.reset()
-                if not self.execute_click(self.points[0].x, self.points[0].y, self.points[0].name):
-                    self.log_signal.emit("Failed after retries: Step 1")
-                    break
-
-                self.watchdog.reset()
-                if not self.execute_click(self.points[1].x, self.points[1].y, self.points[1].name):
-                    self.log_signal.emit("Failed after retries: Step 2")
-                    break
-                current_date = datetime.datetime.now().strftime('%Y-%m-%d')
-                if not self.dry_run:
-                    pyautogui.typewrite(current_date)
-                self.log_signal.emit(f"Entered date: {current_date}")
-                if not self.safe_sleep_with_interrupt(2):
-                    break
-
-                self.watchdog.reset()
-                if not self.execute_click(self.points[2].x, self.points[2].y, self.points[2].name):
-                    self.log_signal.emit("Failed after retries: Step 3")
-                    break
-
-                # FIX: Pause watchdog for Step 4 wait to avoid false timeouts
-                self.log_signal.emit(f"Step 4: Waiting for {self.step4_wait_sec} seconds.")
-                self.watchdog.cancel()
-                if not self.safe_sleep_with_interrupt(self.step4_wait_sec):
-                    break
-                self.watchdog.reset()
-
-                self.watchdog.reset()
-                if not self.execute_click(self.points[3].x, self.points[3].y, self.points[3].name):
-                    self.log_signal.emit("Failed after retries: Step 5")
-                    break
-
-                hrs = self.total_seconds // 3600
-                mins = (self.total_seconds % 3600) // 60
-                self.log_signal.emit(f"Step 6: Long wait for {hrs}h {mins}m.")
-                self.watchdog.cancel()
-                remaining = self.total_seconds
-                while remaining > 0 and self.is_running:
-                    self.update_timer_signal.emit(remaining)
-                    # During long wait, look for OBS error dialog and clear it if appears
-                    clear_obs_broadcast_error(True)
-                    time.sleep(1)
-                    remaining -= 1
+            for attempt in range(1, self.max_retries + 1):
+                if attempt > 1:
+                    self.log_signal.emit(f"[type_text] Field reads back differently; entering the text again "
+                                         f"({attempt}/{self.max_retries}).")
+                    driver.hotkey("ctrl", "a")
+                with TRACER.span("enter text", "input"):
+                    if method == "paste":
+                        driver.set_clipboard(text)
+                        driver.hotkey("ctrl", "v")
+                    else:
+                        driver.typewrite(text)
+                if not confirm:
+                    if saved is not None:
+                        self.clock.sleep(TEXT_PASTE_SETTLE)  # the app reads the clipboard after the keystroke
+                    return self.safe_sleep_with_interrupt(timeout) if wait_instead else True
+                if self._read_back(text, timeout):
+                    return True
                 if not self.is_running:
+                    return False
+            return False
+        finally:
+            if saved is not None:
+                try:
+                    driver.set_clipboard(saved)
+                except Exception as e:
+                    logger.warning(f"Could not restore the clipboard: {e}")
+
+    def _read_back(self, text: str, timeout: float) -> bool:
+        """Select all and copy, then poll the clipboard until it holds `text` or `timeout` passes."""
+        driver = self.input_driver()
+        driver.hotkey("ctrl", "a")
+        driver.hotkey("ctrl", "c")
+        deadline = self.clock.monotonic() + timeout
+        while True:
+            try:
+                if driver.get_clipboard() == text:
+                    return True
+            except Exception as e:
+                logger.debug(f"Clipboard not readable yet: {e}")  # another program may hold it for a moment
+            if self.clock.monotonic() >= deadline or self.clock.wait(self._stop_event, VERIFY_POLL_INTERVAL):
+                return False
+            self.watchdog.beat()
+
+    def step_delay_for(self, description: str) -> float:
+        """Delay after an unverified click: Step delay, or the tuned value with adaptive delay on."""
+        return self.tuner.delay(description) if self.tuner else self.step_delay
+
+    def _tune(self, description: str, attempts: int, ok: bool = True, verified: bool = False):
+        if self.tuner:
+            self.tuner.record(description, attempts, ok, self._last_click, verified)
+            if self._last_click:
+                STEP_DELAY.set(self.tuner.delay(self._last_click), step=self._last_click)
+        # Only an unverified click is followed by the step delay
+        self._last_click = None if verified else description
+
+    def compile_workflow(self, workflow: dict) -> list:
+        """Turn workflow steps into a list of ready-to-call actions. Each returns False to end the run."""
+        compilers = {
+            "click": self._compile_click,
+            "type_text": self._compile_type_text,
+            "wait": self._compile_wait,
+            "hotkey": self._compile_hotkey,
+            "wait_for": self._compile_wait_for,
+        }
+        self.default_window = str(workflow.get("window", ""))
+        plan = []
+        self.step_names = []
+        for i, step in enumerate(workflow.get("steps", [])):
+            compiler = compilers.get(step.get("type"))
+            if compiler is None:
+                raise ValueError(f"Workflow step {i + 1}: unknown type {step.get('type')!r}")
+            try:
+                plan.append(compiler(step))
+                self.step_names.append(f"{i + 1} {self._step_label(step)}")
+            except KeyError as e:
+                raise ValueError(f"Workflow step {i + 1} ({step.get('type')}): missing or unknown {e}") from e
+            except (IndexError, TypeError, ValueError) as e:
+                raise ValueError(f"Workflow step {i + 1} ({step.get('type')}): {e}") from e
+        if not plan:
+            raise ValueError("Workflow has no steps")
+        return plan
+
+    def _step_label(self, step: dict) -> str:
+        if step.get("label"):
+            return str(step["label"])
+        if step["type"] == "click":
+            return self.points[int(step["point"])].name
+        if step["type"] == "wait":
+            return f"wait {step['seconds']}"
+        if step["type"] == "wait_for":
+            return f"wait_for {step['condition']}"
+        return step["type"]
+
+    def _compile_click(self, step: dict):
+        index = int(step["point"])
+        label = step.get("label", self.points[index].name)
+        verify = ScreenCheck.from_step(step["verify"], self.step_delay) if "verify" in step else None
+        policy = retry.RetryPolicy.from_step(step.get("retry"), self.max_retries)
+        anchor = self.points[index].anchor
+        window = str(step.get("window", anchor[len("window:"):] if anchor.startswith("window:") else self.default_window))
+        for i, action in enumerate(policy.recover):
+            if action == "focus":
+                # Plain "focus" means the window the point is anchored to
+                if not anchor.startswith("window:"):
+                    raise ValueError("retry: recover \"focus\" needs a window title or a window-anchored point")
+                policy.recover = policy.recover[:i] + ("focus:" + anchor[len("window:"):],) + policy.recover[i + 1:]
+
+        def action():
+            self.watchdog.beat()
+            x, y = self.resolved[index]
+            if self.execute_click(x, y, label, verify, policy, window):
+                return True
+            if self.last_failure == "stopped":
+                return False
+            CLICK_FAILURES.inc(step=label)
+            self.log_signal.emit(f"Failed after retries: {label}")
+            if self.last_failure == retry.TRANSIENT and self.is_running:
+                if policy.on_failure == "skip":
+                    self.log_signal.emit(f"Skipping {label} and continuing.")
+                    return True
+                if policy.on_failure == "restart":
+                    self._restart_requested = True
+            return False
+        return action
+
+    def _compile_type_text(self, step: dict):
+        template = str(step["text"])
+        format_text(template, datetime.datetime.now(), 1)  # unknown {fields} fail here, not mid-run
+        window = str(step.get("window", self.default_window))
+        method = str(step.get("method", "type"))
+        if method not in ("type", "paste"):
+            raise ValueError("method must be \"type\" or \"paste\"")
+        confirm = bool(step.get("confirm", False))
+        timeout = max(0.0, float(step.get("timeout", TEXT_CONFIRM_TIMEOUT)))
+
+        def action():
+            text = format_text(template, self.clock.now(), self.iteration + 1)
+            if not self.dry_run:
+                self.ensure_focus(window, "type_text")
+                if not self.enter_text(text, method, confirm, timeout):
+                    if self.is_running:
+                        self.log_signal.emit(f"Text did not read back as entered: {text}")
+                    return False
+            self.log_signal.emit(f"Entered text: {text}")
+            return True
+        return action
+
+    def _compile_wait(self, step: dict):
+        seconds = step["seconds"]
+        if isinstance(seconds, str):
+            seconds = {"step4_wait": self.step4_wait_sec, "long_wait": self.total_seconds}[seconds]
+        seconds = max(0, int(seconds))
+        label = step.get("label")
+
+        if step.get("countdown"):
+            def action():
+                now = self.clock.now().timestamp()
+                deadline, self.resume_deadline = self.resume_deadline or now + seconds, None
+                left = max(0, int(round(deadline - now)))
+                self.checkpoint(deadline)
+                hrs, mins = left // 3600, (left % 3600) // 60
+                if left == seconds:
+                    self.log_signal.emit(f"{label or 'Long wait'}: Long wait for {hrs}h {mins}m.")
+                else:
+                    self.log_signal.emit(f"{label or 'Long wait'}: Resuming long wait, {hrs}h {mins}m left.")
+                with self.watchdog.paused():
+                    self.release_input()
+                    done = self.long_wait(left, seconds) and self.acquire_input()
+                if not done:
                     self.log_signal.emit("Automation interrupted during long wait.")
-                    break
-
+                    return False
                 self.log_signal.emit("Long wait completed.")
-                self.watchdog.reset()
-                if not self.safe_sleep_with_interrupt(2):
-                    break
-
-                # Before Step 7/8 try to clear any lingering OBS error dialog
-                clear_obs_broadcast_error(True)
-
-                self.watchdog.reset()
-                if not self.execute_click(self.points[4].x, self.points[4].y, self.points[4].name):
-                    self.log_signal.emit("Failed after retries: Step 7")
-                    break
-
-                clear_obs_broadcast_error(True)
+                return True
+            return action
+
+        def action():
+            if label:
+                self.log_signal.emit(f"{label}: Waiting for {seconds} seconds.")
+            # Pause watchdog during intentional waits to avoid false timeouts
+            with self.watchdog.paused():
+                return self.safe_sleep_with_interrupt(seconds)
+        return action
+
+    def _compile_hotkey(self, step: dict):
+        keys = [str(k) for k in step["keys"]]
+        if not keys:
+            raise ValueError("keys")
+        window = str(step.get("window", self.default_window))
+
+        def action():
+            if not self.dry_run:
+                self.ensure_focus(window, "hotkey")
+                self.input_driver().hotkey(*keys)
+            self.log_signal.emit(f"Pressed hotkey: {'+'.join(keys)}")
+            return True
+        return action
+
+    def _compile_wait_for(self, step: dict):
+        name = step["condition"]
+        condition = WAIT_CONDITIONS[name]
+        timeout = max(0.0, float(step.get("timeout", 0)))
+        interval = max(0.1, float(step.get("interval", 1)))
+        required = bool(step.get("required", False))
+
+        def action():
+            deadline = self.clock.monotonic() + timeout
+            while not condition(self):
+                if self.clock.monotonic() >= deadline:
+                    if required:
+                        self.log_signal.emit(f"Condition not met: {name}")
+                        return False
+                    return True
+                self.watchdog.beat()
+                with self.watchdog.paused():
+                    if self.clock.wait(self._stop_event, interval):
+                        return False
+            return True
+        return action
+
+    def run_iteration(self, start: int = 0) -> bool:
+        """One pass over the plan, from step `start`. False if a step ended the run."""
+        with TRACER.span("iteration", "loop"):
+            for i in range(start, len(self.plan)):
+                name, action = self.step_names[i], self.plan[i]
+                self.step_index = i
+                self.checkpoint()
+                self.step_signal.emit(i, name, self.iteration)
+                t0 = self.clock.monotonic()
+                with TRACER.span(name, "step"):
+                    ok = action()
+                STEP_SECONDS.observe(self.clock.monotonic() - t0, step=name)
+                if not ok:
+                    return False
+        return True
 
-                self.watchdog.reset()
-                if not self.execute_click(self.points[5].x, self.points[5].y, self.points[5].name):
-                    self.log_signal.emit("Failed after retries: Step 8")
-                    break
+    def checkpoint(self, deadline: float = None):
+        """Queue the current iteration and step (and long-wait end, as a Unix time) for crash-resume."""
+        if self.journal:
+            self.journal.record({"state": "step", "at": round(self.clock.now().timestamp(), 3),
+                                 "iteration": self.iteration, "step": self.step_index,
+                                 "label": self.step_names[self.step_index],
+                                 "deadline": None if deadline is None else round(deadline, 3),
+                                 "workflow": self.workflow_id})
+
+    def _start_point(self) -> int:
+        """Step to begin at: the resumed step if `resume` is a valid checkpoint for this workflow, else 0."""
+        point, self.resume = self.resume, None
+        if not point:
+            return 0
+        step = point.get("step")
+        if point.get("workflow") != self.workflow_id or not isinstance(step, int) or not 0 <= step < len(self.plan):
+            self.log_signal.emit("Saved session does not match this workflow; starting from the beginning.")
+            return 0
+        self.iteration = max(0, int(point.get("iteration", 0)))
+        self.resume_deadline = point.get("deadline")
+        self.log_signal.emit(f"Resuming at {self.step_names[step]} (iteration {self.iteration + 1}).")
+        return step
+
+    def _open_journal(self):
+        if not self.state_file:
+            return
+        try:
+            self.journal = session.SessionJournal(self.state_file)
+        except OSError as e:
+            logger.warning(f"Could not open {self.state_file}; crash-resume is off for this run: {e}")
+
+    def _close_journal(self):
+        if self.journal:
+            self.journal.record({"state": "ended", "at": round(self.clock.now().timestamp(), 3),
+                                 "iteration": self.iteration})
+            self.journal.close()
+            self.journal = None
+
+    def dump_metrics(self, iteration: int):
+        """Append the current metrics to METRICS_CSV."""
+        if not METRICS_CSV:
+            return
+        try:
+            metrics.REGISTRY.write_csv(METRICS_CSV, iteration=iteration)
+        except OSError as e:
+            logger.warning(f"Could not write {METRICS_CSV}: {e}")
 
-                self.log_signal.emit("Iteration completed. Restarting loop.")
-                self.watchdog.cancel()
-                if not self.safe_sleep_with_interrupt(5):
-                    break
-                self.watchdog.reset()
+    def run(self):
+        self.is_running = True
+        self._stop_event.clear()
+        RUNS_ACTIVE.inc()
+        try:
+            self.status_signal.emit("Status: Running")
+            self.iteration = 0
+            start = self._start_point()
+            self._open_journal()
+            if not self.acquire_input():
+                return
+            restarts = 0
+            while self.is_running:
+                self.log_signal.emit("Starting new iteration.")
+                started = self.clock.monotonic()
+                self.resolved = self.resolver.resolve(self.points)
+                self._last_click = None
+                self._restart_requested = False
+                if self.run_iteration(start):
+                    start = 0
+                    restarts = 0
+                    self.iteration += 1
+                    ITERATIONS.inc()
+                    ITERATION_SECONDS.observe(self.clock.monotonic() - started)
+                    self.dump_metrics(self.iteration)
+                    if self.max_iterations and self.iteration >= self.max_iterations:
+                        self.log_signal.emit(f"Completed {self.iteration} iteration(s).")
+                        self.status_signal.emit("Status: Finished")
+                        break
+                    self.log_signal.emit("Iteration completed. Restarting loop.")
+                    self.step_index = 0
+                    self.checkpoint()
+                    with self.watchdog.paused():
+                        self.release_input()
+                        if self.safe_sleep_with_interrupt(self.iteration_pause) and self.acquire_input():
+                            continue
+                elif self._restart_requested and self.is_running and restarts < retry.RETRY_RESTARTS:
+                    restarts += 1
+                    start = 0
+                    pause = self.iteration_pause * 2 ** (restarts - 1)
+                    self.log_signal.emit(f"Restarting the iteration in {pause}s "
+                                         f"(restart {restarts}/{retry.RETRY_RESTARTS}).")
+                    self.step_index = 0
+                    self.checkpoint()
+                    with self.watchdog.paused():
+                        self.release_input()
+                        if self.safe_sleep_with_interrupt(pause) and self.acquire_input():
+                            continue
+                break
 
         except Exception as e:
-            logger.exception("An error occurred in AutomationThread")
+            logger.exception("An error occurred in AutomationRunner")
             self.log_signal.emit(f"An error occurred: {e}")
             self.status_signal.emit("Status: Error")
             self.error_popup_signal.emit(str(e))
         finally:
+            RUNS_ACTIVE.inc(-1)
             self.is_running = False
-            self.watchdog.cancel()
+            self.release_input()
+            self.watchdog.close()
+            self._close_journal()
             self.stop_signal.emit()
 
-class CaptureOverlay(QtWidgets.QWidget):
-    captured = QtCore.pyqtSignal(int, int)
-    cancelled = QtCore.pyqtSignal()
-
-    def __init__(self):
-        super().__init__()
-        self.setWindowFlags(
-            QtCore.Qt.FramelessWindowHint
-            | QtCore.Qt.WindowStaysOnTopHint
-            | QtCore.Qt.Tool
+@dataclass
+class RunConfig:
+    """Settings for one automation run, as set in the Runner and Coordinates tabs."""
+    hours: int = 11
+    minutes: int = 30
+    step_delay: int = 10
+    retries: int = 3
+    watchdog: int = 15
+    step4_wait: int = 10
+    dry_run: bool = False
+    adaptive_delay: bool = False
+    obs_port: int = OBS_WS_PORT
+    obs_password: str = ""        # "" = OBS_WS_PASSWORD
+    workflow: str = WORKFLOW_FILE
+    points: list = field(default_factory=lambda: [copy.copy(p) for p in DEFAULT_POINTS])
+
+    @property
+    def long_wait_seconds(self) -> int:
+        return self.hours * 3600 + self.minutes * 60
+
+    def make_runner(self, **overrides) -> AutomationRunner:
+        """Build a runner from these settings. Keyword overrides go straight to AutomationRunner."""
+        if "workflow" not in overrides:
+            overrides["workflow"] = load_workflow(self.workflow)
+        overrides.setdefault("obs", get_obs_controller(self.obs_port, self.obs_password))
+        return AutomationRunner(
+            points=[copy.copy(p) for p in self.points],
+            long_wait_seconds=self.long_wait_seconds,
+            step_delay=self.step_delay,
+            max_retries=self.retries,
+            watchdog_seconds=self.watchdog,
+            step4_wait_sec=self.step4_wait,
+            dry_run=self.dry_run,
+            adaptive_delay=self.adaptive_delay,
+            **overrides,
         )
-        self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
-        self._build()
-        self.timer = QtCore.QTimer(self)
-        self.timer.timeout.connect(self._tick)
-        self._last_ctrl = False
-
-    def _build(self):
-        self.resize(420, 120)
-        screen = QtWidgets.QApplication.primaryScreen().availableGeometry()
-        self.move(int(screen.center().x() - self.width()/2), 40)
-
-        self.card = QtWidgets.QFrame(self)
-        self.card.setGeometry(0, 0, 420, 120)
-        self.card.setStyleSheet("""
-            QFrame {
-                background: rgba(255,255,255,0.92);
-                border-radius: 12px;
-                border: 1px solid #c9c9c9;
-            }
-        """)
-
-        v = QtWidgets.QVBoxLayout(self.card)
-        title = QtWidgets.QLabel("Coordinate Capture")
-        title.setAlignment(QtCore.Qt.AlignCenter)
-        title.setFont(QtGui.QFont("Segoe UI", 12, QtGui.QFont.Bold))
-        v.addWidget(title)
-
-        self.pos_lbl = QtWidgets.QLabel("Position: (0, 0)")
-        self.pos_lbl.setAlignment(QtCore.Qt.AlignCenter)
-        self.pos_lbl.setFont(QtGui.QFont("Segoe UI", 11))
-        v.addWidget(self.pos_lbl)
-
-        tip = QtWidgets.QLabel("Place the mouse, then press LEFT CTRL to capture. Press ESC to cancel.")
-        tip.setAlignment(QtCore.Qt.AlignCenter)
-        tip.setFont(QtGui.QFont("Segoe UI", 10))
-        v.addWidget(tip)
 
-    def start(self):
-        self.show()
-        self.timer.start(25)
-
-    def _tick(self):
-        pos = pyautogui.position()
-        self.pos_lbl.setText(f"Position: ({pos.x}, {pos.y})")
-        if key_pressed(VK_ESCAPE):
-            self.timer.stop()
-            self.hide()
-            self.cancelled.emit()
-            return
-        ctrl_now = key_pressed(VK_LCONTROL)
-        if ctrl_now and not self._last_ctrl:
-            self.timer.stop()
-            self.hide()
-            self.captured.emit(pos.x, pos.y)
-            return
-        self._last_ctrl = ctrl_now
-
-class RunnerTab(QtWidgets.QWidget):
-    start_clicked = QtCore.pyqtSignal()
-    stop_clicked  = QtCore.pyqtSignal()
-
-    def __init__(self):
-        super().__init__()
-        self._build()
-
-    def _build(self):
-        layout = QtWidgets.QVBoxLayout(self)
-
-        title = QtWidgets.QLabel(f"{APP_TITLE} - by {APP_AUTHOR}")
-        title.setAlignment(QtCore.Qt.AlignCenter)
-        title.setFont(QtGui.QFont("Segoe UI", 20, QtGui.QFont.Bold))
-        layout.addWidget(title)
-
-        time_row = QtWidgets.QHBoxLayout()
-        self.hours_input = QtWidgets.QSpinBox()
-        self.hours_input.setRange(0, 48)
-        self.hours_input.setPrefix("Hours: ")
-        self.minutes_input = QtWidgets.QSpinBox()
-        self.minutes_input.setRange(0, 59)
-        self.minutes_input.setPrefix("Minutes: ")
-        time_row.addWidget(self.hours_input)
-        time_row.addWidget(self.minutes_input)
-        layout.addLayout(time_row)
-
-        settings_row = QtWidgets.QHBoxLayout()
-        self.step_delay = QtWidgets.QSpinBox()
-        self.step_delay.setRange(0, 120)
-        self.step_delay.setPrefix("Step delay (s): ")
-
-        self.max_retries = QtWidgets.QSpinBox()
-        self.max_retries.setRange(1, 10)
-        self.max_retries.setPrefix("Retries: ")
-
-        self.watchdog_sec = QtWidgets.QSpinBox()
-        self.watchdog_sec.setRange(3, 600)
-        self.watchdog_sec.setPrefix("Watchdog (s): ")
-
-        self.step4_wait = QtWidgets.QSpinBox()
-        self.step4_wait.setRange(0, 300)
-        self.step4_wait.setPrefix("Step 4 wait (s): ")
-
-        settings_row.addWidget(self.step_delay)
-        settings_row.addWidget(self.max_retries)
-        settings_row.addWidget(self.watchdog_sec)
-        settings_row.addWidget(self.step4_wait)
-        layout.addLayout(settings_row)
-
-        toggles_row = QtWidgets.QHBoxLayout()
-        self.dry_run = QtWidgets.QCheckBox("Dry run (no actual clicks)")
-        self.always_on_top = QtWidgets.QCheckBox("Always on top")
-        toggles_row.addWidget(self.dry_run)
-        toggles_row.addWidget(self.always_on_top)
-        layout.addLayout(toggles_row)
-
-        self.status_label = QtWidgets.QLabel("Status: Idle")
-        self.status_label.setAlignment(QtCore.Qt.AlignCenter)
-        self.status_label.setFont(QtGui.QFont("Segoe UI", 12))
-        layout.addWidget(self.status_label)
-
-        self.timer_label = QtWidgets.QLabel("Timer: Not Started")
-        self.timer_label.setAlignment(QtCore.Qt.AlignCenter)
-        self.timer_label.setFont(QtGui.QFont("Segoe UI", 14, QtGui.QFont.Bold))
-        layout.addWidget(self.timer_label)
-
-        btn_row = QtWidgets.QHBoxLayout()
-        self.start_btn = QtWidgets.QPushButton("Start")
-        self.stop_btn = QtWidgets.QPushButton("Stop")
-        self.stop_btn.setEnabled(False)
-        self.start_btn.clicked.connect(self.start_clicked.emit)
-        self.stop_btn.clicked.connect(self.stop_clicked.emit)
-        btn_row.addWidget(self.start_btn)
-        btn_row.addWidget(self.stop_btn)
-        layout.addLayout(btn_row)
-
-        self.progress = QtWidgets.QProgressBar()
-        self.progress.setRange(0, 100)
-        self.progress.setValue(0)
-        layout.addWidget(self.progress)
-
-        hotkey = QtWidgets.QLabel("Hotkeys: Delete = Emergency Stop • Capture: LEFT CTRL • Esc = cancel capture")
-        hotkey.setAlignment(QtCore.Qt.AlignCenter)
-        hotkey.setFont(QtGui.QFont("Segoe UI", 9))
-        layout.addWidget(hotkey)
-
-        self.log_view = QtWidgets.QTextEdit()
-        self.log_view.setReadOnly(True)
-        self.log_view.setMinimumHeight(160)
-        layout.addWidget(self.log_view)
-
-        layout.addStretch()
-
-class CoordinatesTab(QtWidgets.QWidget):
-    def __init__(self, points: list):
-        super().__init__()
-        self.points = points
-        self.overlay = None
-        self._build()
-
-    def _build(self):
-        layout = QtWidgets.QVBoxLayout(self)
-        info = QtWidgets.QLabel(
-            "Edit coordinates. Click Pick, then press LEFT CTRL to capture.\nESC cancels. Use Test Click to fire one click."
-        )
-        layout.addWidget(info)
-
-        self.table = QtWidgets.QTableWidget(len(self.points), 4)
-        self.table.setHorizontalHeaderLabels(["Step", "X", "Y", "Actions"])
-        self.table.verticalHeader().setVisible(False)
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
-
-        for row, p in enumerate(self.points):
-            name_item = QtWidgets.QTableWidgetItem(p.name)
-            self.table.setItem(row, 0, name_item)
-
-            x_spin = QtWidgets.QSpinBox()
-            x_spin.setRange(0, 9999)
-            x_spin.setValue(p.x)
-            x_spin.valueChanged.connect(lambda val, r=row: self._update_point(r, "x", val))
-            self.table.setCellWidget(row, 1, x_spin)
-
-            y_spin = QtWidgets.QSpinBox()
-            y_spin.setRange(0, 9999)
-            y_spin.setValue(p.y)
-            y_spin.valueChanged.connect(lambda val, r=row: self._update_point(r, "y", val))
-            self.table.setCellWidget(row, 2, y_spin)
-
-            actions = QtWidgets.QWidget()
-            h = QtWidgets.QHBoxLayout(actions)
-            h.setContentsMargins(0, 0, 0, 0)
-            pick_btn = QtWidgets.QPushButton("Pick")
-            test_btn = QtWidgets.QPushButton("Test Click")
-            pick_btn.clicked.connect(lambda _=None, r=row: self._pick_coord_ctrl(r))
-            test_btn.clicked.connect(lambda _=None, r=row: self._test_click(r))
-            h.addWidget(pick_btn)
-            h.addWidget(test_btn)
-            self.table.setCellWidget(row, 3, actions)
-
-        self.table.resizeColumnsToContents()
-        layout.addWidget(self.table)
-
-        row2 = QtWidgets.QHBoxLayout()
-        self.save_btn = QtWidgets.QPushButton("Save Coordinates")
-        self.load_btn = QtWidgets.QPushButton("Reload Saved")
-        self.save_btn.clicked.connect(self.save_to_settings)
-        self.load_btn.clicked.connect(self.load_from_settings)
-        row2.addWidget(self.save_btn)
-        row2.addWidget(self.load_btn)
-        layout.addLayout(row2)
-
-        layout.addStretch()
-
-    def _update_point(self, row: int, field: str, value: int):
-        if field == "x":
-            self.points[row].x = value
-        else:
-            self.points[row].y = value
-
-    def _pick_coord_ctrl(self, row: int):
-        parent = self.window()
-        parent.showMinimized()
-        self.overlay = CaptureOverlay()
-        self.overlay.captured.connect(lambda x, y, r=row: self._apply_capture(r, x, y))
-        self.overlay.cancelled.connect(self._cancel_capture)
-        self.overlay.start()
-
-    def _apply_capture(self, row: int, x: int, y: int):
-        self.points[row].x, self.points[row].y = x, y
-        self.table.cellWidget(row, 1).setValue(x)
-        self.table.cellWidget(row, 2).setValue(y)
-        logger.info(f"Captured {self.points[row].name}: ({x}, {y})")
-        self.window().showNormal()
-        self.overlay = None
-
-    def _cancel_capture(self):
-        logger.info("Coordinate capture cancelled.")
-        self.window().showNormal()
-        self.overlay = None
-
-    def _test_click(self, row: int):
-        x, y = self.points[row].x, self.points[row].y
-        try:
-            pyautogui.click(x, y)
-            logger.info(f"Test clicked at ({x}, {y}) for {self.points[row].name}")
-        except pyautogui.FailSafeException:
-            logger.exception("PyAutoGUI Fail-safe triggered during test click.")
-            QtWidgets.QMessageBox.warning(self, "Test Click", "Fail-safe triggered.")
-        except Exception as e:
-            logger.exception(f"Test click failed: {e}")
-            QtWidgets.QMessageBox.critical(self, "Test Click Failed", str(e))
-
-    def save_to_settings(self):
-        settings = QtCore.QSettings("xTheRedShirtx", "AutoRunnerPro")
-        save_points(settings, self.points)
-        QtWidgets.QMessageBox.information(self, "Saved", "Coordinates saved.")
-
-    def load_from_settings(self):
-        settings = QtCore.QSettings("xTheRedShirtx", "AutoRunnerPro")
-        loaded = load_points(settings)
-        if len(loaded) != len(self.points):
-            QtWidgets.QMessageBox.warning(self, "Mismatch", "Saved set has different size; ignoring.")
-            return
-        self.points[:] = loaded
-        for r, p in enumerate(self.points):
-            self.table.item(r, 0).setText(p.name)
-            self.table.cellWidget(r, 1).setValue(p.x)
-            self.table.cellWidget(r, 2).setValue(p.y)
-        QtWidgets.QMessageBox.information(self, "Loaded", "Coordinates reloaded.")
-
-class DebugTab(QtWidgets.QWidget):
-    def __init__(self):
-        super().__init__()
-        self._build()
-
-    def _build(self):
-        layout = QtWidgets.QVBoxLayout(self)
-        self.log_view = QtWidgets.QTextEdit()
-        self.log_view.setReadOnly(True)
-        layout.addWidget(self.log_view)
-
-        row = QtWidgets.QHBoxLayout()
-        open_btn = QtWidgets.QPushButton("Open Log File")
-        copy_btn = QtWidgets.QPushButton("Copy Logs")
-        clear_btn = QtWidgets.QPushButton("Clear View")
-        row.addWidget(open_btn)
-        row.addWidget(copy_btn)
-        row.addWidget(clear_btn)
-        layout.addLayout(row)
-
-        open_btn.clicked.connect(self._open_log)
-        copy_btn.clicked.connect(self._copy_logs)
-        clear_btn.clicked.connect(lambda: self.log_view.clear())
-
-    def _open_log(self):
-        QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(LOG_FILE))
-
-    def _copy_logs(self):
-        self.log_view.selectAll()
-        self.log_view.copy()
-        QtWidgets.QMessageBox.information(self, "Copied", "Logs copied to clipboard.")
-
-class HelpTab(QtWidgets.QWidget):
-    def __init__(self):
-        super().__init__()
-        v = QtWidgets.QVBoxLayout(self)
-        txt = QtWidgets.QTextBrowser()
-        txt.setOpenExternalLinks(True)
-        txt.setHtml(f"""
-            <h2>How it works</h2>
-            <p><b>Built by {APP_AUTHOR}</b></p>
-            <ul>
-                <li><b>Runner</b>: set waits, retries, watchdog; Start/Stop controls.</li>
-                <li><b>Coordinates</b>: Pick with <b>Left Ctrl</b>. ESC cancels.</li>
-                <li><b>Debug</b>: Live logs; open/copy log file.</li>
-                <li><b>Hotkeys</b>: <b>Delete</b> = emergency stop. Fail-safe: move mouse to top-left.</li>
-            </ul>
-        """)
-        v.addWidget(txt)
-        v.addStretch()
-
-class LogEmitter(QtCore.QObject):
-    sig = QtCore.pyqtSignal(str)
-
-class QtSignalLogHandler(logging.Handler):
-    def __init__(self, emitter: LogEmitter):
-        super().__init__()
-        self.emitter = emitter
-    def emit(self, record):
-        try:
-            msg = self.format(record)
-            self.emitter.sig.emit(msg)
-        except Exception:
-            pass
+def load_run_config(path: str) -> RunConfig:
+    """Read a run settings file (.toml or .json). Missing keys keep their defaults."""
+    return run_config_from_dict(_load_document(path), path)
+
+def run_config_from_dict(data: dict, source: str = "config") -> RunConfig:
+    if not isinstance(data, dict):
+        raise ValueError(f"{source}: must be a table, not {type(data).__name__}")
+    fields = RunConfig.__dataclass_fields__
+    unknown = set(data) - set(fields)
+    if unknown:
+        raise ValueError(f"{source}: unknown setting(s) {', '.join(sorted(unknown))}")
+    for key, value in data.items():
+        kind = type(fields[key].default) if key != "points" else list
+        if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+            raise ValueError(f"{source}: {key} must be {kind.__name__}, not {type(value).__name__}")
+    config = RunConfig(**{k: v for k, v in data.items() if k != "points"})
+    if "points" in data:
+        config.points = []
+        for i, p in enumerate(data["points"]):
+            if not isinstance(p, dict):
+                raise ValueError(f"{source}: points[{i}] must be a table, not {type(p).__name__}")
+            try:
+                config.points.append(point_from_dict(p))
+            except KeyError as e:
+                raise ValueError(f"{source}: points[{i}]: missing {e}") from None
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"{source}: points[{i}]: {e}") from None
+    return config
+
+def load_resume_point(workflow: dict, path: str = STATE_FILE) -> dict:
+    """Last checkpoint of a run that did not end cleanly, if it ran `workflow`; else None."""
+    point = session.load_checkpoint(path) if path else None
+    if not point or point.get("state") != "step":
+        return None
+    if point.get("workflow") != session.fingerprint(workflow):
+        logger.info(f"{path}: previous run used a different workflow; not resuming it.")
+        return None
+    return point
+
+def describe_resume_point(point: dict, clock: Clock = REAL_CLOCK) -> str:
+    """One line for the resume prompt: where the run stopped and how much long wait is left."""
+    when = datetime.datetime.fromtimestamp(point.get("at", 0)).strftime("%Y-%m-%d %H:%M:%S")
+    label = point.get("label") or f"step {point.get('step', 0) + 1}"
+    text = f"Stopped at {label}, iteration {point.get('iteration', 0) + 1}, at {when}."
+    if point.get("deadline"):
+        left = max(0, int(point["deadline"] - clock.now().timestamp()))
+        text += f" {left // 3600}h {left % 3600 // 60}m of the long wait left."
+    return text
+
+def run_config_to_dict(config: RunConfig) -> dict:
+    """Inverse of run_config_from_dict: plain JSON/TOML-ready values."""
+    data = {f: getattr(config, f) for f in RunConfig.__dataclass_fields__ if f != "points"}
+    data["points"] = [point_to_dict(p) for p in config.points]
+    return data
+
+class HeadlessControl:
+    """Starts and stops headless runs for the remote control endpoint."""
 
-class AutomationApp(QtWidgets.QMainWindow):
     def __init__(self):
-        super().__init__()
-        self.setWindowTitle(f"{APP_TITLE} - by {APP_AUTHOR}")
-        self.setGeometry(100, 100, 900, 700)
-        self.setWindowIcon(self.style().standardIcon(QtWidgets.QStyle.SP_ComputerIcon))
-
-        self.settings = QtCore.QSettings("xTheRedShirtx", "AutoRunnerPro")
-        self.points = load_points(self.settings)
-
-        self._build_ui()
-        self._install_gui_logger()
-
-        self.runner_tab.hours_input.setValue(int(self.settings.value("longwait/hours", 11)))
-        self.runner_tab.minutes_input.setValue(int(self.settings.value("longwait/mins", 30)))
-        self.runner_tab.step_delay.setValue(int(self.settings.value("settings/step_delay", 10)))
-        self.runner_tab.max_retries.setValue(int(self.settings.value("settings/retries", 3)))
-        self.runner_tab.watchdog_sec.setValue(int(self.settings.value("settings/watchdog", 15)))
-        self.runner_tab.step4_wait.setValue(int(self.settings.value("settings/step4wait", 10)))
-        self.runner_tab.dry_run.setChecked(bool(int(self.settings.value("settings/dry_run", 0))))
-        self.runner_tab.always_on_top.setChecked(bool(int(self.settings.value("settings/ontop", 1))))
-        self._apply_always_on_top(self.runner_tab.always_on_top.isChecked())
-
-        self.thread = None
-
-        sys.excepthook = self._handle_exception
-
-        self._apply_styles()
-
-        self._delete_pressed_last = False
-        self.hotkey_timer = QtCore.QTimer(self)
-        self.hotkey_timer.timeout.connect(self._poll_hotkeys)
-        self.hotkey_timer.start(50)
-
-    def _build_ui(self):
-        self.tabs = QtWidgets.QTabWidget()
-        self.runner_tab = RunnerTab()
-        self.coords_tab = CoordinatesTab(self.points)
-        self.debug_tab = DebugTab()
-        self.help_tab = HelpTab()
-
-        self.tabs.addTab(self.runner_tab, "Runner")
-        self.tabs.addTab(self.coords_tab, "Coordinates")
-        self.tabs.addTab(self.debug_tab, "Debug")
-        self.tabs.addTab(self.help_tab, "Help")
-
-        self.setCentralWidget(self.tabs)
-
-        self.runner_tab.start_clicked.connect(self.start_automation)
-        self.runner_tab.stop_clicked.connect(self.stop_automation)
-        self.runner_tab.always_on_top.stateChanged.connect(
-            lambda _: self._apply_always_on_top(self.runner_tab.always_on_top.isChecked())
-        )
-
-        menubar = self.menuBar()
-        file_menu = menubar.addMenu("&File")
-        act_open_log = file_menu.addAction("Open Log")
-        act_open_log.triggered.connect(lambda: QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(LOG_FILE)))
-        file_menu.addSeparator()
-        act_exit = file_menu.addAction("Exit")
-        act_exit.triggered.connect(self.close)
-
-        view_menu = menubar.addMenu("&View")
-        self.act_ontop = view_menu.addAction("Always on Top")
-        self.act_ontop.setCheckable(True)
-        self.act_ontop.setChecked(self.runner_tab.always_on_top.isChecked())
-        self.act_ontop.triggered.connect(lambda checked: self.runner_tab.always_on_top.setChecked(checked))
-
-        self.statusBar().showMessage("Ready")
-
-    def _apply_always_on_top(self, enabled: bool):
-        flags = self.windowFlags()
-        if enabled:
-            flags |= QtCore.Qt.WindowStaysOnTopHint
-        else:
-            flags &= ~QtCore.Qt.WindowStaysOnTopHint
-        self.setWindowFlags(flags)
-        self.show()
-        self.settings.setValue("settings/ontop", int(enabled))
-        self.act_ontop.setChecked(enabled)
-
-    def _apply_styles(self):
-        self.setStyleSheet("""
-            QMainWindow { background: #121212; color: #eaeaea; }
-            QLabel, QCheckBox, QMenuBar, QMenu, QStatusBar { color: #eaeaea; }
-            QMenuBar { background: #1a1a1a; }
-            QMenu { background: #1a1a1a; border: 1px solid #333; }
-            QStatusBar { background: #1a1a1a; }
-            QTabWidget::pane { border: 1px solid #333; top: -1px; background: #121212; }
-            QTabBar { font-weight: 600; }
-            QTabBar::tab {
-                background: #ffffff; color: #000000; padding: 8px 16px; margin-right: 2px;
-                border: 1px solid #c9c9c9; border-top-left-radius: 6px; border-top-right-radius: 6px;
-            }
-            QTabBar::tab:selected { background: #ffffff; color: #000000; border-color: #8aa8ff; border-bottom-color: #ffffff; margin-bottom: -1px; }
-            QTabBar::tab:!selected { background: #f2f2f2; color: #000000; }
-            QTabBar::tab:hover { background: #fafafa; }
-            QTabBar::tab:disabled { color: #888888; background: #f5f5f5; }
-            QTextEdit, QSpinBox, QTableWidget, QPushButton, QProgressBar, QCheckBox {
-                background: #1a1a1a; color: #eaeaea; border: 1px solid #333;
-            }
-            QPushButton:hover { border: 1px solid #555; }
-            QProgressBar::chunk { background: #3d85c6; }
-            QHeaderView::section { background: #1a1a1a; color: #eaeaea; border: 1px solid #333; }
-        """)
-
-    def _install_gui_logger(self):
-        self._log_emitter = LogEmitter()
-        self._log_emitter.sig.connect(self._append_logs, QtCore.Qt.QueuedConnection)
-        qt_handler = QtSignalLogHandler(self._log_emitter)
-        qt_handler.setLevel(logging.INFO)
-        qt_handler.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
-        logger.addHandler(qt_handler)
-        logger.info(f"===== Session started. Author: {APP_AUTHOR} =====")
-
-    def _append_logs(self, message: str):
-        stamp = datetime.datetime.now().strftime("%H:%M:%S")
-        text = f"[{stamp}] {message}"
-        self.runner_tab.log_view.append(text)
-        self.debug_tab.log_view.append(text)
-
-    def _make_thread(self):
-        hours = self.runner_tab.hours_input.value()
-        mins = self.runner_tab.minutes_input.value()
-        total_sec = hours * 3600 + mins * 60
-        t = AutomationThread(
-            points=[ClickPoint(p.name, p.x, p.y) for p in self.points],
-            long_wait_seconds=total_sec,
-            step_delay=self.runner_tab.step_delay.value(),
-            max_retries=self.runner_tab.max_retries.value(),
-            watchdog_seconds=self.runner_tab.watchdog_sec.value(),
-            step4_wait_sec=self.runner_tab.step4_wait.value(),
-            dry_run=self.runner_tab.dry_run.isChecked(),
-        )
-        t.log_signal.connect(self._log)
-        t.status_signal.connect(self._update_status)
-        t.update_timer_signal.connect(self._update_timer)
-        t.stop_signal.connect(self._on_thread_stopped)
-        t.error_popup_signal.connect(self._error_popup)
-        return t
-
-    def start_automation(self):
-        self.settings.setValue("longwait/hours", self.runner_tab.hours_input.value())
-        self.settings.setValue("longwait/mins", self.runner_tab.minutes_input.value())
-        self.settings.setValue("settings/step_delay", self.runner_tab.step_delay.value())
-        self.settings.setValue("settings/retries", self.runner_tab.max_retries.value())
-        self.settings.setValue("settings/watchdog", self.runner_tab.watchdog_sec.value())
-        self.settings.setValue("settings/step4wait", self.runner_tab.step4_wait.value())
-        self.settings.setValue("settings/dry_run", int(self.runner_tab.dry_run.isChecked()))
-        save_points(self.settings, self.points)
-
-        if self.thread and self.thread.isRunning():
-            QtWidgets.QMessageBox.warning(self, "Already running", "Automation is already running.")
-            return
+        self.runner = None
+        self.wake = Event()
+        self.start_requested = False
+        self.quit = False
+
+    def start(self) -> bool:
+        if self.quit or (self.runner and self.runner.is_running):
+            return False
+        self.start_requested = True
+        self.wake.set()
+        return True
 
-        self.thread = self._make_thread()
-        self.runner_tab.start_btn.setEnabled(False)
-        self.runner_tab.stop_btn.setEnabled(True)
-        self.thread.start()
-        self.statusBar().showMessage("Automation running")
-        logger.info("Automation started")
+    def stop(self) -> bool:
+        if not (self.runner and self.runner.is_running):
+            return False
+        self.runner.stop()
+        return True
 
-    def stop_automation(self):
-        if self.thread:
-            try:
-                self.thread.stop()
-            except Exception:
-                pass
-            try:
-                # Give the thread a moment to exit cooperatively
-                self.thread.wait(2000)
-            except Exception:
-                pass
-            self.thread = None
-        self._on_thread_stopped()
-
-    def _on_thread_stopped(self):
-        self.runner_tab.start_btn.setEnabled(True)
-        self.runner_tab.stop_btn.setEnabled(False)
-        self.runner_tab.progress.setValue(0)
-        self.runner_tab.timer_label.setText("Timer: Not Started")
-        self.statusBar().showMessage("Stopped")
+    def shutdown(self):
+        self.quit = True
+        if self.runner:
+            self.runner.stop()
+        self.wake.set()
+
+    def wait_for_start(self) -> bool:
+        """Block until a remote start request (True) or shutdown (False)."""
+        while not self.quit and not self.start_requested:
+            self.wake.wait(INPUT_LOCK_POLL)  # a timeout keeps Ctrl+C responsive on Windows
+            self.wake.clear()
+        self.start_requested = False
+        return not self.quit
+
+def run_headless(config: RunConfig, resume: bool = False, remote=None) -> int:
+    """Run the automation loop on this thread without Qt. Returns a process exit code.
+
+    With `resume`, continue from the last checkpoint in STATE_FILE if the previous run did not end cleanly.
+    With a `remote` server, the process stays up after a run ends and waits for POST /start until stopped.
+    """
+    import signal
+
+    workflow = load_workflow(config.workflow)
+    point = load_resume_point(workflow) if resume else None
+    if point:
+        logger.info(f"Resuming previous run. {describe_resume_point(point)}")
+    elif resume:
+        logger.info("No interrupted run to resume; starting from the beginning.")
+    result = {"code": 0}
+    control = HeadlessControl()
+    if remote:
+        remote.controller = control
+
+    def request_stop(signum, _frame):
+        logger.info(f"Received signal {signum}; stopping.")
+        control.shutdown()
+
+    signal.signal(signal.SIGINT, request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, request_stop)
+    logger.info(f"===== Headless session started. Author: {APP_AUTHOR} =====")
+    while True:
+        runner = config.make_runner(workflow=workflow, state_file=STATE_FILE, resume=point)
+        point = None
+        runner.log_signal.connect(logger.info)
+        runner.status_signal.connect(logger.info)
+        runner.error_popup_signal.connect(lambda msg: result.update(code=1))
+        if remote:
+            remote.state.attach(runner)
+        control.runner = runner
+        if not control.quit:
+            runner.run()
         logger.info("Automation stopped")
-
-    def _log(self, message: str):
-        logger.info(message)
-
-    def _update_status(self, status: str):
-        self.runner_tab.status_label.setText(status)
-
-    def _update_timer(self, remaining_seconds: int):
-        total = self.runner_tab.hours_input.value() * 3600 + self.runner_tab.minutes_input.value() * 60
-        h, r = divmod(remaining_seconds, 3600)
-        m, s = divmod(r, 60)
-        self.runner_tab.timer_label.setText(f"Time Remaining: {h:02}:{m:02}:{s:02}")
-        if total > 0:
-            elapsed = total - remaining_seconds
-            pct = max(0, min(100, int((elapsed / total) * 100)))
-            self.runner_tab.progress.setValue(pct)
-        else:
-            self.runner_tab.progress.setValue(0)
-
-    def _poll_hotkeys(self):
-        if not is_windows():
-            return
-        del_now = key_pressed(VK_DELETE)
-        if del_now and not self._delete_pressed_last:
-            if self.thread and self.thread.isRunning():
-                logger.info("Emergency stop: Delete key pressed.")
-                try:
-                    self.stop_automation()
-                except Exception:
-                    logger.exception("Emergency stop failed")
-        self._delete_pressed_last = del_now
-
-    def _handle_exception(self, etype, value, tb):
-        msg = "".join(traceback.format_exception(etype, value, tb))
-        logger.exception("Unhandled exception:\n" + msg)
-        QtWidgets.QMessageBox.critical(self, "Unhandled Error", str(value))
-
-    def _error_popup(self, message: str):
-        QtWidgets.QMessageBox.critical(self, "Error", message)
-
-    def closeEvent(self, event: QtGui.QCloseEvent):
+        if not remote or control.quit:
+            break
+        logger.info("Waiting for a remote start request (Ctrl+C to quit).")
+        if not control.wait_for_start():
+            break
+        result["code"] = 0
+        logger.info("Automation started by remote request")
+    return result["code"]
+
+class StartupProfiler:
+    """Records named startup phases relative to the start of main.py's imports."""
+
+    def __init__(self, t0: float = _STARTUP_T0):
+        self.t0 = t0
+        self.marks = []
+
+    def mark(self, label: str):
+        self.marks.append((label, time.perf_counter()))
+
+    def report(self, budget_ms: float = None) -> int:
+        """Print the phase table. Returns 1 if the total is over budget_ms, else 0."""
+        prev = self.t0
+        print(f"{'phase':<32} {'step ms':>10} {'total ms':>10}")
+        for label, t in self.marks:
+            print(f"{label:<32} {(t - prev) * 1e3:>10.1f} {(t - self.t0) * 1e3:>10.1f}")
+            prev = t
+        total_ms = (prev - self.t0) * 1e3
+        heavy = [m for m in ("pyautogui", "pygetwindow", "PyQt5.QtWidgets") if m in sys.modules]
+        print(f"heavy modules loaded: {', '.join(heavy) or 'none'}")
+        logger.info(f"Startup profile: {total_ms:.1f} ms to {self.marks[-1][0] if self.marks else 'start'}")
+        if budget_ms is not None and total_ms > budget_ms:
+            print(f"FAIL: startup took {total_ms:.1f} ms, budget is {budget_ms:.0f} ms")
+            return 1
+        return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=APP_TITLE)
+    parser.add_argument("--headless", action="store_true", help="run the automation loop without the GUI")
+    parser.add_argument("--config", help="run settings file (.toml or .json) used with --headless")
+    parser.add_argument("--profile", help=f"with --headless, run this named profile from {CONFIG_FILE}")
+    parser.add_argument("--resume", action="store_true",
+                        help="with --headless, continue an interrupted run from its last checkpoint")
+    parser.add_argument("--schedule", help="with --headless, run the jobs in this schedule file (.toml or .json)")
+    parser.add_argument("--screen-checksum", metavar="X,Y,W,H",
+                        help='print the checksum and mean color of a screen region for a "verify" step, then exit')
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="serve Prometheus metrics at http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--remote-port", type=int, default=REMOTE_PORT,
+                        help="serve the remote control API (start, stop, status, live events) on this port")
+    parser.add_argument("--remote-host", default=REMOTE_HOST,
+                        help=f"interface for the remote control API (default: {REMOTE_HOST})")
+    parser.add_argument("--remote-token", default=REMOTE_TOKEN,
+                        help="require this bearer token on remote control requests")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record step timings and write them as Chrome trace JSON to FILE on exit")
+    parser.add_argument("--log-json", action="store_true", help="write the log file as JSON lines")
+    parser.add_argument("--obs-password",
+                        help="OBS WebSocket password for profiles that do not set one (default: $OBS_WS_PASSWORD)")
+    parser.add_argument("--input-backend", choices=INPUT_BACKENDS, default=INPUT_BACKEND,
+                        help="how clicks and keys are sent (default: auto)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import and first-paint time, then exit")
+    parser.add_argument("--startup-budget-ms", type=float,
+                        help="with --profile-startup, exit with status 1 if startup exceeds this budget")
+    return parser.parse_known_args(argv)
+
+def main(argv=None):
+    args, qt_args = parse_args(argv)
+    # gui and scheduler import this module as "main"; reuse this instance when run as a script
+    sys.modules.setdefault("main", sys.modules[__name__])
+    profiler = None
+    if args.profile_startup:
+        profiler = StartupProfiler()
+        profiler.mark("main.py imports")
+    if args.log_json:
+        configure_logging(json_lines=True)
+    set_input_backend(args.input_backend)
+    if args.obs_password is not None:
+        set_obs_password(args.obs_password)
+    if args.trace:
+        TRACER.enabled = True
+        atexit.register(TRACER.write_chrome_trace, args.trace)
+    if args.metrics_port and not args.profile_startup:
         try:
-            if self.thread and self.thread.isRunning():
-                self.stop_automation()
-        finally:
-            super().closeEvent(event)
-
-def main():
-    try:
-        app = QtWidgets.QApplication(sys.argv)
-        app.setApplicationName("AutoRunnerPro")
-        app.setOrganizationName("xTheRedShirtx")
-        window = AutomationApp()
-        window.show()
-        sys.exit(app.exec_())
-    except Exception as e:
-        logger.exception("Fatal error in main")
+            server = metrics.MetricsServer(args.metrics_port).start()
+            logger.info(f"Metrics at http://{server.host}:{server.port}/metrics")
+        except OSError as e:
+            logger.error(f"Could not start metrics endpoint on port {args.metrics_port}: {e}")
+    remote_server = None
+    if args.remote_port and not args.profile_startup and not args.screen_checksum:
+        import remote
         try:
-            QtWidgets.QMessageBox.critical(None, "Fatal Error", str(e))
-        except Exception:
-            pass
-        sys.exit(1)
+            remote_server = remote.RemoteServer(args.remote_port, args.remote_host, args.remote_token).start()
+            add_log_handler(remote_server.log_handler)
+            logger.info(f"Remote control at http://{remote_server.host}:{remote_server.port}/")
+        except OSError as e:
+            logger.error(f"Could not start remote control on {args.remote_host}:{args.remote_port}: {e}")
+    if args.screen_checksum:
+        region = tuple(int(v) for v in args.screen_checksum.split(","))
+        frame = get_screen_source().grab(region)
+        r, g, b = frame.mean_color()
+        print(f'checksum = "{frame.checksum()}"  color = [{r:.0f}, {g:.0f}, {b:.0f}]  region = {list(region)}')
+        sys.exit(0)
+    if args.headless:
+        configure_logging(json_lines=args.log_json, console=True)
+        if args.schedule:
+            import scheduler
+            try:
+                jobs = scheduler.load_schedule(args.schedule)
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logger.error(f"Invalid schedule: {e}")
+                sys.exit(2)
+            sys.exit(scheduler.run_scheduled(jobs))
+        try:
+            if args.profile:
+                import profiles
+                store = profiles.ConfigStore()
+                store.load()
+                if args.profile not in store.profiles():
+                    raise ValueError(f"{CONFIG_FILE}: no profile named '{args.profile}'")
+                config = store.profile(args.profile)
+            else:
+                config = load_run_config(args.config) if args.config else RunConfig()
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.error(f"Invalid config: {e}")
+            sys.exit(2)
+        if not args.config and not args.profile:
+            logger.warning("No --config given; using default settings and coordinates.")
+        if profiler:
+            profiler.mark("config loaded")
+            config.make_runner()
+            profiler.mark("runner built")
+            sys.exit(profiler.report(args.startup_budget_ms))
+        sys.exit(run_headless(config, resume=args.resume, remote=remote_server))
+
+    import gui
+    if profiler:
+        profiler.mark("gui import (PyQt5)")
+    gui.run(sys.argv[:1] + qt_args, profiler=profiler, budget_ms=args.startup_budget_ms, remote=remote_server)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,180 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from main import Frame, ScreenSource, _load_reference_image
+
+"""
+Automated Task Runner (Pro) - template matching for screen checks
+Author: xTheRedShirtx
+
+Normalized cross-correlation over a coarse-to-fine image pyramid. The full
+search runs only at the coarsest level; each finer level re-scores a few
+pixels around the previous best position. Needs NumPy.
+"""
+
+MATCH_MIN_SIZE = 8            # smallest template side (pixels) kept at the coarsest pyramid level
+MATCH_REFINE_RADIUS = 2       # pixels searched around the upscaled position at each finer level
+TEMPLATE_CACHE_SIZE = 32      # preprocessed templates kept in memory
+
+_GRAY = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+@dataclass
+class Match:
+    """Best template position (top-left, in region pixels) and its NCC score in [-1, 1]."""
+    x: int
+    y: int
+    score: float
+
+
+def to_gray(frame: Frame) -> np.ndarray:
+    rgb = np.frombuffer(frame.pixels, dtype=np.uint8).reshape(frame.height, frame.width, 3)
+    return rgb @ _GRAY
+
+
+def downsample(gray: np.ndarray) -> np.ndarray:
+    """Halve both sides by averaging 2x2 blocks."""
+    h, w = gray.shape[0] // 2, gray.shape[1] // 2
+    return gray[:h * 2, :w * 2].reshape(h, 2, w, 2).mean(axis=(1, 3), dtype=np.float32)
+
+
+def _fast_len(n: int) -> int:
+    """Smallest 2-3-5-smooth size >= n; FFTs of these sizes are fast."""
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+def _window_sums(a: np.ndarray, h: int, w: int) -> np.ndarray:
+    """Sum of every h x w window, from an integral image."""
+    ii = np.zeros((a.shape[0] + 1, a.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(a, axis=0, dtype=np.float64), axis=1, out=ii[1:, 1:])
+    return ii[h:, w:] - ii[:-h, w:] - ii[h:, :-w] + ii[:-h, :-w]
+
+
+class _Level:
+    """One pyramid level of a template: zero-mean pixels, their norm and cached kernel FFTs."""
+
+    def __init__(self, gray: np.ndarray):
+        self.h, self.w = gray.shape
+        self.zero_mean = (gray - gray.mean()).astype(np.float32)
+        self.norm = float(np.sqrt(np.square(self.zero_mean, dtype=np.float64).sum()))
+        self._flipped = np.ascontiguousarray(self.zero_mean[::-1, ::-1])
+        self._fft = {}
+
+    def kernel_fft(self, shape: tuple) -> np.ndarray:
+        fft = self._fft.get(shape)
+        if fft is None:
+            if len(self._fft) >= 8:
+                self._fft.clear()
+            fft = self._fft[shape] = np.fft.rfft2(self._flipped, shape)
+        return fft
+
+    def ncc(self, image: np.ndarray) -> np.ndarray:
+        """NCC score for every position where the template fits inside `image`."""
+        H, W = image.shape
+        h, w = self.h, self.w
+        if H < h or W < w:
+            return np.full((0, 0), -1.0)
+        shape = (_fast_len(H + h - 1), _fast_len(W + w - 1))
+        full = np.fft.irfft2(np.fft.rfft2(image, shape) * self.kernel_fft(shape), shape)
+        num = full[h - 1:H, w - 1:W]
+        sums = _window_sums(image, h, w)
+        var = _window_sums(np.square(image, dtype=np.float64), h, w) - sums * sums / (h * w)
+        den = np.sqrt(np.maximum(var, 0.0)) * self.norm
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(den > 1e-6, num / den, 0.0)
+
+
+class Template:
+    """A reference image preprocessed into grayscale pyramid levels, finest first."""
+
+    def __init__(self, frame: Frame, levels: int = 3):
+        gray = to_gray(frame)
+        self.width, self.height = frame.width, frame.height
+        pyramid = [gray]
+        while len(pyramid) < levels and min(pyramid[-1].shape) // 2 >= MATCH_MIN_SIZE:
+            pyramid.append(downsample(pyramid[-1]))
+        self.levels = [_Level(g) for g in pyramid]
+
+
+class TemplateMatcher:
+    """Finds Templates in screen regions. Thread-safe; templates loaded from files are cached."""
+
+    def __init__(self, levels: int = 3, cache_size: int = TEMPLATE_CACHE_SIZE):
+        self.levels = max(1, int(levels))
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, path: str) -> Template:
+        """Template for an image file, reusing the cached one until the file changes."""
+        key = (os.path.abspath(path), os.path.getmtime(path))
+        with self._lock:
+            template = self._cache.get(key)
+            if template is not None:
+                self._cache.move_to_end(key)
+                return template
+        template = Template(_load_reference_image(path), self.levels)
+        with self._lock:
+            self._cache[key] = template
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return template
+
+    def match(self, frame: Frame, template: Template) -> Match:
+        """Best position of `template` anywhere in `frame`."""
+        pyramid = [to_gray(frame)]
+        for _ in template.levels[1:]:
+            pyramid.append(downsample(pyramid[-1]))
+        top = len(template.levels) - 1
+        scores = template.levels[top].ncc(pyramid[top])
+        if scores.size == 0:
+            return Match(0, 0, -1.0)
+        y, x = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        score = float(scores[y, x])
+        r = MATCH_REFINE_RADIUS
+        for level in range(top - 1, -1, -1):
+            t, image = template.levels[level], pyramid[level]
+            x0 = max(0, 2 * x - r)
+            y0 = max(0, 2 * y - r)
+            patch = image[y0:2 * y + r + t.h, x0:2 * x + r + t.w]
+            scores = t.ncc(patch)
+            if scores.size == 0:
+                return Match(0, 0, -1.0)
+            dy, dx = np.unravel_index(int(np.argmax(scores)), scores.shape)
+            x, y, score = x0 + int(dx), y0 + int(dy), float(scores[dy, dx])
+        return Match(int(x), int(y), score)
+
+    def find(self, source: ScreenSource, template: Template, center: tuple, search: int) -> Match:
+        """Match inside a region of interest: the template size plus `search` pixels on each side of `center`.
+
+        The returned position is in screen pixels.
+        """
+        region = roi(center, template, search)
+        m = self.match(source.grab(region), template)
+        return Match(region[0] + m.x, region[1] + m.y, m.score)
+
+
+def roi(center: tuple, template: Template, search: int) -> tuple:
+    """(x, y, w, h) region centred on `center` that fits the template displaced by up to `search` pixels."""
+    w, h = template.width + 2 * search, template.height + 2 * search
+    return (int(center[0]) - w // 2, int(center[1]) - h // 2, w, h)
+
+
+_matcher = None
+
+def get_matcher() -> TemplateMatcher:
+    global _matcher
+    if _matcher is None:
+        _matcher = TemplateMatcher()
+    return _matcher
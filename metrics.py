@@ -0,0 +1,216 @@
+import bisect
+import csv
+import datetime
+import os
+import threading
+
+"""
+Automated Task Runner (Pro) - run metrics
+Author: xTheRedShirtx
+
+In-process counters, gauges and histograms with optional labels. Exposed in
+Prometheus text format over a localhost HTTP endpoint and appended to a CSV
+file at the end of each iteration.
+"""
+
+# Seconds; covers clicks and short waits through to the multi-hour long wait
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600, 14400, 43200)
+
+
+def _label_text(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    parts = []
+    for n, v in zip(names, values):
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{n}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} needs labels {self.label_names}")
+        return tuple(labels[n] for n in self.label_names)
+
+    def samples(self) -> list:
+        """[(suffix, label names, label values, value), ...] for the exposition formats."""
+        with self._lock:
+            return [("", self.label_names, key, value) for key, value in self._values.items()]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def samples(self) -> list:
+        out = []
+        names = self.label_names + ("le",)
+        with self._lock:
+            items = [(key, list(counts), total, n) for key, (counts, total, n) in self._values.items()]
+        for key, counts, total, n in items:
+            running = 0
+            for bound, c in zip(self.buckets, counts):
+                running += c
+                out.append(("_bucket", names, key + (f"{bound:g}",), running))
+            out.append(("_bucket", names, key + ("+Inf",), n))
+            out.append(("_sum", self.label_names, key, total))
+            out.append(("_count", self.label_names, key, n))
+        return out
+
+
+class Registry:
+    """Named metrics. Creating a metric that already exists returns the existing one."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labels, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: tuple = ()) -> Counter:
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str, labels: tuple = ()) -> Gauge:
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def metrics(self) -> list:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for m in self.metrics():
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for suffix, names, values, value in m.samples():
+                lines.append(f"{m.name}{suffix}{_label_text(names, values)} {value:.10g}")
+        return "\n".join(lines) + "\n"
+
+    def write_csv(self, path: str, buckets: bool = False, **context):
+        """Append one row per sample: timestamp, the `context` values, metric, labels and value.
+
+        Histograms are written as _sum and _count only unless `buckets` is True.
+        """
+        new = not os.path.exists(path)
+        stamp = datetime.datetime.now().isoformat(timespec="seconds")
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            if new:
+                w.writerow(["time", *context, "metric", "labels", "value"])
+            for m in self.metrics():
+                for suffix, names, values, value in m.samples():
+                    if suffix == "_bucket" and not buckets:
+                        continue
+                    labels = ";".join(f"{n}={v}" for n, v in zip(names, values))
+                    w.writerow([stamp, *context.values(), m.name + suffix, labels, f"{value:.10g}"])
+
+
+REGISTRY = Registry()
+
+
+class MetricsServer:
+    """Serves REGISTRY at /metrics on a background thread. Binds to localhost by default."""
+
+    def __init__(self, port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.host, self.port = self.httpd.server_address[:2]
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
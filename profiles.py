@@ -0,0 +1,202 @@
+import json
+import os
+
+import hotkeys
+from main import (
+    CANCEL_CAPTURE_KEY, CAPTURE_KEY, CONFIG_FILE, EMERGENCY_STOP_KEY, RunConfig, _load_document, load_run_config, point_to_dict, run_config_from_dict, run_config_to_dict,
+)
+
+"""
+Automated Task Runner (Pro) - settings file with named profiles
+Author: xTheRedShirtx
+
+One JSON document holds the GUI settings and any number of named run
+profiles (the same keys as a --config run file). It is read once at startup,
+validated as a whole, and written atomically only when something changed.
+"""
+
+CONFIG_VERSION = 1
+
+# version -> function turning a document of that version into version + 1
+MIGRATIONS = {}
+
+UI_DEFAULTS = {"always_on_top": True, "stop_key": EMERGENCY_STOP_KEY, "capture_key": CAPTURE_KEY,
+               "cancel_key": CANCEL_CAPTURE_KEY}
+
+
+def default_document() -> dict:
+    return {"version": CONFIG_VERSION, "active": "default", "ui": dict(UI_DEFAULTS),
+            "profiles": {"default": run_config_to_dict(RunConfig())}}
+
+
+def migrate(doc: dict, source: str = "config") -> dict:
+    """Bring an older document up to CONFIG_VERSION."""
+    if not isinstance(doc, dict):
+        raise ValueError(f"{source}: must be a JSON object, not {type(doc).__name__}")
+    version = doc.get("version")
+    if not isinstance(version, int) or version < 1:
+        raise ValueError(f"{source}: missing or invalid version")
+    if version > CONFIG_VERSION:
+        raise ValueError(f"{source}: version {version} is newer than this app supports ({CONFIG_VERSION})")
+    while version < CONFIG_VERSION:
+        doc = MIGRATIONS[version](doc)
+        version += 1
+        doc["version"] = version
+    return doc
+
+
+def validate(doc: dict, source: str = "config"):
+    """Raise ValueError naming the first problem in a current-version document."""
+    unknown = set(doc) - {"version", "active", "ui", "profiles"}
+    if unknown:
+        raise ValueError(f"{source}: unknown key(s) {', '.join(sorted(unknown))}")
+    profiles = doc.get("profiles")
+    if not isinstance(profiles, dict) or not profiles:
+        raise ValueError(f"{source}: no profiles")
+    for name, data in profiles.items():
+        run_config_from_dict(data, f"{source}: profile '{name}'")
+    if doc.get("active") not in profiles:
+        raise ValueError(f"{source}: active profile {doc.get('active')!r} does not exist")
+    ui = doc.get("ui", {})
+    if not isinstance(ui, dict):
+        raise ValueError(f"{source}: ui must be a table, not {type(ui).__name__}")
+    for key, value in ui.items():
+        if key not in UI_DEFAULTS or type(value) is not type(UI_DEFAULTS[key]):
+            raise ValueError(f"{source}: bad ui setting {key} = {value!r}")
+        if key.endswith("_key"):
+            try:
+                hotkeys.check_key(value)
+            except ValueError as e:
+                raise ValueError(f"{source}: ui.{key}: {e}") from None
+
+
+def diff(old, new, path: str = "") -> list:
+    """Dotted paths of values that differ between two documents."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        out = []
+        for key in list(old) + [k for k in new if k not in old]:
+            out += diff(old.get(key), new.get(key), f"{path}.{key}" if path else str(key))
+        return out
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        out = []
+        for i, (a, b) in enumerate(zip(old, new)):
+            out += diff(a, b, f"{path}[{i}]")
+        return out
+    return [] if old == new else [path]
+
+
+def _dump(doc: dict) -> str:
+    return json.dumps(doc, indent=2) + "\n"
+
+
+def _write_atomic(path: str, text: str):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _toml_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return json.dumps(str(value))
+
+
+def toml_text(data: dict) -> str:
+    """A run settings dict as TOML: scalars first, then one [[points]] table per point."""
+    lines = [f"{k} = {_toml_value(v)}" for k, v in data.items() if k != "points"]
+    for point in data.get("points", []):
+        lines += ["", "[[points]]"] + [f"{k} = {_toml_value(v)}" for k, v in point.items() if v is not None]
+    return "\n".join(lines) + "\n"
+
+
+class ConfigStore:
+    """The settings document in memory. Edit through the methods, then save()."""
+
+    def __init__(self, path: str = CONFIG_FILE):
+        self.path = path
+        self.document = default_document()
+        self._saved = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self):
+        """Read and validate the file. On error the store keeps its current document."""
+        doc = migrate(_load_document(self.path), self.path)
+        doc.setdefault("ui", {})
+        validate(doc, self.path)
+        self.document = doc
+        self._saved = json.loads(_dump(doc))
+
+    def changes(self) -> list:
+        """Paths changed since the last load() or save()."""
+        return diff(self._saved or {}, self.document)
+
+    def save(self) -> list:
+        """Write the file if anything changed. Returns the changed paths (empty if nothing was written)."""
+        changed = self.changes()
+        if changed:
+            text = _dump(self.document)
+            _write_atomic(self.path, text)
+            self._saved = json.loads(text)
+        return changed
+
+    @property
+    def active(self) -> str:
+        return self.document["active"]
+
+    def set_active(self, name: str):
+        if name not in self.document["profiles"]:
+            raise KeyError(name)
+        self.document["active"] = name
+
+    def profiles(self) -> list:
+        return list(self.document["profiles"])
+
+    def profile(self, name: str = None) -> RunConfig:
+        name = name or self.active
+        return run_config_from_dict(self.document["profiles"][name], f"profile '{name}'")
+
+    def set_profile(self, name: str, config: RunConfig):
+        self.document["profiles"][name] = run_config_to_dict(config)
+
+    def set_points(self, points: list, name: str = None):
+        self.document["profiles"][name or self.active]["points"] = [point_to_dict(p) for p in points]
+
+    def delete_profile(self, name: str):
+        profiles = self.document["profiles"]
+        if len(profiles) == 1:
+            raise ValueError("The last profile cannot be deleted.")
+        del profiles[name]
+        if self.document["active"] == name:
+            self.document["active"] = next(iter(profiles))
+
+    def ui(self, key: str):
+        return self.document["ui"].get(key, UI_DEFAULTS[key])
+
+    def set_ui(self, key: str, value):
+        self.document["ui"][key] = value
+
+    def unique_name(self, name: str) -> str:
+        candidate, n = name, 2
+        while candidate in self.document["profiles"]:
+            candidate, n = f"{name} ({n})", n + 1
+        return candidate
+
+    def import_profile(self, path: str, name: str = None) -> str:
+        """Add a run settings file (.toml or .json) as a new profile. Returns its name."""
+        config = load_run_config(path)
+        name = self.unique_name(name or os.path.splitext(os.path.basename(path))[0])
+        self.set_profile(name, config)
+        return name
+
+    def export_profile(self, path: str, name: str = None):
+        """Write a profile as a run settings file, usable with --config or import_profile."""
+        data = self.document["profiles"][name or self.active]
+        text = toml_text(data) if path.lower().endswith(".toml") else json.dumps(data, indent=2) + "\n"
+        _write_atomic(path, text)
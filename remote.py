@@ -0,0 +1,377 @@
+import asyncio
+import collections
+import hmac
+import json
+import logging
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+"""
+Automated Task Runner (Pro) - remote control
+Author: xTheRedShirtx
+
+A small HTTP/JSON server for starting, stopping and watching runs from
+another machine, without remote desktop. It runs an asyncio loop on its own
+thread. Its state comes from the runner's signals and its log_handler,
+and changes are pushed to clients as server-sent events.
+
+  GET  /status   running, status text, iteration, step, countdown, last error
+  GET  /log      recent log lines (?lines=N)
+  GET  /events   server-sent events: status, step, countdown, log, stopped
+  POST /start    start a run (409 if one is running)
+  POST /stop     stop the run (409 if none is running)
+
+POSTs must send "Content-Type: application/json", which a web page on
+another site cannot send without the browser asking first. Requests from
+another site's page (Origin) are refused, and on localhost so is any Host
+that is not localhost, so a page cannot rename itself onto 127.0.0.1.
+"""
+
+REMOTE_LOG_LINES = 200        # log lines kept for /log
+REMOTE_SSE_BACKLOG = 20       # recent log lines sent to a new /events client (?lines=N)
+REMOTE_SSE_QUEUE = 256        # events buffered per /events client before it is dropped as too slow
+REMOTE_SSE_KEEPALIVE = 15.0   # seconds between keep-alive comments on an idle /events stream
+REMOTE_MAX_HEADER = 16384     # bytes of request line and headers accepted
+
+_LOCAL_NAMES = ("127.0.0.1", "::1", "localhost")
+
+
+class RunState:
+    """What the current run is doing, from its signals. Safe to update from any thread."""
+
+    def __init__(self, log_lines: int = REMOTE_LOG_LINES):
+        self._lock = threading.Lock()
+        self.runner = None
+        self.status = "Status: Idle"
+        self.iteration = 0
+        self.step = None
+        self.step_name = ""
+        self.countdown_deadline = 0.0  # time.monotonic() when the long wait ends; 0 = not waiting
+        self.countdown_total = 0.0
+        self.last_error = ""
+        self.log = collections.deque(maxlen=log_lines)
+        self._subscribers = []
+
+    def attach(self, runner):
+        """Follow a runner's signals. Call for each new runner, before it starts."""
+        with self._lock:
+            self.runner = runner
+            self.step, self.step_name, self.last_error = None, "", ""
+        runner.status_signal.connect(self._on_status)
+        runner.step_signal.connect(self._on_step)
+        runner.countdown_signal.connect(self._on_countdown)
+        runner.error_popup_signal.connect(self._on_error)
+        runner.stop_signal.connect(self._on_stopped)
+
+    @property
+    def running(self) -> bool:
+        runner = self.runner
+        return bool(runner and runner.is_running)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            remaining = max(0.0, self.countdown_deadline - time.monotonic()) if self.countdown_deadline else 0.0
+            return {"running": self.running, "status": self.status, "iteration": self.iteration,
+                    "step": self.step, "step_name": self.step_name,
+                    "countdown_remaining": round(remaining, 1), "countdown_total": self.countdown_total,
+                    "last_error": self.last_error}
+
+    def recent_log(self, lines: int = REMOTE_LOG_LINES) -> list:
+        with self._lock:
+            return list(self.log)[-lines:] if lines > 0 else []
+
+    def add_log(self, line: str):
+        with self._lock:
+            self.log.append(line)
+        self.publish("log", {"line": line})
+
+    def _on_status(self, status: str):
+        with self._lock:
+            self.status = status
+        self.publish("status", {"status": status, "running": self.running})
+
+    def _on_step(self, index: int, name: str, iteration: int):
+        with self._lock:
+            self.step, self.step_name, self.iteration = index, name, iteration
+        self.publish("step", {"step": index, "step_name": name, "iteration": iteration})
+
+    def _on_countdown(self, deadline: float, total: float):
+        with self._lock:
+            self.countdown_deadline, self.countdown_total = deadline, total
+        remaining = max(0.0, deadline - time.monotonic()) if deadline else 0.0
+        # Sent once per wait; clients count down from it themselves
+        self.publish("countdown", {"remaining": round(remaining, 1), "total": total,
+                                   "ends_at": round(time.time() + remaining, 1) if deadline else None})
+
+    def _on_error(self, message: str):
+        with self._lock:
+            self.last_error = message
+
+    def _on_stopped(self):
+        with self._lock:
+            self.countdown_deadline = self.countdown_total = 0.0
+            if self.status == "Status: Running":
+                self.status = "Status: Stopped"  # the runner only says so when it finishes or fails
+        self.publish("stopped", {"status": self.status, "last_error": self.last_error})
+
+    def subscribe(self, loop: asyncio.AbstractEventLoop) -> asyncio.Queue:
+        queue = asyncio.Queue(REMOTE_SSE_QUEUE)
+        with self._lock:
+            self._subscribers.append((loop, queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers = [(l, q) for l, q in self._subscribers if q is not queue]
+
+    def publish(self, event: str, data: dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, (event, data))
+            except RuntimeError:
+                self.unsubscribe(queue)  # loop closed
+
+
+def _offer(queue: asyncio.Queue, item):
+    try:
+        queue.put_nowait(item)
+    except asyncio.QueueFull:
+        # Client too slow: replace its backlog with None, which ends its stream
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+
+class RemoteLogHandler(logging.Handler):
+    """Copies automation log lines into a RunState. Register it with main.add_log_handler()."""
+
+    def __init__(self, state: RunState):
+        super().__init__(logging.INFO)
+        self.state = state
+        self.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+    def emit(self, record):
+        try:
+            self.state.add_log(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden",
+            404: "Not Found", 405: "Method Not Allowed", 409: "Conflict", 415: "Unsupported Media Type",
+            503: "Service Unavailable"}
+
+
+class RemoteServer:
+    """The remote control endpoint. Binds to localhost unless told otherwise.
+
+    `controller` is whatever starts and stops runs in this process (the GUI or
+    the headless loop). It needs start() and stop(), each returning False when
+    there is nothing to do. With a `token`, every request must send
+    "Authorization: Bearer <token>" or ?token=<token>.
+    """
+
+    def __init__(self, port: int, host: str = "127.0.0.1", token: str = "", state: RunState = None):
+        self.host, self.port = host, port
+        self.token = token
+        self.state = state or RunState()
+        self.controller = None
+        self.log_handler = RemoteLogHandler(self.state)
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def start(self) -> "RemoteServer":
+        """Bind and serve on a background thread. Raises OSError if the port cannot be bound."""
+        ready = threading.Event()
+        failure = []
+
+        def serve():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                self._server = loop.run_until_complete(
+                    asyncio.start_server(self._handle, self.host, self.port, limit=REMOTE_MAX_HEADER))
+            except OSError as e:
+                failure.append(e)
+                ready.set()
+                loop.close()
+                return
+            self._loop = loop
+            self.host, self.port = self._server.sockets[0].getsockname()[:2]
+            ready.set()
+            try:
+                loop.run_forever()
+            finally:
+                self._server.close()
+                # Open /events streams only end when their client goes away
+                tasks = asyncio.all_tasks(loop)
+                for task in tasks:
+                    task.cancel()
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+                loop.close()
+
+        self._thread = threading.Thread(target=serve, name="remote-http", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            raise failure[0]
+        if self.host not in _LOCAL_NAMES and not self.token:
+            logging.getLogger("automation").warning(
+                f"Remote control on {self.host} has no token; anyone who can reach this port can start and stop runs.")
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(2.0)
+            self._loop = None
+
+    def _authorized(self, headers: dict, query: dict) -> bool:
+        if not self.token:
+            return True
+        given = headers.get("authorization", "")
+        given = given[len("Bearer "):] if given.startswith("Bearer ") else query.get("token", [""])[0]
+        return hmac.compare_digest(given.encode("utf-8"), self.token.encode("utf-8"))
+
+    def _same_site(self, headers: dict) -> bool:
+        """False for a browser request made by another site's page."""
+        host = headers.get("host")
+        if host is not None and self.host in _LOCAL_NAMES and urlsplit("//" + host).hostname not in _LOCAL_NAMES:
+            return False  # DNS rebinding: another name pointed at 127.0.0.1
+        origin = headers.get("origin")
+        if origin is None:
+            return True  # not sent by a browser page
+        return urlsplit(origin).hostname in _LOCAL_NAMES or urlsplit(origin).netloc == host
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, target, _version = lines[0].split(" ", 2)
+            except ValueError:
+                await self._send(writer, 400, {"error": "bad request line"})
+                return
+            headers = {}
+            for line in lines[1:]:
+                name, sep, value = line.partition(":")
+                if sep:
+                    headers[name.strip().lower()] = value.strip()
+            try:
+                length = int(headers.get("content-length", "0") or 0)
+            except ValueError:
+                await self._send(writer, 400, {"error": "bad Content-Length"})
+                return
+            if length < 0 or length > REMOTE_MAX_HEADER:
+                await self._send(writer, 400, {"error": "bad Content-Length"})
+                return
+            if length:
+                await reader.readexactly(length)  # bodies are not used
+            url = urlsplit(target)
+            query = parse_qs(url.query)
+            if not self._same_site(headers):
+                await self._send(writer, 403, {"error": "cross-site request refused"})
+                return
+            if not self._authorized(headers, query):
+                await self._send(writer, 401, {"error": "missing or wrong token"})
+                return
+            if method.upper() == "POST" and \
+                    headers.get("content-type", "").split(";")[0].strip().lower() != "application/json":
+                await self._send(writer, 415, {"error": "send Content-Type: application/json"})
+                return
+            await self._route(method.upper(), url.path.rstrip("/") or "/", query, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # server stopping; end quietly, asyncio's stream callback complains about cancelled handlers
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    async def _route(self, method: str, path: str, query: dict, writer: asyncio.StreamWriter):
+        routes = {"/": ("GET", self._get_status), "/status": ("GET", self._get_status),
+                  "/log": ("GET", self._get_log), "/events": ("GET", self._get_events),
+                  "/start": ("POST", self._post_start), "/stop": ("POST", self._post_stop)}
+        if path not in routes:
+            await self._send(writer, 404, {"error": f"no such endpoint {path}"})
+            return
+        allowed, handler = routes[path]
+        if method != allowed:
+            await self._send(writer, 405, {"error": f"use {allowed} for {path}"})
+            return
+        await handler(query, writer)
+
+    async def _send(self, writer: asyncio.StreamWriter, code: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        writer.write(f"HTTP/1.1 {code} {_REASONS[code]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\nCache-Control: no-store\r\nConnection: close\r\n\r\n"
+                     .encode("latin-1") + data)
+        await writer.drain()
+
+    async def _get_status(self, query: dict, writer):
+        await self._send(writer, 200, self.state.snapshot())
+
+    async def _get_log(self, query: dict, writer):
+        try:
+            lines = int(query.get("lines", [REMOTE_LOG_LINES])[0])
+        except ValueError:
+            await self._send(writer, 400, {"error": "lines must be a number"})
+            return
+        await self._send(writer, 200, {"lines": self.state.recent_log(lines)})
+
+    async def _control(self, action: str, writer):
+        if self.controller is None:
+            await self._send(writer, 503, {"error": "nothing to control yet"})
+            return
+        if getattr(self.controller, action)():
+            await self._send(writer, 202, {"ok": True, "action": action})
+        else:
+            await self._send(writer, 409, {"ok": False, "error": "already running" if action == "start"
+                                           else "not running"})
+
+    async def _post_start(self, query: dict, writer):
+        await self._control("start", writer)
+
+    async def _post_stop(self, query: dict, writer):
+        await self._control("stop", writer)
+
+    async def _get_events(self, query: dict, writer: asyncio.StreamWriter):
+        try:
+            backlog = int(query.get("lines", [REMOTE_SSE_BACKLOG])[0] or 0)
+        except ValueError:
+            await self._send(writer, 400, {"error": "lines must be a number"})
+            return
+        queue = self.state.subscribe(asyncio.get_running_loop())
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-store\r\n"
+                         b"Connection: keep-alive\r\n\r\n")
+            # A new client first gets the current state, then only changes
+            writer.write(_sse("status", self.state.snapshot()))
+            for line in self.state.recent_log(backlog):
+                writer.write(_sse("log", {"line": line}))
+            await writer.drain()
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), REMOTE_SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    writer.write(b": keep-alive\n\n")
+                else:
+                    if item is None:
+                        return  # it can reconnect and get a fresh snapshot
+                    writer.write(_sse(*item))
+                await writer.drain()
+        finally:
+            self.state.unsubscribe(queue)
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+
+"""
+Automated Task Runner (Pro) - retry policies
+Author: xTheRedShirtx
+
+How a failed click step is retried. Errors are classified first: transient
+ones (the app was slow, a window was in the way) are retried after an
+exponential backoff with jitter and optional recovery actions; fatal ones (a
+bad workflow, a missing module) and the PyAutoGUI fail-safe are not. Each step
+can have its own attempt and time budget. StepTuner learns a per-step delay
+after each click from whether the next, screen-verified click worked first time.
+"""
+
+RETRY_BACKOFF = 0.5           # seconds before the first retry; doubles with each further attempt
+RETRY_BACKOFF_MAX = 8.0       # longest pause between two attempts
+RETRY_JITTER = 0.5            # up to this fraction of each pause is taken off at random
+RETRY_RESTARTS = 3            # iterations restarted in a row (on_failure "restart") before the run stops
+TUNE_MIN_FRACTION = 0.25      # a tuned step delay stays between this fraction of Step delay...
+TUNE_MAX_FRACTION = 2.0       # ...and this multiple of it
+TUNE_SHRINK = 0.9             # delay factor after a first-try success
+TUNE_GROW = 1.5               # delay factor after a retry was needed
+
+TRANSIENT = "transient"
+FATAL = "fatal"
+FAILSAFE = "failsafe"
+
+# Errors from a bad workflow or a missing module; another attempt cannot fix them
+FATAL_ERRORS = (ImportError, NotImplementedError, AttributeError, KeyError, TypeError, ValueError)
+
+RECOVERY_ACTIONS = ("clear_dialog", "focus")   # "focus" or "focus:<window title text>"
+ON_FAILURE = ("stop", "skip", "restart")
+
+
+def classify(exc: BaseException, failsafe=None) -> str:
+    """TRANSIENT, FATAL or FAILSAFE. `failsafe(exc)` recognises the PyAutoGUI abort."""
+    if failsafe is not None and failsafe(exc):
+        return FAILSAFE
+    if isinstance(exc, FATAL_ERRORS):
+        return FATAL
+    return TRANSIENT
+
+
+@dataclass
+class RetryPolicy:
+    """Retry settings for one step, from its optional "retry" table."""
+    attempts: int = 3
+    backoff: float = RETRY_BACKOFF
+    max_backoff: float = RETRY_BACKOFF_MAX
+    jitter: float = RETRY_JITTER
+    budget: float = 0.0           # seconds for all attempts of the step; 0 = no limit
+    recover: tuple = ()
+    on_failure: str = "stop"
+
+    def delay(self, attempt: int, rng) -> float:
+        """Pause before attempt number `attempt` (2 = the first retry)."""
+        if attempt <= 1 or self.backoff <= 0:
+            return 0.0
+        pause = min(self.max_backoff, self.backoff * 2 ** (attempt - 2))
+        return pause * (1 - self.jitter * rng.random())
+
+    @classmethod
+    def from_step(cls, spec: dict, attempts: int) -> "RetryPolicy":
+        """Policy from a step's "retry" table; `attempts` is the Retries setting used when it has none."""
+        spec = spec or {}
+        if not isinstance(spec, dict):
+            raise ValueError("retry must be a table")
+        unknown = set(spec) - {"attempts", "backoff", "max_backoff", "jitter", "budget", "recover", "on_failure"}
+        if unknown:
+            raise ValueError(f"retry: unknown key(s) {', '.join(sorted(unknown))}")
+        policy = cls(
+            attempts=max(1, int(spec.get("attempts", attempts))),
+            backoff=max(0.0, float(spec.get("backoff", RETRY_BACKOFF))),
+            max_backoff=max(0.0, float(spec.get("max_backoff", RETRY_BACKOFF_MAX))),
+            jitter=min(1.0, max(0.0, float(spec.get("jitter", RETRY_JITTER)))),
+            budget=max(0.0, float(spec.get("budget", 0))),
+            recover=tuple(str(r) for r in spec.get("recover", ())),
+            on_failure=str(spec.get("on_failure", "stop")),
+        )
+        for action in policy.recover:
+            if action.partition(":")[0] not in RECOVERY_ACTIONS:
+                raise ValueError(f"retry: unknown recover action {action!r}; use {', '.join(RECOVERY_ACTIONS)}")
+        if policy.on_failure not in ON_FAILURE:
+            raise ValueError(f"retry: on_failure must be one of {', '.join(ON_FAILURE)}")
+        return policy
+
+
+class StepTuner:
+    """Per-step delay after an unverified click, tuned from outcomes.
+
+    Only a click with a screen check ("verify") shows whether the app was
+    ready for it, so only such a click tunes the delay of the click before
+    it: a first-try success shrinks that delay a little, a retry or failure
+    grows it. Delays with no verified click after them stay at Step delay.
+    Delays stay within TUNE_MIN_FRACTION..TUNE_MAX_FRACTION of Step delay.
+    """
+
+    def __init__(self, base: float):
+        self.base = float(base)
+        self.delays = {}
+        self.stats = {}
+
+    def delay(self, step: str) -> float:
+        return self.delays.get(step, self.base)
+
+    def record(self, step: str, attempts: int, ok: bool, previous: str = None, verified: bool = False):
+        """Outcome of one click. `previous` is the unverified click whose delay came just before it."""
+        stats = self.stats.setdefault(step, {"first_try": 0, "retried": 0, "failed": 0})
+        if not ok:
+            stats["failed"] += 1
+        elif attempts > 1:
+            stats["retried"] += 1
+        else:
+            stats["first_try"] += 1
+        if previous and verified:
+            self._scale(previous, TUNE_SHRINK if ok and attempts == 1 else TUNE_GROW)
+
+    def _scale(self, step: str, factor: float):
+        low, high = self.base * TUNE_MIN_FRACTION, self.base * TUNE_MAX_FRACTION
+        self.delays[step] = min(high, max(low, self.delay(step) * factor))
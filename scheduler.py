@@ -0,0 +1,301 @@
+import datetime
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass, field
+
+from main import RunConfig, AutomationRunner, APP_AUTHOR, _load_document, load_run_config, run_config_from_dict, logger
+
+"""
+Automated Task Runner (Pro) - scheduled stream loops
+Author: xTheRedShirtx
+"""
+
+SCHEDULER_MAX_SLEEP = 300.0   # seconds; re-reads the wall clock at least this often (clock changes, DST)
+SCHEDULER_SIGNAL_POLL = 1.0   # seconds; the main thread wakes this often so Ctrl+C works on Windows
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def _parse_weekdays(days) -> frozenset:
+    """Weekday names ("mon".."sun") or numbers (0 = Monday) to a set of datetime.weekday() values."""
+    out = set()
+    for d in days:
+        if isinstance(d, int):
+            if not 0 <= d <= 6:
+                raise ValueError(f"weekday {d} out of range 0-6")
+            out.add(d)
+        else:
+            try:
+                out.add(WEEKDAYS.index(str(d).strip().lower()[:3]))
+            except ValueError:
+                raise ValueError(f"unknown weekday {d!r}") from None
+    return frozenset(out)
+
+
+class DailyTrigger:
+    """Fires at fixed wall-clock times ("HH:MM"), optionally only on some weekdays."""
+
+    def __init__(self, times, weekdays=None):
+        if isinstance(times, str):
+            times = [times]
+        self.times = sorted(datetime.datetime.strptime(t, "%H:%M").time() for t in times)
+        if not self.times:
+            raise ValueError("at: no times given")
+        self.weekdays = _parse_weekdays(weekdays) if weekdays else None
+
+    def next_after(self, dt: datetime.datetime) -> datetime.datetime:
+        for offset in range(8):
+            day = dt.date() + datetime.timedelta(days=offset)
+            if self.weekdays is not None and day.weekday() not in self.weekdays:
+                continue
+            for t in self.times:
+                candidate = datetime.datetime.combine(day, t)
+                if candidate > dt:
+                    return candidate
+        raise ValueError("at: trigger never fires")
+
+
+class IntervalTrigger:
+    """Fires every `seconds` after the previous due time."""
+
+    def __init__(self, seconds):
+        self.seconds = float(seconds)
+        if self.seconds <= 0:
+            raise ValueError("every: must be greater than 0")
+
+    def next_after(self, dt: datetime.datetime) -> datetime.datetime:
+        return dt + datetime.timedelta(seconds=self.seconds)
+
+
+class CronTrigger:
+    """Five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Fields accept *, numbers, lists (1,15), ranges (1-5) and steps (*/10, 8-18/2).
+    Day of week is 0-7 with 0 and 7 both Sunday. As in cron, when both day fields
+    are restricted a day matches if either one does.
+    """
+
+    _FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+    def __init__(self, expr: str):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron: expected 5 fields, got {len(parts)} in {expr!r}")
+        self.expr = expr
+        sets = [self._parse_field(p, name, lo, hi) for p, (name, lo, hi) in zip(parts, self._FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = sets
+        # cron Sunday is 0 or 7; datetime.weekday() Sunday is 6
+        self.weekdays = frozenset((d - 1) % 7 for d in weekdays)
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(text: str, name: str, lo: int, hi: int) -> frozenset:
+        values = set()
+        for item in text.split(","):
+            rng, _, step = item.partition("/")
+            step = int(step) if step else 1
+            if rng == "*":
+                start, end = lo, hi
+            elif "-" in rng:
+                start, end = (int(v) for v in rng.split("-", 1))
+            else:
+                start = end = int(rng)
+            if step < 1 or not lo <= start <= end <= hi:
+                raise ValueError(f"cron: bad {name} field {text!r}")
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def _day_matches(self, d: datetime.datetime) -> bool:
+        dom = d.day in self.days
+        dow = d.weekday() in self.weekdays
+        if self.any_day:
+            return dow
+        if self.any_weekday:
+            return dom
+        return dom or dow
+
+    def next_after(self, dt: datetime.datetime) -> datetime.datetime:
+        t = dt.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = t + datetime.timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + datetime.timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + datetime.timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += datetime.timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"cron: {self.expr!r} never fires")
+
+
+@dataclass
+class ScheduledJob:
+    """A workflow run queued by a trigger. Each firing runs `iterations` loop passes (0 = until stopped)."""
+    name: str
+    trigger: object
+    config: RunConfig
+    iterations: int = 1
+    run_at_start: bool = False
+    next_run: datetime.datetime = None
+    runs: int = field(default=0, compare=False)
+
+
+class Scheduler:
+    """Runs ScheduledJobs when their triggers come due.
+
+    One thread sleeps until the earliest due time on a heap, so it wakes only
+    for the next event. Each due job gets its own runner thread; the runners
+    share main.INPUT_LOCK, so clicks and typing from different loops never
+    interleave. A job that is still running when it comes due again is skipped.
+    """
+
+    def __init__(self, jobs, clock=datetime.datetime.now):
+        self.clock = clock
+        self.jobs = list(jobs)
+        self._heap = []
+        self._seq = itertools.count()
+        self._active = {}
+        self._stopping = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def _push(self, job: ScheduledJob, due: datetime.datetime):
+        job.next_run = due
+        heapq.heappush(self._heap, (due, next(self._seq), job))
+
+    def start(self):
+        """Start the scheduler thread."""
+        self._thread = threading.Thread(target=self.run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop every running job and the scheduler thread."""
+        with self._cond:
+            self._stopping = True
+            for _thread, runner in self._active.values():
+                runner.stop()
+            self._cond.notify_all()
+
+    def status(self) -> list:
+        """[(name, next_run, running), ...] for each job."""
+        with self._cond:
+            return [(j.name, j.next_run, j.name in self._active) for j in self.jobs]
+
+    def run(self):
+        """Serve the schedule on this thread until stop() is called."""
+        now = self.clock()
+        with self._cond:
+            self._stopping = False
+            for job in self.jobs:
+                self._push(job, now if job.run_at_start else job.trigger.next_after(now))
+                logger.info(f"Scheduled '{job.name}', next run {job.next_run:%Y-%m-%d %H:%M:%S}")
+            while not self._stopping:
+                now = self.clock()
+                while self._heap and self._heap[0][0] <= now:
+                    due, _, job = heapq.heappop(self._heap)
+                    self._launch(job)
+                    self._push(job, job.trigger.next_after(max(due, now)))
+                delay = (self._heap[0][0] - self.clock()).total_seconds() if self._heap else SCHEDULER_MAX_SLEEP
+                self._cond.wait(min(max(delay, 0.0), SCHEDULER_MAX_SLEEP))
+            active = [t for t, _runner in self._active.values()]
+        for t in active:
+            t.join()
+
+    def _launch(self, job: ScheduledJob):
+        if job.name in self._active:
+            logger.warning(f"Schedule '{job.name}' is still running; skipping this run.")
+            return
+        try:
+            runner = job.config.make_runner(max_iterations=job.iterations)
+        except (OSError, ValueError) as e:
+            logger.error(f"Schedule '{job.name}': invalid workflow: {e}")
+            return
+        runner.log_signal.connect(lambda msg, name=job.name: logger.info(f"[{name}] {msg}"))
+        runner.error_popup_signal.connect(lambda msg, name=job.name: logger.error(f"[{name}] {msg}"))
+        job.runs += 1
+        t = threading.Thread(target=self._run_job, args=(job, runner), name=f"job-{job.name}", daemon=True)
+        self._active[job.name] = (t, runner)
+        logger.info(f"Starting scheduled run '{job.name}' (#{job.runs}).")
+        t.start()
+
+    def _run_job(self, job: ScheduledJob, runner: AutomationRunner):
+        try:
+            runner.run()
+        finally:
+            with self._cond:
+                self._active.pop(job.name, None)
+            logger.info(f"Scheduled run '{job.name}' ended.")
+
+
+def make_trigger(spec: dict):
+    """Build the trigger for one job: exactly one of "at", "cron" or "every"."""
+    kinds = [k for k in ("at", "cron", "every") if k in spec]
+    if len(kinds) != 1:
+        raise ValueError('needs exactly one of "at", "cron" or "every"')
+    if "weekdays" in spec and kinds[0] != "at":
+        raise ValueError('"weekdays" only applies to "at"')
+    if kinds[0] == "at":
+        return DailyTrigger(spec["at"], spec.get("weekdays"))
+    if kinds[0] == "cron":
+        return CronTrigger(str(spec["cron"]))
+    return IntervalTrigger(spec["every"])
+
+
+def load_schedule(path: str) -> list:
+    """Read a schedule file (.toml or .json) with one [[jobs]] entry per scheduled loop."""
+    data = _load_document(path)
+    jobs = []
+    known = {"name", "at", "cron", "every", "weekdays", "config", "iterations", "run_at_start"}
+    for i, spec in enumerate(data.get("jobs", [])):
+        name = str(spec.get("name", f"job {i + 1}"))
+        unknown = set(spec) - known
+        if unknown:
+            raise ValueError(f"{path}: job '{name}': unknown setting(s) {', '.join(sorted(unknown))}")
+        try:
+            trigger = make_trigger(spec)
+        except ValueError as e:
+            raise ValueError(f"{path}: job '{name}': {e}") from e
+        config = spec.get("config")
+        if config is None:
+            config = RunConfig()
+        elif isinstance(config, dict):
+            config = run_config_from_dict(config, f"{path}: job '{name}'")
+        else:
+            config = load_run_config(str(config))
+        jobs.append(ScheduledJob(name, trigger, config, max(0, int(spec.get("iterations", 1))),
+                                 bool(spec.get("run_at_start", False))))
+    if not jobs:
+        raise ValueError(f"{path}: no [[jobs]] defined")
+    if len({j.name for j in jobs}) != len(jobs):
+        raise ValueError(f"{path}: job names must be unique")
+    return jobs
+
+
+def run_scheduled(jobs: list) -> int:
+    """Serve a schedule without Qt until SIGINT/SIGTERM. Returns a process exit code.
+
+    The scheduler runs on its own thread: on Windows a signal handler only
+    runs once the main thread wakes, and a Condition wait can last minutes.
+    """
+    import signal
+
+    scheduler = Scheduler(jobs)
+
+    def request_stop(signum, _frame):
+        logger.info(f"Received signal {signum}; stopping.")
+        scheduler.stop()
+
+    signal.signal(signal.SIGINT, request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, request_stop)
+    logger.info(f"===== Scheduler started with {len(jobs)} job(s). Author: {APP_AUTHOR} =====")
+    scheduler.start()
+    while scheduler._thread.is_alive():
+        scheduler._thread.join(SCHEDULER_SIGNAL_POLL)
+    logger.info("Scheduler stopped")
+    return 0
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+"""
+Automated Task Runner (Pro) - session checkpoints
+Author: xTheRedShirtx
+
+An append-only JSON-lines journal of where the running loop is: iteration,
+step and the wall-clock end of the long wait. Records are queued in memory
+and written by a background thread that fsyncs once per batch, so the click
+path never waits on the disk. After a crash the last record says where to
+resume.
+"""
+
+STATE_FLUSH_INTERVAL = 1.0    # seconds a batch of records is collected before one write + fsync
+STATE_COMPACT_BYTES = 65536   # journal is rewritten as just its last record once it grows past this
+
+
+def fingerprint(workflow: dict) -> str:
+    """Short stable id of a workflow, so a checkpoint is only resumed with the same steps."""
+    text = json.dumps(workflow, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class SessionJournal:
+    """Checkpoint writer for one run. Opening it starts a new journal, replacing the previous run's."""
+
+    def __init__(self, path: str, flush_interval: float = STATE_FLUSH_INTERVAL,
+                 compact_bytes: int = STATE_COMPACT_BYTES):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.compact_bytes = compact_bytes
+        self.syncs = 0
+        self._file = open(path, "w", encoding="utf-8")
+        self._size = 0
+        self._pending = []
+        self._closing = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._writer, name="state-journal", daemon=True)
+        self._thread.start()
+
+    def record(self, entry: dict):
+        """Queue one checkpoint. Never touches the disk on the calling thread."""
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._cond:
+            self._pending.append(line)
+            self._cond.notify()
+
+    def close(self):
+        """Write and fsync everything queued, then stop the writer thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+        self._file.close()
+
+    def _writer(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, []
+                closing = self._closing
+            if batch:
+                try:
+                    self._write(batch)
+                except OSError as e:
+                    logging.getLogger("automation").warning(f"Could not write {self.path}: {e}")
+            if closing:
+                return
+
+    def _write(self, batch: list):
+        data = "\n".join(batch) + "\n"
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.syncs += 1
+        self._size += len(data)
+        if self._size > self.compact_bytes:
+            self._compact(batch[-1])
+
+    def _compact(self, last: str):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(last + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(tmp, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = len(last) + 1
+
+
+def load_checkpoint(path: str) -> dict:
+    """Last complete record in a journal, or None. A torn final line from a crash is ignored."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    for line in reversed(lines):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict):
+            return entry
+    return None
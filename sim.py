@@ -0,0 +1,649 @@
+import base64
+import copy
+import datetime
+import heapq
+import itertools
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import retry
+from main import (
+    DEFAULT_POINTS, DEFAULT_WORKFLOW, OBS_ERROR_TITLES, OBS_HOTKEY_RESTART_PAUSE, OBS_START_HOTKEY,
+    OBS_STOP_HOTKEY, OBS_WS_TIMEOUT, Clock, FakeDisplayBackend, FakeWindowBackend, HotkeyObsController, InputDriver,
+    ObsWebSocketController, RunConfig, WindowScanner, load_resume_point,
+    _obs_auth, _recv_exact, _ws_accept_key, _ws_recv, _ws_send,
+)
+
+"""
+Automated Task Runner (Pro) - deterministic simulation
+Author: xTheRedShirtx
+
+Runs AutomationRunner on a virtual clock with a recording input driver, a
+fake window list and a fake OBS controller, on the calling thread. Waits
+advance the clock instead of sleeping, so a multi-day run finishes in well
+under a second. Used by `python bench.py sim` as a regression check.
+
+MockObsServer is a real local obs-websocket v5 server for `python bench.py obs`.
+"""
+
+SIM_START = datetime.datetime(2026, 1, 5, 8, 0, 0)
+
+
+class SimClock(Clock):
+    """Virtual time. Waits and sleeps jump forward, firing any timers (call_at) that come due on the way."""
+
+    def __init__(self, start: datetime.datetime = SIM_START):
+        self.t = 0.0
+        self.start = start
+        self._timers = []
+        self._seq = itertools.count()
+
+    def monotonic(self) -> float:
+        return self.t
+
+    def now(self) -> datetime.datetime:
+        return self.start + datetime.timedelta(seconds=self.t)
+
+    def call_at(self, when: float, fn) -> list:
+        """Run fn() when virtual time reaches `when`. Returns a handle for cancel()."""
+        entry = [when, next(self._seq), fn]
+        heapq.heappush(self._timers, entry)
+        return entry
+
+    @staticmethod
+    def cancel(entry: list):
+        entry[2] = None
+
+    def _advance(self, target: float, event: threading.Event = None) -> bool:
+        while self._timers and self._timers[0][0] <= target:
+            when, _, fn = heapq.heappop(self._timers)
+            if fn is None:
+                continue
+            self.t = max(self.t, when)
+            fn()
+            if event is not None and event.is_set():
+                return True
+        self.t = max(self.t, target)
+        return event is not None and event.is_set()
+
+    def sleep(self, seconds: float):
+        self._advance(self.t + max(0.0, seconds))
+
+    def wait(self, event: threading.Event, timeout: float = None) -> bool:
+        if event.is_set():
+            return True
+        if timeout is None:
+            live = [e for e in self._timers if e[2] is not None]
+            if not live:
+                raise RuntimeError("simulation would wait forever: no timers pending")
+            timeout = max(e[0] for e in live) - self.t
+        return self._advance(self.t + max(0.0, timeout), event)
+
+    def watchdog(self, timeout: float, error_callback) -> "SimWatchdog":
+        return SimWatchdog(self, timeout, error_callback)
+
+
+class SimWatchdog:
+    """HeartbeatWatchdog on virtual time: a clock timer instead of a monitor thread."""
+
+    def __init__(self, clock: SimClock, timeout, error_callback):
+        self.clock = clock
+        self.timeout = timeout
+        self.error_callback = error_callback
+        self._last_beat = clock.t
+        self._pause_depth = 0
+        self._timer = None
+        self._closed = False
+
+    def beat(self):
+        self._last_beat = self.clock.t
+        if self._timer is None and not self._pause_depth and not self._closed:
+            self._timer = self.clock.call_at(self._last_beat + self.timeout, self._check)
+
+    def _check(self):
+        self._timer = None
+        if self._pause_depth or self._closed:
+            return
+        due = self._last_beat + self.timeout
+        if self.clock.t < due:
+            self._timer = self.clock.call_at(due, self._check)
+            return
+        self.error_callback()
+
+    def _disarm(self):
+        if self._timer is not None:
+            self.clock.cancel(self._timer)
+            self._timer = None
+
+    def pause(self):
+        self._disarm()
+
+    @contextmanager
+    def paused(self):
+        self._pause_depth += 1
+        self._disarm()
+        try:
+            yield
+        finally:
+            self._pause_depth -= 1
+            if not self._pause_depth:
+                self.beat()
+
+    def close(self):
+        self._closed = True
+        self._disarm()
+
+
+class FakeInputDriver(InputDriver):
+    """Records (virtual time, action, args). `hangs` maps an action number (0-based) to seconds it blocks,
+    `failures` maps one to the exception it raises after being recorded.
+
+    Models one text field and the clipboard: a click focuses an empty field,
+    typing or ctrl+v adds to it (replacing it after ctrl+a), ctrl+c copies it.
+    `typo` is inserted into the first text typed, to test read-back.
+    `busy_reads` holds get_clipboard call numbers (0-based) that fail as if
+    another program had the clipboard open.
+    """
+
+    def __init__(self, clock: SimClock, hangs: dict = None, on_press=None, failures: dict = None):
+        self.clock = clock
+        self.actions = []
+        self.hangs = dict(hangs or {})
+        self.failures = dict(failures or {})
+        self.on_press = on_press
+        self.field = ""
+        self.selected = False
+        self.clipboard = ""
+        self.reads = 0
+        self.busy_reads = set()
+        self.typo = ""
+
+    def _record(self, action: str, *args):
+        n = len(self.actions)
+        self.actions.append((round(self.clock.t, 3), action) + args)
+        if n in self.hangs:
+            self.clock.sleep(self.hangs[n])
+        if n in self.failures:
+            raise self.failures[n]
+
+    def _enter(self, text: str):
+        self.field = text if self.selected else self.field + text
+        self.selected = False
+
+    def click(self, x: int, y: int):
+        self._record("click", x, y)
+        self.field, self.selected = "", False
+
+    def typewrite(self, text: str):
+        self._record("type", text)
+        self._enter(self.typo + text)
+        self.typo = ""
+
+    def hotkey(self, *keys: str):
+        combo = "+".join(keys)
+        self._record("hotkey", combo)
+        if combo == "ctrl+a":
+            self.selected = True
+        elif combo == "ctrl+c":
+            self.clipboard = self.field
+        elif combo == "ctrl+v":
+            self._enter(self.clipboard)
+
+    def get_clipboard(self) -> str:
+        n, self.reads = self.reads, self.reads + 1
+        if n in self.busy_reads:
+            raise OSError("the clipboard is in use by another program")
+        return self.clipboard
+
+    def set_clipboard(self, text: str):
+        self.clipboard = text
+
+    def press(self, key: str):
+        self._record("press", key)
+        if self.on_press:
+            self.on_press(key)
+
+
+class FakeObs:
+    """OBS controller stand-in that logs restarts into the driver's action list.
+    A restart takes `restart_seconds` of virtual time, like OBS confirming over WebSocket."""
+
+    def __init__(self, driver: FakeInputDriver):
+        self.driver = driver
+        self.restart_seconds = 0.0
+
+    def start_stream(self) -> bool:
+        self.driver._record("obs_start")
+        return True
+
+    def stop_stream(self) -> bool:
+        self.driver._record("obs_stop")
+        return True
+
+    def restart_stream(self, wait=None) -> bool:
+        self.driver.clock.sleep(self.restart_seconds)
+        return self.stop_stream() and self.start_stream()
+
+
+class MockObsServer:
+    """Minimal local obs-websocket v5 server for testing the WebSocket backend offline.
+
+    Answers Identify, GetStreamStatus, StartStream and StopStream, and emits
+    StreamStateChanged events after `state_delay` seconds. `reply_delay`
+    ({request type: seconds}) holds back answers to test client timeouts.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, password: str = "", state_delay: float = 0.05):
+        self.password = password
+        self.state_delay = state_delay
+        self.stream_active = False
+        self.requests = []
+        self.reply_delay = {}
+        self._srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._srv.bind((host, port))
+        self._srv.listen()
+        self.host, self.port = self._srv.getsockname()
+        self._running = False
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._srv.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._srv.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        lock = threading.Lock()
+
+        def send(op, d):
+            with lock:
+                _ws_send(conn, json.dumps({"op": op, "d": d}), mask=False)
+
+        def set_state(active):
+            time.sleep(self.state_delay)
+            self.stream_active = active
+            state = "OBS_WEBSOCKET_OUTPUT_STARTED" if active else "OBS_WEBSOCKET_OUTPUT_STOPPED"
+            send(5, {"eventType": "StreamStateChanged", "eventIntent": intent,
+                     "eventData": {"outputActive": active, "outputState": state}})
+
+        intent = ObsWebSocketController.EVENT_SUB_OUTPUTS
+        try:
+            head = b""
+            while b"\r\n\r\n" not in head:
+                head += _recv_exact(conn, 1)
+            key = next(line.split(b":", 1)[1].strip().decode() for line in head.split(b"\r\n")
+                       if line.lower().startswith(b"sec-websocket-key:"))
+            conn.sendall((
+                "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {_ws_accept_key(key)}\r\n"
+                "Sec-WebSocket-Protocol: obswebsocket.json\r\n\r\n"
+            ).encode())
+            hello = {"obsWebSocketVersion": "5.0.0-mock", "rpcVersion": 1}
+            salt, challenge = "mock-salt", base64.b64encode(os.urandom(8)).decode()
+            if self.password:
+                hello["authentication"] = {"challenge": challenge, "salt": salt}
+            send(0, hello)
+            identify = json.loads(_ws_recv(conn, mask=False))
+            if self.password and identify["d"].get("authentication") != _obs_auth(self.password, salt, challenge):
+                conn.close()
+                return
+            send(2, {"negotiatedRpcVersion": 1})
+            while self._running:
+                req = json.loads(_ws_recv(conn, mask=False))["d"]
+                rtype = req.get("requestType")
+                self.requests.append(rtype)
+                resp = {"requestType": rtype, "requestId": req.get("requestId"),
+                        "requestStatus": {"result": True, "code": 100}}
+                if rtype == "GetStreamStatus":
+                    resp["responseData"] = {"outputActive": self.stream_active}
+                elif rtype in ("StartStream", "StopStream"):
+                    want = rtype == "StartStream"
+                    if self.stream_active == want:
+                        resp["requestStatus"] = {"result": False, "code": 500 + int(want)}
+                    else:
+                        threading.Thread(target=set_state, args=(want,), daemon=True).start()
+                else:
+                    resp["requestStatus"] = {"result": False, "code": 204}
+                if self.reply_delay.get(rtype):
+                    threading.Timer(self.reply_delay[rtype], send, (7, resp)).start()
+                else:
+                    send(7, resp)
+        except Exception:
+            pass
+        finally:
+            conn.close()
+
+
+class Simulation:
+    """One AutomationRunner wired to virtual time and fakes. Call run(), then inspect `actions` and `statuses`."""
+
+    def __init__(self, config: RunConfig = None, workflow: dict = None, iterations: int = 0,
+                 hangs: dict = None, start: datetime.datetime = SIM_START, state_file: str = "",
+                 resume: dict = None, failures: dict = None):
+        self.config = config or RunConfig()
+        self.clock = SimClock(start)
+        self.windows = FakeWindowBackend({1: "OBS 30.0 - Profile: Untitled"})
+        self.driver = FakeInputDriver(self.clock, hangs, on_press=self._dismiss_dialogs, failures=failures)
+        self.statuses = []
+        self.log = []
+        self.countdowns = []
+        self.runner = self.config.make_runner(
+            workflow=workflow or DEFAULT_WORKFLOW,
+            max_iterations=iterations,
+            input_lock=threading.Lock(),
+            display_backend=FakeDisplayBackend(),
+            clock=self.clock,
+            driver=self.driver,
+            dialog_scanner=WindowScanner(OBS_ERROR_TITLES, self.windows),
+            window_backend=self.windows,
+            obs=FakeObs(self.driver),
+            state_file=state_file,
+            resume=resume,
+        )
+        self.runner.dump_metrics = lambda iteration: None  # keep simulated runs out of METRICS_CSV
+        self.runner.random.seed(0)  # same retry jitter every run
+        self.runner.status_signal.connect(lambda s: self.statuses.append((round(self.clock.t, 3), s)))
+        self.runner.log_signal.connect(lambda m: self.log.append((round(self.clock.t, 3), m)))
+        self.runner.countdown_signal.connect(lambda d, total: self.countdowns.append((round(self.clock.t, 3), d, total)))
+
+    @property
+    def actions(self) -> list:
+        return self.driver.actions
+
+    def _dismiss_dialogs(self, key: str):
+        if key == "enter":
+            for handle, title in list(self.windows.windows.items()):
+                if any(t in title for t in OBS_ERROR_TITLES):
+                    del self.windows.windows[handle]
+
+    def inject_dialog(self, at: float, title: str = OBS_ERROR_TITLES[0]):
+        """Open an OBS error dialog at virtual time `at` (seconds from the start)."""
+        handle = 1000 + len(self.windows.windows)
+        self.clock.call_at(at, lambda: self.windows.windows.__setitem__(handle, title))
+
+    def stop_at(self, at: float):
+        self.clock.call_at(at, self.runner.stop)
+
+    def crash_at(self, at: float):
+        """Stop at `at` like a killed process: whatever was checkpointed stays, no clean-exit record."""
+        self.runner._close_journal = lambda: self.runner.journal and self.runner.journal.close()
+        self.stop_at(at)
+
+    def run(self) -> "Simulation":
+        self.runner.run()
+        return self
+
+
+def expected_iteration(config: RunConfig, t0: float, when: datetime.datetime) -> list:
+    """Driver actions of one DEFAULT_WORKFLOW iteration starting at t0 with no dialogs and no failures."""
+    d, w, long_wait = config.step_delay, config.step4_wait, config.long_wait_seconds
+    p = DEFAULT_POINTS
+    steps = [
+        (0, p[0]),
+        (d, p[1]),
+        (2 * d, ("type", when.strftime("%Y-%m-%d"))),
+        (2 * d + 2, p[2]),
+        (3 * d + 2 + w, p[3]),
+        (4 * d + 4 + w + long_wait, p[4]),
+        (5 * d + 4 + w + long_wait, p[5]),
+    ]
+    out = []
+    for offset, target in steps:
+        if isinstance(target, tuple):
+            out.append((round(t0 + offset, 3),) + target)
+        else:
+            out.append((round(t0 + offset, 3), "click", target.x, target.y))
+    return out
+
+
+def iteration_seconds(config: RunConfig, workflow: dict = DEFAULT_WORKFLOW) -> float:
+    """Length of one DEFAULT_WORKFLOW iteration including the pause before the next."""
+    return 6 * config.step_delay + 4 + config.step4_wait + config.long_wait_seconds + workflow["iteration_pause"]
+
+
+def scenario_multi_day(days: int = 3) -> list:
+    """Several days of the default loop: exact action sequence and timing."""
+    config = RunConfig()
+    sim = Simulation(config)
+    sim.stop_at(days * 86400)
+    sim.run()
+    period = iteration_seconds(config)
+    expected = []
+    t0 = 0.0
+    while t0 < days * 86400:
+        expected += expected_iteration(config, t0, sim.clock.start + datetime.timedelta(seconds=t0 + 2 * config.step_delay))
+        t0 += period
+    expected = [a for a in expected if a[0] <= days * 86400]
+    problems = []
+    if sim.actions != expected:
+        first = next((i for i, (a, b) in enumerate(zip(sim.actions, expected)) if a != b),
+                     min(len(sim.actions), len(expected)))
+        problems.append(f"action {first}: got {sim.actions[first:first + 1]}, expected {expected[first:first + 1]} "
+                        f"({len(sim.actions)} vs {len(expected)} actions)")
+    waits = sum(1 for t, d, total in sim.countdowns if d)
+    if len(sim.countdowns) != 2 * waits or waits != -(-days * 86400 // period):
+        problems.append(f"expected one countdown start and one clear per long wait, got {len(sim.countdowns)} updates")
+    return problems
+
+
+def scenario_watchdog_timeout(hang: float = 60.0) -> list:
+    """A click that blocks longer than the watchdog stops the run exactly `watchdog` seconds after it began."""
+    config = RunConfig()
+    sim = Simulation(config, hangs={3: hang})  # the Step 3 click
+    sim.run()
+    problems = []
+    click_t = expected_iteration(config, 0, sim.clock.start)[3][0]
+    expected_status = (round(click_t + config.watchdog, 3), "Status: Error - Watchdog timeout")
+    if expected_status not in sim.statuses:
+        problems.append(f"expected {expected_status}, got statuses {sim.statuses}")
+    if len(sim.actions) != 4:
+        problems.append(f"expected the run to stop after the hung click, got {len(sim.actions)} actions")
+    return problems
+
+
+def scenario_obs_error_dialog(at: float = 3 * 3600 + 7) -> list:
+    """An error dialog during the long wait is dismissed at the next scan and the stream is restarted;
+    with the hotkey fallback, the pause between its stop and start keys is on the runner's clock;
+    a slow restart from a wait_for step does not trip the watchdog."""
+    config = RunConfig()
+    sim = Simulation(config, iterations=1)
+    long_wait_start = 3 * config.step_delay + 2 + config.step4_wait
+    sim.inject_dialog(long_wait_start + at)
+    sim.run()
+    interval = sim.runner.dialog_scan_interval
+    scan = long_wait_start + -(-at // interval) * interval
+    expected = [(round(scan + 0.2, 3), "press", "enter"), (round(scan + 0.2, 3), "obs_stop"),
+                (round(scan + 0.2, 3), "obs_start")]
+    problems = []
+    extra = [a for a in sim.actions if a[1] == "press" or a[1].startswith("obs_")]
+    if extra != expected:
+        problems.append(f"expected {expected}, got {extra}")
+    if len([a for a in sim.actions if a[1] == "click"]) != 6:
+        problems.append("iteration did not finish all six clicks after the dialog")
+
+    sim = Simulation(config, iterations=1)
+    sim.runner.obs = HotkeyObsController(sim.driver)
+    sim.inject_dialog(long_wait_start + at)
+    sim.run()
+    expected = [(round(scan + 0.2, 3), "press", "enter"), (round(scan + 0.2, 3), "press", OBS_STOP_HOTKEY),
+                (round(scan + 0.2 + OBS_HOTKEY_RESTART_PAUSE, 3), "press", OBS_START_HOTKEY)]
+    presses = [a for a in sim.actions if a[1] == "press"]
+    if presses != expected:
+        problems.append(f"hotkey restart: expected {expected}, got {presses}")
+
+    sim = Simulation(config, iterations=1)
+    sim.runner.obs.restart_seconds = 2 * OBS_WS_TIMEOUT
+    sim.inject_dialog(expected_iteration(config, 0, sim.clock.start)[5][0] - 1)  # during the 2 s wait before wait_for
+    sim.run()
+    if not any(a[1] == "obs_start" for a in sim.actions) or any("Watchdog" in s for t, s in sim.statuses):
+        problems.append(f"slow restart in wait_for: statuses {sim.statuses}")
+    elif len([a for a in sim.actions if a[1] == "click"]) != 6:
+        problems.append("iteration did not finish after a slow restart in wait_for")
+    return problems
+
+
+def scenario_crash_resume(crash_at: float = 5 * 3600, downtime: float = 600) -> list:
+    """Killed five hours into the long wait and restarted ten minutes later: resumes the same wait, same deadline."""
+    config = RunConfig()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.jsonl")
+        first = Simulation(config, state_file=path)
+        first.crash_at(crash_at)
+        first.run()
+        point = load_resume_point(first.runner.workflow, path)
+        restart = SIM_START + datetime.timedelta(seconds=crash_at + downtime)
+        second = Simulation(config, iterations=1, start=restart, state_file=path, resume=point).run()
+    if not point or point.get("step") != 7:
+        return [f"expected a checkpoint at the long wait (step 8), got {point}"]
+    problems = []
+    full = expected_iteration(config, 0, SIM_START)
+    expected = [(round(a[0] - crash_at - downtime, 3),) + a[1:] for a in full[5:]]
+    if second.actions != expected:
+        problems.append(f"expected {expected} after resuming, got {second.actions}")
+    return problems
+
+
+def scenario_click_retry() -> list:
+    """Transient click errors back off and retry, a fatal one stops at once, on_failure "restart" starts over."""
+    config = RunConfig()
+    problems = []
+    first = DEFAULT_POINTS[0]
+
+    sim = Simulation(config, iterations=1, failures={0: OSError("busy"), 1: OSError("busy")}).run()
+    times = [a[0] for a in sim.actions[:3]]
+    policy = retry.RetryPolicy(config.retries)
+    if [a[1:] for a in sim.actions[:3]] != [("click", first.x, first.y)] * 3:
+        problems.append(f"expected Step 1 clicked three times, got {sim.actions[:3]}")
+    elif not (policy.backoff * (1 - policy.jitter) <= times[1] <= policy.backoff
+              and 2 * policy.backoff * (1 - policy.jitter) <= times[2] - times[1] <= 2 * policy.backoff):
+        problems.append(f"retry pauses outside the backoff range: {times}")
+    if len([a for a in sim.actions if a[1] == "click"]) != 8:
+        problems.append("iteration did not go on after the retried click")
+
+    sim = Simulation(config, iterations=1, failures={0: ValueError("bad point")}).run()
+    if len(sim.actions) != 1:
+        problems.append(f"a fatal error was retried: {sim.actions}")
+
+    workflow = copy.deepcopy(DEFAULT_WORKFLOW)
+    workflow["steps"][0]["retry"] = {"attempts": 1, "on_failure": "restart"}
+    sim = Simulation(config, workflow, iterations=1, failures={0: OSError("busy")}).run()
+    if sim.actions[:2] != [(0.0, "click", first.x, first.y), (float(workflow["iteration_pause"]), "click", first.x, first.y)]:
+        problems.append(f"expected the iteration to restart after iteration_pause, got {sim.actions[:2]}")
+    return problems
+
+
+def scenario_focus_steal(at: float = 25.0) -> list:
+    """With a target window, input is sent only after it is in front; a popup that takes focus is undone once."""
+    config = RunConfig()
+    workflow = dict(DEFAULT_WORKFLOW, window="OBS")
+    sim = Simulation(config, workflow, iterations=1)
+
+    def popup():
+        sim.windows.windows[2] = "Update available"
+        sim.windows.front = 2
+    sim.clock.call_at(at, popup)
+    sim.run()
+    focus = sim.runner.window_focus()
+    problems = []
+    if sim.windows.activated != [1, 1]:
+        problems.append(f"expected OBS activated at the start and after the popup, got {sim.windows.activated}")
+    if focus.scans != 1:
+        problems.append(f"expected one title scan for the whole run, got {focus.scans}")
+    if len([a for a in sim.actions if a[1] == "click"]) != 6:
+        problems.append("iteration did not finish all six clicks")
+    return problems
+
+
+def scenario_text_entry() -> list:
+    """With "confirm", a typo is caught by the read-back and retyped, a busy clipboard is polled again;
+    paste and templates; the clipboard is kept."""
+    config = RunConfig()
+    problems = []
+    date = SIM_START + datetime.timedelta(seconds=2 * config.step_delay)
+
+    workflow = copy.deepcopy(DEFAULT_WORKFLOW)
+    workflow["steps"][2]["confirm"] = True
+    sim = Simulation(config, workflow, iterations=1)
+    sim.driver.typo = "x"
+    sim.driver.clipboard = "user text"
+    sim.driver.busy_reads = {1, 3}  # the first poll of each read-back
+    sim.run()
+    text = [a[1:] for a in sim.actions if a[1] != "click"][:6]
+    expected = [("type", date.strftime("%Y-%m-%d")), ("hotkey", "ctrl+a"), ("hotkey", "ctrl+c"),
+                ("hotkey", "ctrl+a"), ("type", date.strftime("%Y-%m-%d")), ("hotkey", "ctrl+a")]
+    if text != expected:
+        problems.append(f"expected the date retyped after a failed read-back, got {text}")
+    if sim.driver.clipboard != "user text":
+        problems.append(f"clipboard not restored: {sim.driver.clipboard!r}")
+    if len([a for a in sim.actions if a[1] == "click"]) != 6:
+        problems.append("a busy clipboard ended the run")
+
+    workflow = copy.deepcopy(DEFAULT_WORKFLOW)
+    workflow["steps"][2] = {"type": "type_text", "text": "Run {iteration} at {time}", "method": "paste",
+                            "confirm": True}
+    sim = Simulation(config, workflow, iterations=2).run()
+    fields = [m[len("Entered text: "):] for t, m in sim.log if m.startswith("Entered text: ")]
+    if len(fields) != 2 or not fields[0].startswith("Run 1 at ") or not fields[1].startswith("Run 2 at "):
+        problems.append(f"expected pasted 'Run 1 at ...' and 'Run 2 at ...', got {fields}")
+    if any(a[1] == "type" for a in sim.actions):
+        problems.append("paste method typed the text")
+    return problems
+
+
+def scenario_adaptive_delay(iterations: int = 5) -> list:
+    """Adaptive delay leaves delays with no verified click after them at Step delay; a verified click tunes the one before."""
+    config = RunConfig(adaptive_delay=True)
+    sim = Simulation(config, iterations=iterations).run()
+    problems = []
+    clicks = [a[0] for a in sim.actions if a[1] == "click"]
+    fixed = [a[0] for a in expected_iteration(config, 0, sim.clock.start) if a[1] == "click"]
+    if clicks[:len(fixed)] != fixed or clicks[-len(fixed):] != [round(t + clicks[-len(fixed)], 3) for t in fixed]:
+        problems.append(f"unverified step delays changed: first {clicks[:len(fixed)]}, last {clicks[-len(fixed):]}")
+
+    tuner = retry.StepTuner(config.step_delay)
+    tuner.record("Step 2", 1, True, previous="Step 1")
+    tuner.record("Step 3", 1, True, previous="Step 2", verified=True)
+    tuner.record("Step 4", 2, True, previous="Step 3", verified=True)
+    if (tuner.delay("Step 1"), tuner.delay("Step 2"), tuner.delay("Step 3")) != (
+            config.step_delay, config.step_delay * retry.TUNE_SHRINK, config.step_delay * retry.TUNE_GROW):
+        problems.append(f"tuned delays: {tuner.delays}")
+    return problems
+
+
+SCENARIOS = {
+    "multi_day": scenario_multi_day,
+    "watchdog_timeout": scenario_watchdog_timeout,
+    "obs_error_dialog": scenario_obs_error_dialog,
+    "crash_resume": scenario_crash_resume,
+    "click_retry": scenario_click_retry,
+    "focus_steal": scenario_focus_steal,
+    "text_entry": scenario_text_entry,
+    "adaptive_delay": scenario_adaptive_delay,
+}
+
+
+def run_scenarios(names=None) -> dict:
+    """{name: [problem, ...]} for each scenario; an empty list means it passed."""
+    return {name: SCENARIOS[name]() for name in names or SCENARIOS}
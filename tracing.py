@@ -0,0 +1,140 @@
+import itertools
+import json
+import os
+import threading
+import time
+
+"""
+Automated Task Runner (Pro) - step tracing
+Author: xTheRedShirtx
+
+Nested spans with monotonic timestamps, kept in a preallocated ring buffer
+and exported as Chrome trace-event JSON (chrome://tracing, Perfetto,
+speedscope). While disabled, span() returns a shared no-op object, so
+instrumented code pays one attribute check.
+"""
+
+TRACE_CAPACITY = 65536        # spans kept; older ones are overwritten
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "start")
+
+    def __init__(self, tracer, name, cat):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._record(self.name, self.cat, self.start, time.perf_counter())
+        return False
+
+
+class Tracer:
+    """Ring buffer of completed spans: (name, category, start, end, thread id), times from perf_counter()."""
+
+    def __init__(self, capacity: int = TRACE_CAPACITY):
+        self.capacity = capacity
+        self.enabled = False
+        self._names = [None] * capacity
+        self._cats = [None] * capacity
+        self._starts = [0.0] * capacity
+        self._ends = [0.0] * capacity
+        self._tids = [0] * capacity
+        self._seq = itertools.count()
+        self._written = 0
+        self._lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    def span(self, name: str, cat: str = ""):
+        """Context manager that records one span on exit. Near-free while disabled."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat)
+
+    def instant(self, name: str, cat: str = ""):
+        """Record a zero-length event."""
+        if self.enabled:
+            now = time.perf_counter()
+            self._record(name, cat, now, now)
+
+    def _record(self, name, cat, start, end):
+        i = next(self._seq)  # atomic under the GIL
+        slot = i % self.capacity
+        self._names[slot] = name
+        self._cats[slot] = cat
+        self._starts[slot] = start
+        self._ends[slot] = end
+        self._tids[slot] = threading.get_ident()
+        self._written = i + 1
+
+    def clear(self):
+        with self._lock:
+            self._seq = itertools.count()
+            self._written = 0
+            self.origin = time.perf_counter()
+
+    def spans(self, since: float = None) -> list:
+        """Recorded spans, oldest first, optionally only those ending after `since`."""
+        with self._lock:
+            n = self._written
+            first = max(0, n - self.capacity)
+            out = []
+            for i in range(first, n):
+                s = i % self.capacity
+                if self._names[s] is None or (since is not None and self._ends[s] < since):
+                    continue
+                out.append((self._names[s], self._cats[s], self._starts[s], self._ends[s], self._tids[s]))
+        out.sort(key=lambda e: (e[2], -e[3]))
+        return out
+
+    def chrome_trace(self) -> dict:
+        """Spans as a Chrome trace-event document ("X" complete events, microseconds)."""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "AutoRunnerPro"}}]
+        for name, cat, start, end, tid in self.spans():
+            event = {"name": name, "cat": cat or "app", "pid": pid, "tid": tid,
+                     "ts": round((start - self.origin) * 1e6, 3)}
+            if end > start:
+                event.update(ph="X", dur=round((end - start) * 1e6, 3))
+            else:
+                event.update(ph="i", s="t")
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def nest(spans: list) -> list:
+    """[(depth, span), ...] with depth = how many enclosing spans on the same thread, for timeline views."""
+    stacks = {}
+    out = []
+    for span in spans:
+        stack = stacks.setdefault(span[4], [])
+        while stack and stack[-1] < span[3]:
+            stack.pop()
+        out.append((len(stack), span))
+        stack.append(span[3])
+    return out
+
+
+TRACER = Tracer()